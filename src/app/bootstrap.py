@@ -0,0 +1,86 @@
+# app/bootstrap.py
+"""
+One-shot startup work: schema creation and object-storage checks.
+
+Runs from the FastAPI lifespan (disable with BOOTSTRAP_ON_STARTUP=false) or
+as a separate migrate step:
+
+    python -m app.bootstrap
+"""
+from loguru import logger
+from sqlalchemy import text
+from app.database import create_db_and_tables, engine
+from app.object_storage import ensure_bucket_exists
+
+# Import every model so its table is registered on SQLModel.metadata
+from app.models import (  # noqa: F401
+    ai_documentation,
+    board_access,
+    boards,
+    client_user,
+    data_management_table,
+    main_board,
+    main_board_access,
+    prompt,
+    prompt_response,
+)
+
+# Transaction-scoped advisory lock serialising upgrade_schema across workers starting together
+SCHEMA_UPGRADE_LOCK_ID = 7243001
+
+# Idempotent upgrades for tables that create_all() will not alter once they exist
+SCHEMA_UPGRADES = [
+    # Response cache: hit tracking, JSONB payload and one row per hash key
+    '''ALTER TABLE "PromptsResponse" ADD COLUMN IF NOT EXISTS hit_count INTEGER NOT NULL DEFAULT 0''',
+    '''ALTER TABLE "PromptsResponse" ADD COLUMN IF NOT EXISTS last_hit_at TIMESTAMP WITHOUT TIME ZONE''',
+    # Response cache policy: TTL expiry and byte accounting for LRU eviction
+    '''ALTER TABLE "PromptsResponse" ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP WITHOUT TIME ZONE''',
+    '''ALTER TABLE "PromptsResponse" ADD COLUMN IF NOT EXISTS size_bytes INTEGER NOT NULL DEFAULT 0''',
+    '''UPDATE "PromptsResponse" SET size_bytes = octet_length(prompt_out::text) WHERE size_bytes = 0''',
+    '''CREATE INDEX IF NOT EXISTS "ix_PromptsResponse_expires_at" ON "PromptsResponse" (expires_at)''',
+    '''CREATE INDEX IF NOT EXISTS "ix_PromptsResponse_lru" ON "PromptsResponse" ((COALESCE(last_hit_at, updated_at)) DESC, id DESC)''',
+    '''
+    DO $$
+    BEGIN
+        IF (SELECT data_type FROM information_schema.columns
+            WHERE table_name = 'PromptsResponse' AND column_name = 'prompt_out') = 'json' THEN
+            ALTER TABLE "PromptsResponse" ALTER COLUMN prompt_out TYPE JSONB USING prompt_out::jsonb;
+        END IF;
+    END $$
+    ''',
+    '''
+    DO $$
+    BEGIN
+        IF to_regclass('"ix_PromptsResponse_hash_key"') IS NULL THEN
+            -- Keep the newest row of each hash key before enforcing uniqueness
+            DELETE FROM "PromptsResponse" older USING "PromptsResponse" newer
+            WHERE older.hash_key = newer.hash_key AND older.id < newer.id;
+            CREATE UNIQUE INDEX "ix_PromptsResponse_hash_key" ON "PromptsResponse" (hash_key);
+        END IF;
+    END $$
+    ''',
+    # Stored object identity of each uploaded file, for board fingerprints
+    '''ALTER TABLE tablestatus ADD COLUMN IF NOT EXISTS file_etag VARCHAR''',
+    '''ALTER TABLE tablestatus ADD COLUMN IF NOT EXISTS file_size BIGINT''',
+]
+
+def upgrade_schema() -> None:
+    """Apply SCHEMA_UPGRADES; every statement is safe to run on each startup."""
+    with engine.begin() as connection:
+        # Concurrent startups would otherwise race on the same DDL; the lock is released at commit
+        connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": SCHEMA_UPGRADE_LOCK_ID})
+        # Rewrites of large tables may outlast the request statement timeout
+        connection.execute(text("SET LOCAL statement_timeout = 0"))
+        for statement in SCHEMA_UPGRADES:
+            connection.execute(text(statement))
+
+def bootstrap() -> None:
+    """Create missing tables and make sure the storage bucket exists."""
+    create_db_and_tables()
+    upgrade_schema()
+    logger.info("Database schema is up to date")
+    ensure_bucket_exists()
+    logger.info("Object storage bucket is ready")
+
+if __name__ == "__main__":
+    bootstrap()
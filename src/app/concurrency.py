@@ -0,0 +1,139 @@
+# app/concurrency.py
+import asyncio
+import hashlib
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+from dotenv import load_dotenv
+from loguru import logger
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Maximum number of prompt pipelines (LLM agent runs) executing at once per worker.
+# Requests beyond the limit wait on the event loop instead of blocking it.
+PROMPT_CONCURRENCY = int(os.getenv("PROMPT_CONCURRENCY", "4"))
+
+# Coalesce identical prompts across workers with a Postgres advisory lock as well
+SINGLE_FLIGHT_ADVISORY_LOCK = os.getenv("SINGLE_FLIGHT_ADVISORY_LOCK", "false").lower() == "true"
+SINGLE_FLIGHT_LOCK_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_LOCK_TIMEOUT", "300"))  # seconds
+SINGLE_FLIGHT_POLL_INTERVAL = 0.5
+
+prompt_semaphore = asyncio.Semaphore(PROMPT_CONCURRENCY)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent work on the same key within one worker.
+
+    The first caller for a key leads and publishes its result on a future;
+    callers arriving while it runs await that future instead of redoing the work.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    def in_flight(self, key: str) -> Optional[asyncio.Future]:
+        """The leader's pending future for ``key``, if a call is running."""
+        return self._calls.get(key)
+
+    @contextmanager
+    def lead(self, key: str) -> Iterator[asyncio.Future]:
+        """Register the caller as leader for ``key``; set the yielded future's result when done."""
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            yield future
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                # Mark the exception retrieved so a leader without followers logs nothing extra
+                future.exception()
+            raise
+        finally:
+            # Leader cancelled or closed early: followers retry on their own
+            if not future.done():
+                future.cancel()
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    async def wait(self, key: str) -> Optional[Any]:
+        """
+        Await the running leader's result for ``key``.
+
+        Returns None when nothing is in flight or the leader gave up without a
+        result, in which case the caller should lead itself.
+        """
+        future = self.in_flight(key)
+        while future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # the follower itself was cancelled
+            future = self.in_flight(key)
+        return None
+
+
+def _advisory_lock_id(key: str) -> int:
+    return int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+@asynccontextmanager
+async def advisory_lock(key: str, timeout: float = SINGLE_FLIGHT_LOCK_TIMEOUT) -> AsyncIterator[bool]:
+    """
+    Hold a session-level Postgres advisory lock on ``key`` across workers.
+
+    The lock is polled with ``pg_try_advisory_lock`` so waiting never hits the
+    statement timeout or blocks a thread. Yields whether the lock was acquired;
+    after ``timeout`` seconds the caller proceeds without it.
+    """
+    from app.database import engine
+
+    lock_id = _advisory_lock_id(key)
+    connection = await run_in_threadpool(engine.connect)
+    acquired = False
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            acquired = await run_in_threadpool(
+                lambda: bool(connection.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": lock_id}).scalar())
+            )
+            if acquired or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+        if not acquired:
+            logger.warning(f"Advisory lock for {key} not acquired after {timeout}s; continuing without it")
+        yield acquired
+    finally:
+        try:
+            if acquired:
+                await run_in_threadpool(
+                    lambda: connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id})
+                )
+        except Exception as e:
+            # Never return a connection that may still hold the lock to the pool
+            logger.error(f"Failed to release advisory lock for {key}: {e}")
+            await run_in_threadpool(connection.invalidate)
+        await run_in_threadpool(connection.close)
+
+
+@asynccontextmanager
+async def cross_worker_lock(key: str) -> AsyncIterator[bool]:
+    """``advisory_lock`` when SINGLE_FLIGHT_ADVISORY_LOCK is enabled, otherwise a no-op yielding False."""
+    if not SINGLE_FLIGHT_ADVISORY_LOCK:
+        yield False
+        return
+    async with advisory_lock(key) as acquired:
+        yield acquired
+
+
+prompt_single_flight = SingleFlight()
+
+__all__ = [
+    "PROMPT_CONCURRENCY", "prompt_semaphore", "run_in_threadpool",
+    "SingleFlight", "prompt_single_flight", "advisory_lock", "cross_worker_lock",
+]
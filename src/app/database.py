@@ -1,8 +1,12 @@
 # app/database.py
 import os
+import threading
+from typing import Any, Dict, List
 from dotenv import load_dotenv
 from sqlmodel import SQLModel, create_engine, Session
 from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
 
@@ -16,16 +20,87 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
+# Connection pool tuning
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))  # 0 disables the limit
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
 # Construct the database URL
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# Process-wide engine registry, one engine (and pool) per database URL
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+_pool_counters: Dict[str, Dict[str, int]] = {}
+
+
+def _register_pool_counters(database_url: str, new_engine: Engine) -> None:
+    counters = _pool_counters.setdefault(database_url, {"connects": 0, "checkouts": 0, "invalidations": 0})
+
+    @event.listens_for(new_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        counters["connects"] += 1
+
+    @event.listens_for(new_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        counters["checkouts"] += 1
+
+    @event.listens_for(new_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        counters["invalidations"] += 1
+
+
+def get_engine(database_url: str = None) -> Engine:
+    """Return the shared engine for ``database_url`` (the application database by default)."""
+    database_url = database_url or DATABASE_URL
+    with _engines_lock:
+        existing = _engines.get(database_url)
+        if existing is not None:
+            return existing
+
+        connect_args = {}
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+        new_engine = create_engine(
+            database_url,
+            echo=DB_ECHO,
+            pool_pre_ping=True,  # Enable connection pool pre-ping
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,  # Connections that can be created beyond pool_size
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            connect_args=connect_args
+        )
+        _register_pool_counters(database_url, new_engine)
+        _engines[database_url] = new_engine
+        return new_engine
+
+
+def get_pool_metrics() -> List[Dict[str, Any]]:
+    """Current usage of every registered connection pool."""
+    metrics = []
+    with _engines_lock:
+        registered = list(_engines.items())
+    for database_url, registered_engine in registered:
+        pool = registered_engine.pool
+        metrics.append({
+            "database": registered_engine.url.render_as_string(hide_password=True),
+            "pool_size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            **_pool_counters.get(database_url, {})
+        })
+    return metrics
+
+
 # Create engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,  # Set to False in production
-    pool_pre_ping=True,  # Enable connection pool pre-ping
-    pool_size=5,  # Set the pool size
-    max_overflow=10  # Set the maximum number of connections that can be created beyond pool_size
-)
+engine = get_engine()
 
 # Create all tables
 def create_db_and_tables():
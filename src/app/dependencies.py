@@ -0,0 +1,28 @@
+# app/dependencies.py
+"""
+Repository providers for FastAPI's dependency injection.
+
+Repositories are stateless apart from the shared engine and MinIO client, so
+each worker builds one instance lazily and hands it to every request.
+"""
+from functools import lru_cache
+from app.repositories.data_management_table_repository import DataManagementTableRepository, TableStatusRepository
+from app.repositories.ai_documentation_repository import AiDocumentationRepository
+from app.repositories.prompt_repository import PromptResponseRepository
+
+@lru_cache(maxsize=None)
+def get_data_management_table_repository() -> DataManagementTableRepository:
+    return DataManagementTableRepository()
+
+@lru_cache(maxsize=None)
+def get_table_status_repository() -> TableStatusRepository:
+    return TableStatusRepository()
+
+@lru_cache(maxsize=None)
+def get_ai_documentation_repository() -> AiDocumentationRepository:
+    return AiDocumentationRepository()
+
+
+@lru_cache(maxsize=None)
+def get_prompt_response_repository() -> PromptResponseRepository:
+    return PromptResponseRepository()
@@ -148,4 +148,10 @@ def get_ai_documentation_instruction():
       "configuration_details": "{\"Column_name\":\"Column Description\"}"
     }
     Here is the data:
-    '''
\ No newline at end of file
+    '''
+def get_chart_insight_instruction():
+    return '''
+    Review the result table below and write up to three short, factual insights about it.
+    Only use numbers that appear in the table.
+    Return output as a JSON list of strings, for example: ["Insight1", "Insight2"]
+    Here is the data: '''
@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from sqlmodel import SQLModel, Field, JSON, Relationship
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from pydantic import ConfigDict
 
 class DataManagementTableBase(SQLModel):
@@ -54,6 +55,9 @@ class TableStatus(TableStatusBase, table=True):
     __tablename__ = "tablestatus"
     
     id: Optional[int] = Field(default=None, primary_key=True)
+    # ETag and size of the stored object, recorded at upload; part of the board fingerprint
+    file_etag: Optional[str] = Field(default=None)
+    file_size: Optional[int] = Field(default=None, sa_type=BigInteger)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
@@ -72,4 +76,16 @@ class TableStatus(TableStatusBase, table=True):
                 }
             ]
         }
-    )
\ No newline at end of file
+    )
+
+class TableStatusProfile(SQLModel, table=True):
+    """Column statistics of an uploaded file, computed once at upload (see app.services.data_profile)."""
+    __tablename__ = "TableStatusProfile"
+
+    table_status_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("tablestatus.id", ondelete="CASCADE"), primary_key=True)
+    )
+    profile_version: int
+    row_count: int
+    profile: Dict = Field(sa_type=JSON().with_variant(JSONB(), "postgresql"))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
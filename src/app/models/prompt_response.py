@@ -2,13 +2,14 @@
 from datetime import datetime
 from typing import Optional, Any, Dict
 from sqlmodel import SQLModel, Field, JSON, Column, ForeignKey, Relationship
+from sqlalchemy.dialects.postgresql import JSONB
 from pydantic import Json
 
 class PromptResponseBase(SQLModel):
     board_id: int = Field(sa_column=Column(ForeignKey("Boards.id", ondelete="CASCADE")))
     prompt_text: str
-    prompt_out: Dict = Field(sa_type=JSON)
-    hash_key: str
+    prompt_out: Dict = Field(sa_type=JSON().with_variant(JSONB(), "postgresql"))
+    hash_key: str = Field(index=True, unique=True)
 
 class PromptResponse(PromptResponseBase, table=True):
     __tablename__ = "PromptsResponse"
@@ -16,6 +17,10 @@ class PromptResponse(PromptResponseBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    hit_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    last_hit_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = Field(default=None, index=True)
+    size_bytes: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
     board: Optional["Boards"] = Relationship(back_populates="prompts_responses")
 
     class Config:
@@ -28,4 +33,16 @@ class PromptResponse(PromptResponseBase, table=True):
                     "hash_key": "example_hash_key"
                 }
             ]
-        }
\ No newline at end of file
+        }
+
+class PromptCachePolicy(SQLModel, table=True):
+    """Per-board response cache settings; boards without a row use the global default TTL."""
+    __tablename__ = "PromptCachePolicy"
+
+    board_id: int = Field(sa_column=Column(ForeignKey("Boards.id", ondelete="CASCADE"), primary_key=True))
+    ttl_seconds: Optional[int] = None  # None uses the default TTL, 0 keeps responses until evicted
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
+
+class PromptCachePolicyUpdate(SQLModel):
+    ttl_seconds: Optional[int] = None
@@ -0,0 +1,38 @@
+# app/object_storage.py
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from minio import Minio
+from minio.error import S3Error
+
+# Load environment variables from .env file
+load_dotenv()
+
+MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT")
+MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY")
+MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY")
+MINIO_SECURE = os.getenv("MINIO_SECURE", "false").lower() == "true"
+MINIO_BUCKET = os.getenv("MINIO_BUCKET", "customer-document-storage")
+
+@lru_cache(maxsize=1)
+def get_minio_client() -> Minio:
+    """Process-wide MinIO client (thread-safe, shares one HTTP connection pool)."""
+    return Minio(
+        MINIO_ENDPOINT,
+        access_key=MINIO_ACCESS_KEY,
+        secret_key=MINIO_SECRET_KEY,
+        secure=MINIO_SECURE
+    )
+
+def ensure_bucket_exists(bucket_name: str = MINIO_BUCKET) -> None:
+    """Create the storage bucket if it is missing. Run once at startup, not per request."""
+    client = get_minio_client()
+    try:
+        if not client.bucket_exists(bucket_name):
+            client.make_bucket(bucket_name)
+    except S3Error as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to initialize MinIO bucket: {str(e)}"
+        )
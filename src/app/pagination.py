@@ -0,0 +1,143 @@
+# app/pagination.py
+"""
+Keyset pagination and field projection for list endpoints.
+
+List routes take ``PageParams`` as a dependency:
+
+- ``limit`` sets the page size (PAGE_SIZE_DEFAULT when omitted, never more
+  than MAX_PAGE_SIZE), so no list endpoint returns an unbounded result,
+- ``after`` is the opaque cursor from the previous page's ``X-Next-Cursor``
+  header; pages are ordered by ``id`` or ``(created_at, id)`` so a cursor is a
+  plain ``WHERE`` on an index rather than an OFFSET scan,
+- ``fields=id,name`` selects only those columns in SQL and returns them as
+  plain objects.
+"""
+import base64
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import tuple_
+from sqlmodel import Session, select
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+PAGE_SIZE_DEFAULT = min(int(os.getenv("PAGE_SIZE_DEFAULT", "100")), MAX_PAGE_SIZE)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    def __init__(
+        self,
+        after: Optional[str] = Query(None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER} header"),
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
+    ):
+        self.after = after
+        self.limit = min(limit or PAGE_SIZE_DEFAULT, MAX_PAGE_SIZE)
+        self.fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+
+    def keys_only(self) -> "PageParams":
+        """The same page without ``fields``, for lists whose response objects are assembled after the query."""
+        return PageParams(after=self.after, limit=self.limit, fields=None)
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def _encode_cursor(values: List[Any]) -> str:
+    if len(values) == 1:
+        return str(values[0])
+    payload = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor: str, order_by: str) -> List[Any]:
+    try:
+        if order_by == "id":
+            return [int(cursor)]
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return [datetime.fromisoformat(created_at), int(row_id)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def project_fields(model, fields: Optional[List[str]], extra: Iterable[str] = ()) -> Optional[List[str]]:
+    """Validate ``fields`` against the model's columns (and ``extra`` keys the endpoint adds)."""
+    if fields is None:
+        return None
+    columns = set(model.__table__.columns.keys()) | set(extra)
+    unknown = [field for field in fields if field not in columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def fetch_page(session: Session, model, page: PageParams, *where, order_by: str = "id",
+               descending: bool = False) -> Page:
+    """
+    One page of ``model`` rows matching ``where``.
+
+    Returns model instances, or dicts of the requested fields when ``fields``
+    was given. One extra row is fetched to tell whether a next page exists.
+    """
+    fields = project_fields(model, page.fields)
+    key_columns = [model.id] if order_by == "id" else [model.created_at, model.id]
+    if fields is None:
+        statement = select(model)
+    else:
+        # Key columns are always selected so the cursor can be built from the last row
+        selected = list(dict.fromkeys(fields + [column.key for column in key_columns]))
+        statement = select(*[getattr(model, field) for field in selected])
+    for condition in where:
+        statement = statement.where(condition)
+
+    if page.after is not None:
+        cursor = _decode_cursor(page.after, order_by)
+        key = tuple_(*key_columns) if len(key_columns) > 1 else key_columns[0]
+        value = tuple_(*cursor) if len(cursor) > 1 else cursor[0]
+        statement = statement.where(key < value if descending else key > value)
+    statement = statement.order_by(*[column.desc() if descending else column for column in key_columns])
+    statement = statement.limit(page.limit + 1)
+
+    rows = session.exec(statement).all()
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor([getattr(last, column.key) for column in key_columns])
+
+    if fields is not None:
+        rows = [{field: getattr(row, field) for field in fields} for row in rows]
+    return Page(items=list(rows), next_cursor=next_cursor)
+
+
+def page_response(response: Response, page: Page, params: PageParams):
+    """Route return value for a page: the items, with the next cursor in a header."""
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    if params.fields is not None:
+        # Partial objects would fail the route's response_model; return them as they are
+        return JSONResponse(content=jsonable_encoder(page.items), headers=headers)
+    response.headers.update(headers)
+    return page.items
+
+
+def project_items(items: List[Dict[str, Any]], fields: Optional[List[str]], allowed: Iterable[str]) -> List[Dict[str, Any]]:
+    """Apply ``fields`` to response objects assembled in Python; unknown fields are a 400 as in SQL projections."""
+    if fields is None:
+        return items
+    unknown = [field for field in fields if field not in set(allowed)]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return [{field: item[field] for field in fields} for item in items]
@@ -4,11 +4,11 @@ from sqlmodel import Session, select
 from fastapi import HTTPException
 from app.models.ai_documentation import AiDocumentation
 from app.database import engine
+from app.pagination import Page, PageParams, fetch_page
 
 class AiDocumentationRepository:
     def __init__(self):
         self.engine = engine
-        AiDocumentation.metadata.create_all(self.engine)
 
     def create_ai_documentation(self, ai_documentation: AiDocumentation) -> AiDocumentation:
         with Session(self.engine) as session:
@@ -22,16 +22,19 @@ class AiDocumentationRepository:
             session.refresh(db_doc)
             return db_doc
 
-    def get_all_ai_documentation(self) -> List[AiDocumentation]:
+    def get_all_ai_documentation(self, page: PageParams) -> Page:
         with Session(self.engine) as session:
-            statement = select(AiDocumentation)
-            results = session.exec(statement).all()
-            for doc in results:
+            result = fetch_page(session, AiDocumentation, page)
+            for doc in result.items:
                 try:
-                    doc.configuration_details = eval(doc.configuration_details)
+                    if isinstance(doc, dict):
+                        if "configuration_details" in doc:
+                            doc["configuration_details"] = eval(doc["configuration_details"])
+                    else:
+                        doc.configuration_details = eval(doc.configuration_details)
                 except Exception:
                     pass
-            return results
+            return result
 
     def get_ai_documentation(self, doc_id: int) -> Optional[AiDocumentation]:
         with Session(self.engine) as session:
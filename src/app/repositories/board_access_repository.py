@@ -1,6 +1,7 @@
 # repositories/board_access_repository.py
 from typing import List, Optional, Dict, Any
 from sqlmodel import Session, select, and_, or_, join
+from sqlalchemy import union
 from datetime import datetime
 from app.models.board_access import BoardAccess
 from app.models.boards import Boards
@@ -9,28 +10,20 @@ from app.models.permissions import BoardPermission
 from fastapi import Depends
 import os
 from dotenv import load_dotenv
-from sqlmodel import Session, select, create_engine, or_
+from sqlmodel import Session, select, or_
+from app.database import engine
+from app.models.main_board import MainBoard
+from app.models.main_board_access import MainBoardAccess
+from app.pagination import Page, PageParams, fetch_page
+from app.repositories.permission_resolver import permission_resolver
 
 # Load environment variables from .env file
 load_dotenv()
 
 class BoardAccessRepository:
     def __init__(self):
-        # Get the values from the environment
-        db_user = os.getenv("DB_USER")
-        db_password = os.getenv("DB_PASSWORD")
-        db_host = os.getenv("DB_HOST")
-        db_port = os.getenv("DB_PORT")
-        db_name = os.getenv("DB_NAME")
-
-        # Construct the database URL
-        self.database_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-        
-        self.engine = create_engine(
-            self.database_url,
-            echo=True  # Set to False in production
-        )
-        BoardAccess.metadata.create_all(self.engine)
+        # Share the process-wide engine and connection pool
+        self.engine = engine
         self.session = Session(self.engine)
         
     def grant_permission(self, board_id: int, client_user_id: int, permission: BoardPermission) -> BoardAccess:
@@ -61,6 +54,7 @@ class BoardAccessRepository:
             
         self.session.commit()
         self.session.refresh(access)
+        permission_resolver.invalidate(client_user_id)
         return access
 
     def revoke_permission(self, board_id: int, client_user_id: int, permission: BoardPermission) -> Optional[BoardAccess]:
@@ -79,6 +73,7 @@ class BoardAccessRepository:
         if access:
             self.session.delete(access)
             self.session.commit()
+            permission_resolver.invalidate(client_user_id)
             
         return access
 
@@ -86,24 +81,12 @@ class BoardAccessRepository:
         """
         Check if a user has a specific permission for a board.
         """
-        # First check main board permissions through the board's main_board_id
-        board_statement = select(Boards).where(Boards.id == board_id)
-        board = self.session.exec(board_statement).first()
-        if board:
-            from app.repositories.main_board_access_repository import MainBoardAccessRepository
-            main_board_repo = MainBoardAccessRepository()
-            if main_board_repo.check_permission(board.main_board_id, client_user_id, permission):
-                return True
-        
-        # Then check board-specific permissions
-        statement = select(BoardAccess).where(
-            and_(
-                BoardAccess.board_id == board_id,
-                BoardAccess.client_user_id == client_user_id,
-                BoardAccess.permission == permission.value
-            )
-        )
-        return bool(self.session.exec(statement).first())
+        permissions = permission_resolver.get(client_user_id)
+        return permission.value in permissions.board_permissions(board_id, self._main_board_id(board_id))
+
+    def _main_board_id(self, board_id: int) -> Optional[int]:
+        statement = select(Boards.main_board_id).where(Boards.id == board_id)
+        return self.session.exec(statement).first()
 
     def get_board_permissions(self, board_id: int) -> List[BoardAccess]:
         """
@@ -169,9 +152,9 @@ class BoardAccessRepository:
             "permissions": permissions
         }
 
-    def get_users_with_board_permissions(self, board_id: int) -> List[Dict[str, Any]]:
+    def get_users_with_board_permissions(self, board_id: int, user_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
         """
-        Get all users who have any permissions for a specific board.
+        Get all users who have any permissions for a specific board, or only those of ``user_ids``.
         """
         # First get main board permissions
         board_statement = select(Boards).where(Boards.id == board_id)
@@ -181,13 +164,15 @@ class BoardAccessRepository:
         if board:
             from app.repositories.main_board_access_repository import MainBoardAccessRepository
             main_board_repo = MainBoardAccessRepository()
-            main_board_users = main_board_repo.get_users_with_board_permissions(board.main_board_id)
+            main_board_users = main_board_repo.get_users_with_board_permissions(board.main_board_id, user_ids)
             results.extend(main_board_users)
         
         # Get board-specific permissions
         statement = select(ClientUser, BoardAccess).join(
             BoardAccess, ClientUser.id == BoardAccess.client_user_id
         ).where(BoardAccess.board_id == board_id)
+        if user_ids is not None:
+            statement = statement.where(BoardAccess.client_user_id.in_(user_ids))
         
         user_permissions = {}
         for user, access in self.session.exec(statement).all():
@@ -212,25 +197,24 @@ class BoardAccessRepository:
         results.sort(key=lambda x: (not x["is_owner"], x["user_name"] or ""))
         return results
 
+    def get_users_with_board_permissions_page(self, board_id: int, page: PageParams) -> Page:
+        """
+        A page of the users with any permissions for a board, in user id order.
+        """
+        main_board_id = self._main_board_id(board_id)
+        candidates = union(
+            select(BoardAccess.client_user_id).where(BoardAccess.board_id == board_id),
+            select(MainBoardAccess.client_user_id).where(MainBoardAccess.main_board_id == main_board_id),
+            select(MainBoard.client_user_id).where(MainBoard.id == main_board_id)
+        ).subquery()
+        users = fetch_page(self.session, ClientUser, page.keys_only(), ClientUser.id.in_(select(candidates.c.client_user_id)))
+        user_ids = [user.id for user in users.items]
+        by_user = {user["user_id"]: user for user in self.get_users_with_board_permissions(board_id, user_ids)}
+        return Page(items=[by_user[user_id] for user_id in user_ids if user_id in by_user], next_cursor=users.next_cursor)
+
     def check_user_has_any_permission(self, board_id: int, client_user_id: int) -> bool:
         """
         Check if a user has any permissions for a specific board.
         """
-        # First check main board permissions
-        board_statement = select(Boards).where(Boards.id == board_id)
-        board = self.session.exec(board_statement).first()
-        
-        if board:
-            from app.repositories.main_board_access_repository import MainBoardAccessRepository
-            main_board_repo = MainBoardAccessRepository()
-            if main_board_repo.check_user_has_any_permission(board.main_board_id, client_user_id):
-                return True
-        
-        # Check board-specific permissions
-        statement = select(BoardAccess).where(
-            and_(
-                BoardAccess.board_id == board_id,
-                BoardAccess.client_user_id == client_user_id
-            )
-        )
-        return bool(self.session.exec(statement).first())
\ No newline at end of file
+        permissions = permission_resolver.get(client_user_id)
+        return bool(permissions.board_permissions(board_id, self._main_board_id(board_id)))
\ No newline at end of file
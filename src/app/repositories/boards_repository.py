@@ -7,9 +7,13 @@ from app.models.boards import Boards
 from app.models.board_access import BoardAccess
 from app.models.permissions import BoardPermission
 from app.repositories.board_access_repository import BoardAccessRepository
+from app.repositories.permission_resolver import permission_resolver
+from app.repositories.info_tree_cache import info_tree_cache
 import os
 from dotenv import load_dotenv
-from sqlmodel import Session, select, create_engine, or_
+from sqlmodel import Session, select, or_
+from app.database import engine
+from app.pagination import Page, PageParams, fetch_page
 from fastapi import HTTPException
 
 # Load environment variables from .env file
@@ -17,23 +21,8 @@ load_dotenv()
 
 class BoardsRepository:
     def __init__(self):
-        # Get the values from the environment
-        db_user = os.getenv("DB_USER")
-        db_password = os.getenv("DB_PASSWORD")
-        db_host = os.getenv("DB_HOST")
-        db_port = os.getenv("DB_PORT")
-        db_name = os.getenv("DB_NAME")
-
-        # Construct the database URL
-        self.database_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-        
-        self.engine = create_engine(
-            self.database_url,
-            echo=True  # Set to False in production
-        )
-        
-        # Create tables
-        Boards.metadata.create_all(self.engine)
+        # Share the process-wide engine and connection pool
+        self.engine = engine
         self.access_repository = BoardAccessRepository()
         
     def create_board(self, board: Boards, creator_user_id: int) -> Boards:
@@ -52,6 +41,7 @@ class BoardsRepository:
             session.add(db_board)
             session.commit()
             session.refresh(db_board)
+            info_tree_cache.invalidate_all()
             
             # Grant all permissions to the creator
             for permission in BoardPermission:
@@ -63,31 +53,23 @@ class BoardsRepository:
             
             return db_board
 
-    def get_boards(self, user_id: int) -> List[Boards]:
+    def get_boards(self, user_id: int, page: PageParams) -> Page:
         """
-        Get all boards that the user has access to.
+        Get a page of the boards that the user has access to.
         """
+        permissions = permission_resolver.get(user_id)
+        if not permissions.boards and not permissions.main_boards:
+            return Page(items=[], next_cursor=None)
         with Session(self.engine) as session:
-            # Get boards where user has direct access
-            access_statement = select(BoardAccess.board_id).where(
-                BoardAccess.client_user_id == user_id
-            )
-            accessible_board_ids = session.exec(access_statement).all()
-            
-            # Get boards where user has access through main board
-            
-            statement = select(Boards).where(
-                and_(
-                    or_(Boards.id.in_(accessible_board_ids), Boards.is_active == True),
-                    Boards.is_active == True  # Exclude soft-deleted boards
-                )
+            # Boards granted directly or through their main board, in one query
+            return fetch_page(
+                session, Boards, page,
+                or_(
+                    Boards.id.in_(list(permissions.boards)),
+                    Boards.main_board_id.in_(list(permissions.main_boards))
+                ),
+                Boards.is_active == True  # Exclude soft-deleted boards
             )
-            
-            boards = []
-            for board in session.exec(statement).all():
-                if self.access_repository.check_user_has_any_permission(board.id, user_id):
-                    boards.append(board)
-            return boards
 
     def get_board(self, board_id: int, user_id: int) -> Optional[Boards]:
         """
@@ -97,7 +79,7 @@ class BoardsRepository:
             statement = select(Boards).where(and_(Boards.id == board_id, Boards.is_active == True))
             board = session.exec(statement).first()
             
-            if board and self.access_repository.check_user_has_any_permission(board_id, user_id):
+            if board and permission_resolver.get(user_id).board_permissions(board_id, board.main_board_id):
                 return board
             return None
 
@@ -122,6 +104,7 @@ class BoardsRepository:
             session.add(db_board)
             session.commit()
             session.refresh(db_board)
+            info_tree_cache.invalidate_all()
             return db_board
 
     def delete_board(self, board_id: int, user_id: int) -> Optional[Boards]:
@@ -142,19 +125,20 @@ class BoardsRepository:
             session.add(db_board)
             session.commit()
             session.refresh(db_board)
+            info_tree_cache.invalidate_all()
             return db_board
 
-    def get_boards_for_main_boards(self, main_board_id: int, user_id: int) -> List[Boards]:
+    def get_boards_for_main_boards(self, main_board_id: int, user_id: int, page: PageParams) -> Page:
         """
-        Get all boards for a main board that the user has access to.
+        Get a page of the boards of a main board that the user has access to.
         """
+        permissions = permission_resolver.get(user_id)
+        conditions = [Boards.main_board_id == main_board_id]
+        if not permissions.main_board_permissions(main_board_id):
+            # Without a main-board grant only directly granted boards are visible
+            conditions.append(Boards.id.in_(list(permissions.boards)))
         with Session(self.engine) as session:
-            statement = select(Boards).where(Boards.main_board_id == main_board_id)
-            boards = []
-            for board in session.exec(statement).all():
-                if self.access_repository.check_user_has_any_permission(board.id, user_id):
-                    boards.append(board)
-            return boards
+            return fetch_page(session, Boards, page, *conditions)
 
     def update_board_timestamp(self, board_id: int, user_id: int) -> None:
         """
@@ -214,12 +198,12 @@ class BoardsRepository:
         for permission in permissions:
             self.access_repository.grant_permission(board_id, target_user_id, permission)
 
-    def get_board_users(self, board_id: int, admin_user_id: int) -> List[dict]:
+    def get_board_users(self, board_id: int, admin_user_id: int, page: PageParams) -> Page:
         """
-        Get all users who have access to a board and their permissions.
+        Get a page of the users who have access to a board and their permissions.
         """
         # Check if admin user has permission to view users
         if not self.access_repository.check_permission(board_id, admin_user_id, BoardPermission.VIEW_USERS):
             raise HTTPException(status_code=403, detail="User does not have permission to view users")
             
-        return self.access_repository.get_users_with_board_permissions(board_id)
\ No newline at end of file
+        return self.access_repository.get_users_with_board_permissions_page(board_id, page)
\ No newline at end of file
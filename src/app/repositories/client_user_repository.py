@@ -1,7 +1,9 @@
 # app/repositories/client_users_repository.py
 from datetime import datetime, timedelta
 from typing import Any, List, Optional
-from sqlmodel import Session, select, create_engine, or_
+from sqlmodel import Session, select, or_
+from app.database import engine
+from app.pagination import Page, PageParams, fetch_page
 from fastapi import HTTPException
 import secrets
 import string
@@ -35,24 +37,8 @@ def send_sms(phone_number, otp):
     
 class ClientUsersRepository:
     def __init__(self):
-        # Get the values from the environment
-        db_user = os.getenv("DB_USER")
-        db_password = os.getenv("DB_PASSWORD")
-        db_host = os.getenv("DB_HOST")
-        db_port = os.getenv("DB_PORT")
-        db_name = os.getenv("DB_NAME")
-
-        # Construct the database URL
-        self.database_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-        
-        # Create engine with the URL
-        self.engine = create_engine(
-            self.database_url,
-            echo=True  # Set to False in production
-        )        
-        # Create tables
-        ClientUser.metadata.create_all(self.engine)
-        OTP.metadata.create_all(self.engine)
+        # Share the process-wide engine and connection pool
+        self.engine = engine
 
     def _generate_otp(self, length: int = 6) -> str:
         return random.randint(100000, 999999)
@@ -69,10 +55,9 @@ class ClientUsersRepository:
                 session.rollback()
                 raise HTTPException(status_code=400, detail=str(e))
 
-    def get_users(self) -> List[ClientUser]:
+    def get_users(self, page: PageParams) -> Page:
         with Session(self.engine) as session:
-            statement = select(ClientUser)
-            return session.exec(statement).all()
+            return fetch_page(session, ClientUser, page)
 
     def get_user(self, user_id: int) -> Optional[ClientUser]:
         with Session(self.engine) as session:
@@ -1,14 +1,22 @@
 # app/repositories/data_management_table_repository.py
 import io
 import os
-from typing import List, Optional, Any
+import pandas as pd
+from typing import List, Optional, Any, Dict
 from datetime import datetime
 from contextlib import contextmanager
-from sqlmodel import Session, select, create_engine
-from minio import Minio
+from sqlmodel import Session, select
+from sqlalchemy.orm import joinedload, load_only
 from minio.error import S3Error
 from fastapi import HTTPException
-from app.models.data_management_table import DataManagementTable, TableStatus
+from app.database import engine
+from app.object_storage import get_minio_client, MINIO_BUCKET
+from app.models.data_management_table import DataManagementTable, TableStatus, TableStatusProfile
+from app.repositories.frame_cache import frame_cache
+from app.repositories.table_dataset import table_dataset
+from app.repositories.response_cache import response_cache
+from app.pagination import Page, PageParams, fetch_page
+from loguru import logger
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,61 +24,22 @@ load_dotenv()
 
 class BaseRepository:
     def __init__(self):
-        # Database configuration
-        self.db_user = os.getenv("DB_USER")
-        self.db_password = os.getenv("DB_PASSWORD")
-        self.db_host = os.getenv("DB_HOST")
-        self.db_port = os.getenv("DB_PORT")
-        self.db_name = os.getenv("DB_NAME")
-
-        # MinIO configuration
-        self.minio_host = os.getenv("MINIO_ENDPOINT")
-        self.minio_access_key = os.getenv("MINIO_ACCESS_KEY")
-        self.minio_secret_key = os.getenv("MINIO_SECRET_KEY")
-        self.minio_secure = os.getenv("MINIO_SECURE", "false").lower() == "true"
-        self.bucket_name = os.getenv("MINIO_BUCKET", "customer-document-storage")
-
-        # Initialize connections
-        self._init_database()
-        self._init_minio()
-
-    def _init_database(self) -> None:
-        """Initialize database connection"""
-        self.database_url = f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
-        self.engine = create_engine(
-            self.database_url,
-            echo=os.getenv("DB_ECHO", "false").lower() == "true"
-        )
-        
-        # Create tables
-        DataManagementTable.metadata.create_all(self.engine)
-        TableStatus.metadata.create_all(self.engine)
-
-    def _init_minio(self) -> None:
-        """Initialize MinIO client"""
-        self.minio_client = Minio(
-            self.minio_host,
-            access_key=self.minio_access_key,
-            secret_key=self.minio_secret_key,
-            secure=self.minio_secure
-        )
-        self._ensure_bucket_exists()
-
-    def _ensure_bucket_exists(self) -> None:
-        """Ensure MinIO bucket exists"""
-        try:
-            if not self.minio_client.bucket_exists(self.bucket_name):
-                self.minio_client.make_bucket(self.bucket_name)
-        except S3Error as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to initialize MinIO bucket: {str(e)}"
-            )
+        # Shared connections; schema and bucket are created once by app.bootstrap
+        self.engine = engine
+        self.minio_client = get_minio_client()
+        self.bucket_name = MINIO_BUCKET
 
     def get_session(self) -> Session:
         """Get a new database session"""
         return Session(self.engine)
 
+    def object_name(self, file_download_link: str) -> str:
+        """Strip the ``minio://<bucket>/`` prefix from a download link."""
+        prefix = f'minio://{self.bucket_name}/'
+        if file_download_link.startswith(prefix):
+            return file_download_link[len(prefix):]
+        return file_download_link
+
 class DataManagementTableRepository(BaseRepository):
     def create_data_management_table(
         self, data_management_table: DataManagementTable
@@ -85,12 +54,45 @@ class DataManagementTableRepository(BaseRepository):
         finally:
             session.close()
 
-    def get_data_management_tables(self) -> List[DataManagementTable]:
-        """Get all data management tables"""
+    def get_data_management_tables(self, page: PageParams) -> Page:
+        """Get a page of data management tables"""
         session = self.get_session()
         try:
-            statement = select(DataManagementTable)
-            return session.exec(statement).all()
+            return fetch_page(session, DataManagementTable, page)
+        finally:
+            session.close()
+
+    def get_tables_with_files(
+        self,
+        board_id: Optional[int] = None,
+        table_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[DataManagementTable]:
+        """Get data management tables with their TableStatus files in one query, ordered by id
+
+        With ``fields``, only those table columns (plus ``id``) are selected,
+        and the files are joined only when ``files`` is one of them.
+        """
+        session = self.get_session()
+        try:
+            statement = select(DataManagementTable).order_by(DataManagementTable.id)
+            if fields is not None:
+                columns = [getattr(DataManagementTable, field) for field in fields if field != "files"]
+                statement = statement.options(load_only(DataManagementTable.id, *columns))
+            if fields is None or "files" in fields:
+                statement = statement.options(joinedload(DataManagementTable.table_statuses))
+            if board_id is not None:
+                statement = statement.where(DataManagementTable.board_id == board_id)
+            if table_id is not None:
+                statement = statement.where(DataManagementTable.id == table_id)
+            if after_id is not None:
+                # Keyset pagination: resume after the last id of the previous page
+                statement = statement.where(DataManagementTable.id > after_id)
+            if limit is not None:
+                statement = statement.limit(limit)
+            return session.exec(statement).unique().all()
         finally:
             session.close()
 
@@ -145,34 +147,76 @@ class DataManagementTableRepository(BaseRepository):
                 result = DataManagementTable.model_validate(db_table)
                 session.delete(db_table)
                 session.commit()
+                response_cache.invalidate_board(result.board_id)
+                table_dataset.drop_table(table_id)
                 return result
             return None
         finally:
             session.close()
 
 class TableStatusRepository(BaseRepository):
+    def _invalidate_board_responses(self, session: Session, data_management_table_id: int) -> None:
+        """Cached prompt answers of the board are stale once its files change."""
+        board_id = session.exec(
+            select(DataManagementTable.board_id).where(DataManagementTable.id == data_management_table_id)
+        ).first()
+        if board_id is not None:
+            response_cache.invalidate_board(board_id)
+
+    def _materialize_partition(self, table_status: TableStatus) -> None:
+        """Store the month partition of a file that was not parsed at upload (e.g. uploaded before datasets existed)."""
+        if not table_status.file_download_link or table_dataset.existing_partition_path(
+            table_status.data_management_table_id, table_status.month_year, table_status.id
+        ):
+            return
+        try:
+            object_name = self.object_name(table_status.file_download_link)
+            response = self.minio_client.get_object(self.bucket_name, object_name)
+            try:
+                df = pd.read_csv(io.BytesIO(response.read()))
+            finally:
+                response.close()
+                response.release_conn()
+            table_dataset.write_partition(
+                table_status.data_management_table_id, table_status.month_year, table_status.id, df
+            )
+        except Exception as e:
+            # The dataset is an optimisation; prompts fall back to the frame cache without it
+            logger.warning(f"Could not materialize partition for table status {table_status.id}: {e}")
+
+    def _store_file(self, session: Session, table_status: TableStatus, content: bytes) -> None:
+        """
+        Add the status row and upload its file under a name unique to the row.
+
+        Names used to be ``<YYYY-MM>/<filename>``, so re-using a filename in
+        the same calendar month overwrote an object that another row still
+        pointed to. The object's ETag and size are recorded on the row.
+        """
+        session.add(table_status)
+        session.flush()  # assigns the id used in the object name
+        current_month_date = datetime.now().strftime("%Y-%m")
+        object_name = f'{current_month_date}/{table_status.data_management_table_id}/{table_status.id}/{table_status.filename}'
+        result = self.minio_client.put_object(
+            self.bucket_name,
+            object_name,
+            io.BytesIO(content),
+            len(content)
+        )
+        table_status.file_download_link = f'minio://{self.bucket_name}/{object_name}'
+        table_status.file_etag = result.etag
+        table_status.file_size = len(content)
+
     def upload_file_table_status_for_rag(
         self, file_content: bytes, table_status: TableStatus
     ) -> TableStatus:
         """Upload file for RAG processing"""
-        current_month_date = datetime.now().strftime("%Y-%m")
-        object_name = f'{current_month_date}/{table_status.filename}'
-        
         try:
-            self.minio_client.put_object(
-                self.bucket_name,
-                object_name,
-                io.BytesIO(file_content),
-                len(file_content)
-            )
-            
-            table_status.file_download_link = f'minio://{self.bucket_name}/{object_name}'
-            
             session = self.get_session()
             try:
-                session.add(table_status)
+                self._store_file(session, table_status, file_content)
                 session.commit()
                 session.refresh(table_status)
+                self._invalidate_board_responses(session, table_status.data_management_table_id)
                 result = TableStatus.model_validate(table_status)
                 return result
             finally:
@@ -184,30 +228,32 @@ class TableStatusRepository(BaseRepository):
                 detail=f"Failed to upload file to MinIO: {str(e)}"
             )
 
-    def upload_file_table_status(self, upload_df: Any, table_status: TableStatus) -> TableStatus:
-        """Upload file from DataFrame"""
-        current_month_date = datetime.now().strftime("%Y-%m")
-        object_name = f'{current_month_date}/{table_status.filename}'
-        
+    def upload_file_table_status(
+        self, upload_df: Any, table_status: TableStatus, profile: Optional[Dict[str, Any]] = None
+    ) -> TableStatus:
+        """Upload file from DataFrame, storing its column profile alongside the status row"""
         try:
             csv_buffer = io.StringIO()
             upload_df.to_csv(csv_buffer, index=False, header=True)
             csv_bytes = csv_buffer.getvalue().encode('utf-8')
             
-            self.minio_client.put_object(
-                self.bucket_name,
-                object_name,
-                io.BytesIO(csv_bytes),
-                len(csv_bytes)
-            )
-            
-            table_status.file_download_link = f'minio://{self.bucket_name}/{object_name}'
-            
             session = self.get_session()
             try:
-                session.add(table_status)
+                self._store_file(session, table_status, csv_bytes)
+                if profile is not None:
+                    session.add(TableStatusProfile(
+                        table_status_id=table_status.id,
+                        profile_version=profile["profile_version"],
+                        row_count=profile["rows"],
+                        profile=profile
+                    ))
                 session.commit()
                 session.refresh(table_status)
+                self._invalidate_board_responses(session, table_status.data_management_table_id)
+                # The frame is parsed already; store it as this month's partition
+                table_dataset.write_partition(
+                    table_status.data_management_table_id, table_status.month_year, table_status.id, upload_df
+                )
                 result = TableStatus.model_validate(table_status)
                 return result
             finally:
@@ -238,12 +284,11 @@ class TableStatusRepository(BaseRepository):
         finally:
             session.close()
 
-    def get_all_table_status(self) -> List[TableStatus]:
-        """Get all table statuses"""
+    def get_all_table_status(self, page: PageParams) -> Page:
+        """Get a page of table statuses"""
         session = self.get_session()
         try:
-            statement = select(TableStatus)
-            return session.exec(statement).all()
+            return fetch_page(session, TableStatus, page)
         finally:
             session.close()
 
@@ -256,6 +301,14 @@ class TableStatusRepository(BaseRepository):
         finally:
             session.close()
 
+    def get_table_status_profile(self, status_id: int) -> Optional[TableStatusProfile]:
+        """Get the column profile stored at upload time"""
+        session = self.get_session()
+        try:
+            return session.get(TableStatusProfile, status_id)
+        finally:
+            session.close()
+
     def update_approval_status(
         self, status_id: int, new_approval_status: bool
     ) -> Optional[TableStatus]:
@@ -272,6 +325,9 @@ class TableStatusRepository(BaseRepository):
                 session.add(table_status)
                 session.commit()
                 session.refresh(table_status)
+                self._invalidate_board_responses(session, table_status.data_management_table_id)
+                if new_approval_status:
+                    self._materialize_partition(table_status)
                 result = TableStatus.model_validate(table_status)
                 return result
             return None
@@ -293,7 +349,7 @@ class TableStatusRepository(BaseRepository):
                 )
 
             try:
-                object_name = '/'.join(file_record.file_download_link.split('/')[-2:])
+                object_name = self.object_name(file_record.file_download_link)
                 data = self.minio_client.get_object(self.bucket_name, object_name)
                 combined_content.write(data.read())
                 
@@ -331,7 +387,8 @@ class TableStatusRepository(BaseRepository):
             if table_status:
                 if table_status.file_download_link:
                     try:
-                        object_name = '/'.join(table_status.file_download_link.split('/')[-2:])
+                        object_name = self.object_name(table_status.file_download_link)
+                        frame_cache.invalidate(object_name)
                         self.minio_client.remove_object(self.bucket_name, object_name)
                     except S3Error:
                         # Log error but continue with database deletion
@@ -341,6 +398,8 @@ class TableStatusRepository(BaseRepository):
                 result = TableStatus.model_validate(table_status)
                 session.delete(table_status)
                 session.commit()
+                self._invalidate_board_responses(session, result.data_management_table_id)
+                table_dataset.drop_partition(result.data_management_table_id, result.month_year, result.id)
                 return result
             return None
         finally:
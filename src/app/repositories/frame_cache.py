@@ -0,0 +1,165 @@
+# app/repositories/frame_cache.py
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+
+class FrameCache:
+    """
+    Local Parquet cache of parsed board files.
+
+    Every MinIO object is stored once per ETag under
+    ``<cache_dir>/<sha1(object_name)>/<etag>.parquet`` and read back memory-mapped.
+    A small ``version`` sidecar remembers which TableStatus version the ETag was
+    resolved for, so an unchanged TableStatus row never touches MinIO.
+    """
+
+    VERSION_FILE = "version"
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.getenv("FRAME_CACHE_DIR", "/tmp/llm-backend/frame-cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._versions: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _object_dir(self, object_name: str) -> str:
+        digest = hashlib.sha1(object_name.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest)
+
+    def _frame_path(self, object_name: str, etag: str) -> str:
+        safe_etag = "".join(ch for ch in etag if ch.isalnum() or ch in "-_")
+        return os.path.join(self._object_dir(object_name), f"{safe_etag}.parquet")
+
+    def known_etag(self, object_name: str, version: str) -> Optional[str]:
+        """Return the ETag recorded for ``version`` of the object, if the frame is on disk."""
+        with self._lock:
+            cached = self._versions.get(object_name)
+        if cached is None:
+            version_path = os.path.join(self._object_dir(object_name), self.VERSION_FILE)
+            try:
+                with open(version_path, "r", encoding="utf-8") as fh:
+                    stored_version, stored_etag = fh.read().split("\n", 1)
+                cached = (stored_version, stored_etag.strip())
+            except (OSError, ValueError):
+                return None
+            with self._lock:
+                self._versions[object_name] = cached
+
+        stored_version, etag = cached
+        if stored_version != version or not os.path.exists(self._frame_path(object_name, etag)):
+            return None
+        return etag
+
+    def remember(self, object_name: str, version: str, etag: str) -> None:
+        """Record that ``version`` of the object resolves to ``etag``."""
+        object_dir = self._object_dir(object_name)
+        os.makedirs(object_dir, exist_ok=True)
+        version_path = os.path.join(object_dir, self.VERSION_FILE)
+        tmp_path = f"{version_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            fh.write(f"{version}\n{etag}")
+        os.replace(tmp_path, version_path)
+        with self._lock:
+            self._versions[object_name] = (version, etag)
+
+    def parquet_path(self, object_name: str, etag: str) -> Optional[str]:
+        """Path of the cached Parquet file, for engines that scan it directly."""
+        path = self._frame_path(object_name, etag)
+        return path if os.path.exists(path) else None
+
+    def read(self, object_name: str, etag: str) -> Optional[pd.DataFrame]:
+        """Read a cached frame via a memory-mapped Parquet read, or None on a miss."""
+        path = self._frame_path(object_name, etag)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pq.read_table(path, memory_map=True).to_pandas()
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"Discarding unreadable frame cache entry {path}: {e}")
+            self._remove(path)
+            return None
+
+    def write(self, object_name: str, etag: str, version: str, df: pd.DataFrame) -> None:
+        """Persist a parsed frame and drop frames cached for older ETags of the object."""
+        object_dir = self._object_dir(object_name)
+        os.makedirs(object_dir, exist_ok=True)
+        path = self._frame_path(object_name, etag)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+        except (OSError, pa.ArrowException) as e:
+            # Mixed-type object columns cannot always be stored; serve them uncached.
+            logger.warning(f"Could not cache frame for {object_name}: {e}")
+            self._remove(tmp_path)
+            return
+
+        for entry in os.listdir(object_dir):
+            entry_path = os.path.join(object_dir, entry)
+            if entry.endswith(".parquet") and entry_path != path:
+                self._remove(entry_path)
+        self.remember(object_name, version, etag)
+
+    def _profile_path(self, object_name: str, version: str) -> str:
+        digest = hashlib.sha1(version.encode("utf-8")).hexdigest()
+        return os.path.join(self._object_dir(object_name), f"profile-{digest}.json")
+
+    def read_profile(self, object_name: str, version: str, profile_version: int) -> Optional[Dict[str, Any]]:
+        """Cached data profile of ``version`` of the object, if built with ``profile_version``."""
+        try:
+            with open(self._profile_path(object_name, version), "r", encoding="utf-8") as fh:
+                profile = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        return profile if profile.get("profile_version") == profile_version else None
+
+    def write_profile(self, object_name: str, version: str, profile: Dict[str, Any]) -> None:
+        """Persist a data profile and drop profiles of older versions of the object."""
+        object_dir = self._object_dir(object_name)
+        os.makedirs(object_dir, exist_ok=True)
+        path = self._profile_path(object_name, version)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(profile, fh)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not cache profile for {object_name}: {e}")
+            self._remove(tmp_path)
+            return
+
+        for entry in os.listdir(object_dir):
+            entry_path = os.path.join(object_dir, entry)
+            if entry.startswith("profile-") and entry.endswith(".json") and entry_path != path:
+                self._remove(entry_path)
+
+    def invalidate(self, object_name: str) -> None:
+        """Forget every cached frame of an object."""
+        object_dir = self._object_dir(object_name)
+        with self._lock:
+            self._versions.pop(object_name, None)
+        if os.path.isdir(object_dir):
+            for entry in os.listdir(object_dir):
+                self._remove(os.path.join(object_dir, entry))
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+frame_cache = FrameCache()
@@ -0,0 +1,56 @@
+# app/repositories/info_tree_cache.py
+import copy
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+INFO_TREE_CACHE_TTL_SECONDS = float(os.getenv("INFO_TREE_CACHE_TTL_SECONDS", "0"))  # 0 disables the cache
+
+
+class InfoTreeCache:
+    """
+    Per-worker cache of each user's main-board navigation tree.
+
+    A user's tree is dropped when their main-board grants change; any change
+    to a main board or board drops every tree, since it can appear in the
+    trees of all users who can see it. Other workers catch up within
+    ``ttl_seconds``.
+    """
+
+    def __init__(self, ttl_seconds: float = INFO_TREE_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, Tuple[List[Dict[str, Any]], float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[List[Dict[str, Any]]]:
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(int(user_id))
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        # Callers may edit the tree they get (e.g. "is_selected"); hand out copies
+        return copy.deepcopy(entry[0])
+
+    def put(self, user_id: int, tree: List[Dict[str, Any]]) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[int(user_id)] = (copy.deepcopy(tree), time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(int(user_id), None)
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+info_tree_cache = InfoTreeCache()
@@ -8,29 +8,18 @@ from app.models.permissions import MainBoardPermission
 from fastapi import Depends
 import os
 from dotenv import load_dotenv
-from sqlmodel import Session, select, create_engine, or_
+from sqlmodel import Session, select, or_
+from app.database import engine
+from app.repositories.permission_resolver import permission_resolver
+from app.repositories.info_tree_cache import info_tree_cache
 
 # Load environment variables from .env file
 load_dotenv()
 
 class MainBoardAccessRepository:
     def __init__(self):
-        
-        # Get the values from the environment
-        db_user = os.getenv("DB_USER")
-        db_password = os.getenv("DB_PASSWORD")
-        db_host = os.getenv("DB_HOST")
-        db_port = os.getenv("DB_PORT")
-        db_name = os.getenv("DB_NAME")
-
-        # Construct the database URL
-        self.database_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-        
-        self.engine = create_engine(
-            self.database_url,
-            echo=True  # Set to False in production
-        ) 
-        MainBoardAccess.metadata.create_all(self.engine)
+        # Share the process-wide engine and connection pool
+        self.engine = engine
         self.session = Session(self.engine)
         
     def grant_permission(self, main_board_id: int, client_user_id: int, permission: MainBoardPermission) -> MainBoardAccess:
@@ -70,6 +59,8 @@ class MainBoardAccessRepository:
             
         self.session.commit()
         self.session.refresh(access)
+        permission_resolver.invalidate(client_user_id)
+        info_tree_cache.invalidate(client_user_id)
         return access
 
     def revoke_permission(self, main_board_id: int, client_user_id: int, permission: MainBoardPermission) -> Optional[MainBoardAccess]:
@@ -96,6 +87,8 @@ class MainBoardAccessRepository:
         if access:
             self.session.delete(access)
             self.session.commit()
+            permission_resolver.invalidate(client_user_id)
+            info_tree_cache.invalidate(client_user_id)
             
         return access
 
@@ -111,25 +104,8 @@ class MainBoardAccessRepository:
         Returns:
             bool: True if user has permission, False otherwise
         """
-        # Check if user is owner
-        owner_check = select(MainBoard).where(
-            and_(
-                MainBoard.id == main_board_id,
-                MainBoard.client_user_id == client_user_id
-            )
-        )
-        if self.session.exec(owner_check).first():
-            return True
-            
-        # Check specific permission
-        statement = select(MainBoardAccess).where(
-            and_(
-                MainBoardAccess.main_board_id == main_board_id,
-                MainBoardAccess.client_user_id == client_user_id,
-                MainBoardAccess.permission == permission.value
-            )
-        )
-        return bool(self.session.exec(statement).first())
+        permissions = permission_resolver.get(client_user_id)
+        return permission.value in permissions.main_board_permissions(main_board_id)
 
     def get_board_permissions(self, main_board_id: int) -> List[MainBoardAccess]:
         """
@@ -225,12 +201,13 @@ class MainBoardAccessRepository:
             "permissions": permissions
         }
 
-    def get_users_with_board_permissions(self, main_board_id: int) -> List[Dict[str, Any]]:
+    def get_users_with_board_permissions(self, main_board_id: int, user_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
         """
         Get all users who have any permissions for a specific board.
         
         Args:
             main_board_id (int): The ID of the main board
+            user_ids (Optional[List[int]]): Only consider these users (one page of them)
             
         Returns:
             List[Dict[str, Any]]: List of dictionaries containing user information and permissions
@@ -239,6 +216,8 @@ class MainBoardAccessRepository:
         owner_statement = select(MainBoard, ClientUser).join(
             ClientUser, MainBoard.client_user_id == ClientUser.id
         ).where(MainBoard.id == main_board_id)
+        if user_ids is not None:
+            owner_statement = owner_statement.where(MainBoard.client_user_id.in_(user_ids))
         owner_result = self.session.exec(owner_statement).first()
         
         results = []
@@ -256,6 +235,8 @@ class MainBoardAccessRepository:
         statement = select(ClientUser, MainBoardAccess).join(
             MainBoardAccess, ClientUser.id == MainBoardAccess.client_user_id
         ).where(MainBoardAccess.main_board_id == main_board_id)
+        if user_ids is not None:
+            statement = statement.where(MainBoardAccess.client_user_id.in_(user_ids))
         
         user_permissions = {}
         for user, access in self.session.exec(statement).all():
@@ -285,21 +266,4 @@ class MainBoardAccessRepository:
         Returns:
             bool: True if user has any permissions, False otherwise
         """
-        # Check if user is owner
-        owner_check = select(MainBoard).where(
-            and_(
-                MainBoard.id == main_board_id,
-                MainBoard.client_user_id == client_user_id
-            )
-        )
-        if self.session.exec(owner_check).first():
-            return True
-        
-        # Check for any permissions
-        statement = select(MainBoardAccess).where(
-            and_(
-                MainBoardAccess.main_board_id == main_board_id,
-                MainBoardAccess.client_user_id == client_user_id
-            )
-        )
-        return bool(self.session.exec(statement).first())
\ No newline at end of file
+        return bool(permission_resolver.get(client_user_id).main_board_permissions(main_board_id))
\ No newline at end of file
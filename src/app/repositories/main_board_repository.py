@@ -4,6 +4,8 @@ from typing import List, Optional, Dict, Any
 
 from requests import delete
 from sqlmodel import Session, select, or_, and_
+from sqlalchemy import String, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from datetime import datetime
 from app.models.main_board import MainBoard
 from app.models.main_board_access import MainBoardAccess
@@ -14,31 +16,19 @@ from fastapi import Depends
 from fastapi import HTTPException
 import os
 from dotenv import load_dotenv
-from sqlmodel import Session, select, create_engine, or_
+from sqlmodel import Session, select, or_
+from app.database import engine
+from app.repositories.permission_resolver import permission_resolver
+from app.repositories.info_tree_cache import info_tree_cache
+from app.pagination import Page, PageParams, fetch_page
 
 # Load environment variables from .env file
 load_dotenv()
 
 class MainBoardRepository:
     def __init__(self):
-        # Get the values from the environment
-        db_user = os.getenv("DB_USER")
-        db_password = os.getenv("DB_PASSWORD")
-        db_host = os.getenv("DB_HOST")
-        db_port = os.getenv("DB_PORT")
-        db_name = os.getenv("DB_NAME")
-
-        # Construct the database URL
-        self.database_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-        
-        self.engine = create_engine(
-            self.database_url,
-            echo=True  # Set to False in production
-        ) 
-        
-        # Create tables
-        MainBoard.metadata.create_all(self.engine)
-        MainBoardAccess.metadata.create_all(self.engine)
+        # Share the process-wide engine and connection pool
+        self.engine = engine
         
         from app.repositories.main_board_access_repository import MainBoardAccessRepository
         self.access_repository = MainBoardAccessRepository()
@@ -87,6 +77,7 @@ class MainBoardRepository:
         self.session.add(db_main_board)
         self.session.commit()
         self.session.refresh(db_main_board)
+        info_tree_cache.invalidate_all()
         return db_main_board
 
     def delete_main_board(self, main_board_id: int, client_user_id: int) -> Optional[MainBoard]:
@@ -110,6 +101,9 @@ class MainBoardRepository:
                     # Delete the MainBoard
                     session.delete(main_board)
                     session.commit()  # Commit deletion
+                    # Its grants went with it, for every user
+                    permission_resolver.invalidate_all()
+                    info_tree_cache.invalidate_all()
 
                     return main_board
 
@@ -117,10 +111,11 @@ class MainBoardRepository:
                     session.rollback()  # Rollback in case of any error
                     raise HTTPException(500, f"An error occurred: {str(e)}")  # Fixed exception format
 
-    def get_all_main_boards(self, client_user_id: int) -> List[MainBoard]:
+    def get_all_main_boards(self, client_user_id: int, page: PageParams) -> Page:
         with Session(self.engine) as session:
             try:
-                statement = select(MainBoard).where(
+                return fetch_page(
+                    session, MainBoard, page,
                     or_(
                         MainBoard.client_user_id == client_user_id,
                         MainBoard.id.in_(
@@ -133,21 +128,27 @@ class MainBoardRepository:
                         )
                     )
                 )
-                results = session.exec(statement).all()
-                return list(results)
             except Exception as e:
                 session.rollback()
                 raise e
 
 
-    def get_board_users(self, main_board_id: int, client_user_id: int) -> Optional[List[Dict[str, Any]]]:
+    def get_board_users(self, main_board_id: int, client_user_id: int, page: PageParams) -> Optional[Page]:
         if not self.access_repository.check_permission(main_board_id, client_user_id, MainBoardPermission.VIEW):
             return None
-            
+
+        # A page of the users with grants, then the grants of just those users
+        users = fetch_page(
+            self.session, ClientUser, page.keys_only(),
+            ClientUser.id.in_(select(MainBoardAccess.client_user_id).where(MainBoardAccess.main_board_id == main_board_id))
+        )
         statement = select(ClientUser, MainBoardAccess).join(
             MainBoardAccess, 
             ClientUser.id == MainBoardAccess.client_user_id
-        ).where(MainBoardAccess.main_board_id == main_board_id)
+        ).where(
+            MainBoardAccess.main_board_id == main_board_id,
+            MainBoardAccess.client_user_id.in_([user.id for user in users.items])
+        ).order_by(ClientUser.id)
         
         results = self.session.exec(statement).all()
         
@@ -163,16 +164,45 @@ class MainBoardRepository:
                 }
             users_dict[user.id]["permissions"].append(access.permission)
         
-        return list(users_dict.values())
+        return Page(items=list(users_dict.values()), next_cursor=users.next_cursor)
+
+    def _info_tree_statement(self, client_user_id: int, *conditions):
+        """
+        Main boards the user can view, one row per board, with the user's
+        main-board permissions aggregated in the same query.
+        """
+        granted = select(
+            MainBoardAccess.main_board_id,
+            func.array_agg(MainBoardAccess.permission, type_=ARRAY(String)).label("permissions")
+        ).where(
+            MainBoardAccess.client_user_id == client_user_id
+        ).group_by(MainBoardAccess.main_board_id).subquery()
+
+        return select(
+            MainBoard, Boards.id, Boards.name, Boards.is_active, granted.c.permissions
+        ).outerjoin(
+            Boards, MainBoard.id == Boards.main_board_id
+        ).outerjoin(
+            granted, MainBoard.id == granted.c.main_board_id
+        ).where(
+            or_(
+                MainBoard.client_user_id == client_user_id,
+                granted.c.permissions.contains([MainBoardPermission.VIEW.value])
+            ),
+            *conditions
+        ).order_by(MainBoard.id, Boards.id)
 
     def convert_to_tree_structure(self, data: List[Any], client_user_id: int) -> List[Dict[str, Any]]:
         tree = {}
 
-        for main_board, board in data:
-            if not self.access_repository.check_permission(main_board.id, client_user_id, MainBoardPermission.VIEW):
-                continue
-
+        for main_board, board_id, board_name, board_is_active, permissions in data:
             if main_board.id not in tree:
+                if main_board.client_user_id == client_user_id:
+                    # Owners hold every permission
+                    permissions = [perm.value for perm in MainBoardPermission]
+                else:
+                    granted = set(permissions or [])
+                    permissions = [perm.value for perm in MainBoardPermission if perm.value in granted]
                 tree[main_board.id] = {
                     "main_board_id": main_board.id,
                     "client_user_id": main_board.client_user_id,
@@ -180,61 +210,30 @@ class MainBoardRepository:
                     "main_board_type": main_board.main_board_type,
                     "is_selected": False,
                     "boards": {},
-                    "permissions": self._get_user_permissions_for_board(main_board.id, client_user_id)
+                    "permissions": permissions
                 }
 
-            if board and board.id not in tree[main_board.id]["boards"]:
-                tree[main_board.id]["boards"][board.id] = {
-                    "name": board.name,
-                    "is_active": board.is_active,
+            if board_id is not None and board_id not in tree[main_board.id]["boards"]:
+                tree[main_board.id]["boards"][board_id] = {
+                    "name": board_name,
+                    "is_active": board_is_active,
                     "is_selected": False
                 }
 
         return list(tree.values())
 
-    def _get_user_permissions_for_board(self, main_board_id: int, client_user_id: int) -> List[str]:
-        statement = select(MainBoardAccess.permission).where(
-            and_(
-                MainBoardAccess.main_board_id == main_board_id,
-                MainBoardAccess.client_user_id == client_user_id
-            )
-        )
-        results = self.session.exec(statement).all()
-        
-        # Add all permissions if user is owner
-        owner_check = select(MainBoard).where(
-            and_(
-                MainBoard.id == main_board_id,
-                MainBoard.client_user_id == client_user_id
-            )
-        )
-        if self.session.exec(owner_check).first():
-            return [perm.value for perm in MainBoardPermission]
-            
-        return list(results)
-
     def get_all_info_tree(self, client_user_id: int) -> List[Dict[str, Any]]:
+        cached = info_tree_cache.get(client_user_id)
+        if cached is not None:
+            return cached
         try:
-            statement = select(MainBoard, Boards).outerjoin(
-                Boards, MainBoard.id == Boards.main_board_id
-            ).where(
-                or_(
-                    MainBoard.client_user_id == client_user_id,
-                    MainBoard.id.in_(
-                        select(MainBoardAccess.main_board_id).where(
-                            and_(
-                                MainBoardAccess.client_user_id == client_user_id,
-                                MainBoardAccess.permission == MainBoardPermission.VIEW.value
-                            )
-                        )
-                    )
-                )
-            )
-            results = self.session.exec(statement).all()
-            return self.convert_to_tree_structure(results, client_user_id)
+            with Session(self.engine) as session:
+                results = session.exec(self._info_tree_statement(client_user_id)).all()
+            tree = self.convert_to_tree_structure(results, client_user_id)
         except Exception as e:
-            self.session.rollback()  # Rollback transaction if an error occurs
             raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+        info_tree_cache.put(client_user_id, tree)
+        return tree
 
 
     def get_filtered_info_tree(self, client_user_id: int, filter_params: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -247,25 +246,8 @@ class MainBoardRepository:
             conditions.append(MainBoard.name.ilike(f"%{filter_params['name']}%"))
             
         if filter_params.get("is_active") is not None:
-            conditions.append(Board.is_active == filter_params["is_active"])
-            
-        base_condition = or_(
-            MainBoard.client_user_id == client_user_id,
-            MainBoard.id.in_(
-                select(MainBoardAccess.main_board_id).where(
-                    and_(
-                        MainBoardAccess.client_user_id == client_user_id,
-                        MainBoardAccess.permission == MainBoardPermission.VIEW.value
-                    )
-                )
-            )
-        )
-        
-        conditions.append(base_condition)
+            conditions.append(Boards.is_active == filter_params["is_active"])
         
-        statement = select(MainBoard, Board).outerjoin(
-            Board, MainBoard.id == Board.main_board_id
-        ).where(and_(*conditions))
-        
-        results = self.session.exec(statement).all()
-        return self.convert_to_tree_structure(results, client_user_id)
\ No newline at end of file
+        with Session(self.engine) as session:
+            results = session.exec(self._info_tree_statement(client_user_id, *conditions)).all()
+        return self.convert_to_tree_structure(results, client_user_id)
@@ -0,0 +1,156 @@
+# app/repositories/permission_resolver.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from sqlalchemy import literal, union_all
+from sqlmodel import Session, select
+from dotenv import load_dotenv
+
+from app.database import engine
+from app.models.board_access import BoardAccess
+from app.models.main_board import MainBoard
+from app.models.main_board_access import MainBoardAccess
+from app.models.permissions import MainBoardPermission
+
+# Load environment variables
+load_dotenv()
+
+PERMISSION_CACHE_TTL_SECONDS = float(os.getenv("PERMISSION_CACHE_TTL_SECONDS", "30"))  # 0 disables the process cache
+
+OWNER = "owner"
+ALL_PERMISSIONS = frozenset(permission.value for permission in MainBoardPermission)
+
+# Users resolved during the current request; None outside a request scope
+_request_permissions: ContextVar[Optional[Dict[int, "EffectivePermissions"]]] = ContextVar(
+    "request_permissions", default=None
+)
+
+
+@dataclass
+class EffectivePermissions:
+    """
+    Every grant a user holds: owned main boards, main-board grants and board grants.
+
+    A board's permissions are its own grants plus those of its main board;
+    owning a main board grants everything on it and on its boards.
+    """
+
+    user_id: int
+    main_boards: Dict[int, Set[str]] = field(default_factory=dict)
+    boards: Dict[int, Set[str]] = field(default_factory=dict)
+
+    def main_board_permissions(self, main_board_id: Optional[int]) -> Set[str]:
+        return set(self.main_boards.get(main_board_id, ()))
+
+    def board_permissions(self, board_id: int, main_board_id: Optional[int]) -> Set[str]:
+        return self.main_board_permissions(main_board_id) | self.boards.get(board_id, set())
+
+    def is_owner(self, main_board_id: Optional[int]) -> bool:
+        return OWNER in self.main_boards.get(main_board_id, ())
+
+
+class PermissionResolver:
+    """
+    Loads a user's effective permissions in one query and caches them.
+
+    Results are kept for the current request (so repeated checks in one
+    request cost nothing) and in a short-TTL per-worker cache. Grants and
+    revokes invalidate the affected user; other workers catch up within
+    ``ttl_seconds``.
+    """
+
+    def __init__(self, ttl_seconds: float = PERMISSION_CACHE_TTL_SECONDS):
+        self.engine = engine
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, Tuple[EffectivePermissions, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> EffectivePermissions:
+        user_id = int(user_id)
+        scope = _request_permissions.get()
+        if scope is not None and user_id in scope:
+            return scope[user_id]
+
+        permissions = None
+        if self.ttl_seconds > 0:
+            with self._lock:
+                entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > time.monotonic():
+                permissions = entry[0]
+        if permissions is None:
+            permissions = self._load(user_id)
+            if self.ttl_seconds > 0:
+                with self._lock:
+                    self._entries[user_id] = (permissions, time.monotonic() + self.ttl_seconds)
+
+        if scope is not None:
+            scope[user_id] = permissions
+        return permissions
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget a user's permissions after one of their grants changed."""
+        user_id = int(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+        scope = _request_permissions.get()
+        if scope is not None:
+            scope.pop(user_id, None)
+
+    def invalidate_all(self) -> None:
+        """Forget every user's permissions, e.g. after a main board and its grants were deleted."""
+        with self._lock:
+            self._entries.clear()
+        scope = _request_permissions.get()
+        if scope is not None:
+            scope.clear()
+
+    def _load(self, user_id: int) -> EffectivePermissions:
+        statement = union_all(
+            select(literal("main_board").label("scope"), MainBoard.id.label("target_id"), literal(OWNER).label("permission"))
+            .where(MainBoard.client_user_id == user_id),
+            select(literal("main_board"), MainBoardAccess.main_board_id, MainBoardAccess.permission)
+            .where(MainBoardAccess.client_user_id == user_id),
+            select(literal("board"), BoardAccess.board_id, BoardAccess.permission)
+            .where(BoardAccess.client_user_id == user_id),
+        )
+        permissions = EffectivePermissions(user_id=user_id)
+        with Session(self.engine) as session:
+            for scope, target_id, permission in session.exec(statement).all():
+                grants = permissions.main_boards if scope == "main_board" else permissions.boards
+                grants.setdefault(target_id, set()).add(permission)
+        for grants in permissions.main_boards.values():
+            if OWNER in grants:
+                grants.update(ALL_PERMISSIONS)
+        return permissions
+
+
+@contextmanager
+def request_permission_scope() -> Iterator[None]:
+    """Share resolved permissions between every check made inside the block."""
+    token = _request_permissions.set({})
+    try:
+        yield
+    finally:
+        _request_permissions.reset(token)
+
+
+class PermissionScopeMiddleware:
+    """Opens a permission scope around each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with request_permission_scope():
+            await self.app(scope, receive, send)
+
+
+permission_resolver = PermissionResolver()
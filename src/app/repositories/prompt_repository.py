@@ -1,53 +1,76 @@
 # app/repositories/prompt_repository.py
-from datetime import datetime
+from datetime import datetime, timedelta
 import hashlib
+import json
 import os
+import threading
 import io
+import multiprocessing
 import pandas as pd
-from typing import Optional, List, Tuple
-from sqlmodel import Session, select, delete
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from typing import Dict, Optional, List, Tuple
+from sqlmodel import Session, select, delete, update, or_
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.database import engine
 from app.models.prompt import Prompt, PromptCreate
-from app.models.prompt_response import PromptResponse
+from app.models.prompt_response import PromptResponse, PromptCachePolicy
 from app.models.boards import Boards
 from app.models.main_board import MainBoard
 from fastapi import HTTPException
-from app.models.data_management_table import DataManagementTable, TableStatus
-from minio import Minio
+from app.models.data_management_table import DataManagementTable, TableStatus, TableStatusProfile
+from app.repositories.frame_cache import frame_cache
+from app.repositories.response_cache import response_cache
+from app.repositories.table_dataset import table_dataset
+from app.services.data_profile import build_profile, PROFILE_VERSION
+from app.concurrency import run_in_threadpool
 from minio.error import S3Error
-class PromptRepository:
-    def __init__(self):
-        #Create tables
-        Prompt.metadata.create_all(engine)
-        PromptResponse.metadata.create_all(engine)
-        self.minio_host = os.getenv("MINIO_ENDPOINT")
-        self.minio_access_key = os.getenv("MINIO_ACCESS_KEY")
-        self.minio_secret_key = os.getenv("MINIO_SECRET_KEY")
-        self.minio_secure = os.getenv("MINIO_SECURE", "false").lower() == "true"
-        self.bucket_name = os.getenv("MINIO_BUCKET", "customer-document-storage")
-
-        self._init_minio()
-        
-    def _init_minio(self) -> None:
-        """Initialize MinIO client"""
-        self.minio_client = Minio(
-            self.minio_host,
-            access_key=self.minio_access_key,
-            secret_key=self.minio_secret_key,
-            secure=self.minio_secure
+from app.object_storage import get_minio_client, MINIO_BUCKET
+from app.utils import CustomJSONEncoder
+from app.pagination import Page, PageParams, fetch_page
+from loguru import logger
+
+# Board files are fetched concurrently; keep this at or below the MinIO client's
+# HTTP connection pool size (10 by default).
+MINIO_FETCH_WORKERS = int(os.getenv("MINIO_FETCH_WORKERS", "8"))
+# Files at least this large are parsed in a separate process to sidestep the GIL.
+CSV_PROCESS_PARSE_BYTES = int(os.getenv("CSV_PROCESS_PARSE_BYTES", str(64 * 1024 * 1024)))
+CSV_PARSE_PROCESSES = int(os.getenv("CSV_PARSE_PROCESSES", str(min(4, os.cpu_count() or 1))))
+
+# Response cache policy; 0 disables the TTL or the budget
+PROMPT_CACHE_DEFAULT_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_DEFAULT_TTL_SECONDS", "0"))
+PROMPT_CACHE_MAX_ROWS = int(os.getenv("PROMPT_CACHE_MAX_ROWS", "0"))
+PROMPT_CACHE_MAX_BYTES = int(os.getenv("PROMPT_CACHE_MAX_BYTES", "0"))
+
+# Lookup outcomes in this worker, reported by cache_stats()
+_lookup_counts = {"hits": 0, "misses": 0}
+_lookup_lock = threading.Lock()
+
+_fetch_executor = ThreadPoolExecutor(max_workers=MINIO_FETCH_WORKERS, thread_name_prefix="minio-fetch")
+_parse_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _parse_csv_bytes(file_data: bytes) -> pd.DataFrame:
+    """Parse raw CSV bytes into a DataFrame (module level so worker processes can pickle it)."""
+    return pd.read_csv(io.StringIO(file_data.decode('utf-8')))
+
+
+def _get_parse_executor() -> ProcessPoolExecutor:
+    global _parse_executor
+    if _parse_executor is None:
+        # "spawn" avoids forking a process that already runs fetch threads
+        _parse_executor = ProcessPoolExecutor(
+            max_workers=CSV_PARSE_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn")
         )
-        self._ensure_bucket_exists()
+    return _parse_executor
 
-    def _ensure_bucket_exists(self) -> None:
-        """Ensure MinIO bucket exists"""
-        try:
-            if not self.minio_client.bucket_exists(self.bucket_name):
-                self.minio_client.make_bucket(self.bucket_name)
-        except S3Error as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to initialize MinIO bucket: {str(e)}"
-            )
+
+class PromptRepository:
+    def __init__(self):
+        # Shared MinIO client; tables and bucket are created once by app.bootstrap
+        self.minio_client = get_minio_client()
+        self.bucket_name = MINIO_BUCKET
             
     def create_prompt(self, prompt_create: PromptCreate) -> Prompt:
         
@@ -66,11 +89,9 @@ class PromptRepository:
             session.refresh(db_prompt)
             return db_prompt
 
-    def get_prompts_for_board(self, board_id: int) -> List[Prompt]:
+    def get_prompts_for_board(self, board_id: int, page: PageParams) -> Page:
         with Session(engine) as session:
-            statement = select(Prompt).where(Prompt.board_id == board_id)
-            results = session.exec(statement).all()
-            return list(results)
+            return fetch_page(session, Prompt, page, Prompt.board_id == board_id, order_by="created_at")
 
     def get_prompts_for_board_in_main_board(self, main_board_id: int, board_id: int) -> List[Prompt]:
         with Session(engine) as session:
@@ -83,58 +104,118 @@ class PromptRepository:
             results = session.exec(statement).all()
             return list(results)
 
-    def tuples_to_combined_dataframe(self, file_records: List[Tuple[str, str]]) -> Tuple[bytes, List[pd.DataFrame], List[str]]:
-        """Process file records into dataframes and combined content."""
-        result_dict = {}
+    def tuples_to_combined_dataframe(self, file_records: List[Tuple], with_contents: bool = True,
+                                     partitions: Optional[Dict[str, str]] = None) -> Tuple[bytes, List[pd.DataFrame], List[str]]:
+        """Process file records into dataframes and combined content.
+
+        Each record is ``(download_link, table_name)`` or
+        ``(download_link, table_name, version)``; when a TableStatus version is
+        given, the parsed frame is served from the local frame cache as long as
+        that version is unchanged. Files with a table dataset partition in
+        ``partitions`` (keyed by link) are read from it instead.
+        ``with_contents=False`` skips re-serializing the frames to CSV and
+        returns empty combined content.
+        """
+        partitions = partitions or {}
         dataframes_list = []
-        table_names = []
+        ordered_files, table_names = self._group_file_records(file_records)
+
+        # Fetch and parse all files concurrently; results keep table grouping and order
+        futures = [
+            _fetch_executor.submit(self._load_frame, link, version, partitions.get(link))
+            for link, _, version in ordered_files
+        ]
+        self._raise_first_failure(futures, ordered_files)
+
+        # Combine in the original order
+        combined_contents = ""
+        for future in futures:
+            df = future.result()
+
+            # Convert back to CSV string for combined contents
+            if with_contents:
+                combined_contents += df.to_csv(index=False)
+            dataframes_list.append(df)
+
+        return combined_contents.encode(), dataframes_list, table_names
 
-        # Group files by table name
-        for download_link, table_name in file_records:
+    @staticmethod
+    def _group_file_records(file_records: List[Tuple]) -> Tuple[List[Tuple[str, str, Optional[str]]], List[str]]:
+        """Order ``(link, table, [version])`` records grouped by table, as the agent receives them."""
+        result_dict = {}
+        table_names = []
+        for record in file_records:
+            download_link, table_name = record[0], record[1]
+            version = record[2] if len(record) > 2 else None
             if table_name not in result_dict:
                 result_dict[table_name] = []
                 table_names.append(table_name)
-            result_dict[table_name].append(download_link)
+            result_dict[table_name].append((download_link, table_name, version))
+        ordered_files = [file for files in result_dict.values() for file in files]
+        return ordered_files, table_names
 
-        # Process each file and combine
-        combined_contents = ""
-        for table_name, download_links in result_dict.items():
-            for link in download_links:
-                try:
-                    # Parse the MinIO URL to get object name
-                    if link.startswith('minio://'):
-                        # Split the URL and get only the path part after the bucket name
-                        parts = link.split('/')
-                        # Find the index of the bucket name and take everything after it
-                        bucket_index = parts.index(self.bucket_name)
-                        object_name = '/'.join(parts[bucket_index + 1:])
-                    else:
-                        object_name = link
-
-                    print(f"Accessing MinIO object: {object_name}")
-                    print(f"Bucket name: {self.bucket_name}")
-                    
-                    # Get object data from MinIO
-                    response = self.minio_client.get_object(self.bucket_name, object_name)
-                    file_data = response.read()
-                    
-                    # Convert bytes to DataFrame using StringIO
-                    df = pd.read_csv(io.StringIO(file_data.decode('utf-8')))
-                    print(f"Successfully read DataFrame with shape: {df.shape}")
-                    
-                    # Convert back to CSV string for combined contents
-                    contents = df.to_csv(index=False)
-                    combined_contents += contents
-                    dataframes_list.append(df)
-                    
-                except Exception as e:
-                    print(f"Error processing file {link}: {str(e)}")
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Error processing file {link}: {str(e)}"
-                    )
+    @staticmethod
+    def _raise_first_failure(futures: list, ordered_files: List[Tuple]) -> None:
+        done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        for future, (link, _, _) in zip(futures, ordered_files):
+            if future in done and future.exception() is not None:
+                # Stop the remaining downloads on the first failure
+                for pending in not_done:
+                    pending.cancel()
+                e = future.exception()
+                print(f"Error processing file {link}: {str(e)}")
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Error processing file {link}: {str(e)}"
+                )
 
-        return combined_contents.encode(), dataframes_list, table_names
+    def _object_name_from_link(self, link: str) -> str:
+        """Strip the ``minio://<bucket>/`` prefix from a download link."""
+        if link.startswith('minio://'):
+            # Split the URL and get only the path part after the bucket name
+            parts = link.split('/')
+            # Find the index of the bucket name and take everything after it
+            bucket_index = parts.index(self.bucket_name)
+            return '/'.join(parts[bucket_index + 1:])
+        return link
+
+    def _load_frame(self, link: str, version: Optional[str] = None, partition_path: Optional[str] = None) -> pd.DataFrame:
+        """Load one board file, preferring its table dataset partition, then the frame cache, over MinIO."""
+        if partition_path is not None:
+            df = table_dataset.read_partition(partition_path)
+            if df is not None:
+                return df
+        object_name = self._object_name_from_link(link)
+
+        etag = frame_cache.known_etag(object_name, version) if version else None
+        if etag is None:
+            etag = self.minio_client.stat_object(self.bucket_name, object_name).etag
+        df = frame_cache.read(object_name, etag)
+        if df is not None:
+            if version:
+                frame_cache.remember(object_name, version, etag)
+            return df
+
+        print(f"Accessing MinIO object: {object_name}")
+        print(f"Bucket name: {self.bucket_name}")
+
+        # Get object data from MinIO
+        response = self.minio_client.get_object(self.bucket_name, object_name)
+        try:
+            file_data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+        # Convert bytes to DataFrame; large files are parsed in a worker process
+        if len(file_data) >= CSV_PROCESS_PARSE_BYTES and CSV_PARSE_PROCESSES > 1:
+            df = _get_parse_executor().submit(_parse_csv_bytes, file_data).result()
+        else:
+            df = _parse_csv_bytes(file_data)
+        print(f"Successfully read DataFrame with shape: {df.shape}")
+
+        frame_cache.write(object_name, etag, version or etag, df)
+        return df
 
     def get_file_from_minio(self, file_path: str) -> bytes:
         """Download file from MinIO and return its contents."""
@@ -169,11 +250,14 @@ class PromptRepository:
                 detail=f"Unexpected error reading file: {str(e)}"
             )
 
-    def get_file_download_links_by_board_id(self, board_id: int) -> Tuple[bytes, List[pd.DataFrame], List[str]]:
+    def get_file_download_links_by_board_id(self, board_id: int, with_contents: bool = True,
+                                            month_years: Optional[List[str]] = None) -> Tuple[bytes, List[pd.DataFrame], List[str]]:
         """Get file download links and process files for a board.
         
         Args:
             board_id: ID of the board
+            with_contents: Whether to build the combined CSV content (only needed for content hash keys)
+            month_years: Only load files of these months (all months when None)
             
         Returns:
             Tuple containing:
@@ -181,11 +265,122 @@ class PromptRepository:
             - List of dataframes
             - List of table names
         """
+        file_records = self._board_file_records(board_id, month_years)
+        try:
+            return self.tuples_to_combined_dataframe(file_records, with_contents=with_contents,
+                                                     partitions=self._board_partitions(board_id))
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error retrieving file links: {str(e)}"
+            )
+
+    def get_board_profiles(self, board_id: int, month_years: Optional[List[str]] = None) -> List[dict]:
+        """Data profiles of every file on a board, in the same order as the agent's frames.
+
+        Profiles stored at upload time are read in one query; files uploaded
+        before that are profiled once and cached per file version, so an
+        unchanged board is profiled without downloading or parsing any file.
+        """
+        ordered_files, _ = self._group_file_records(self._board_file_records(board_id, month_years))
+        stored = self._stored_profiles(board_id)
+        missing = [record for record in ordered_files if record[0] not in stored]
+        futures = [
+            _fetch_executor.submit(self._load_profile, link, table_name, version)
+            for link, table_name, version in missing
+        ]
+        self._raise_first_failure(futures, missing)
+        computed = iter([future.result() for future in futures])
+        return [
+            {**stored[link], "table": table_name} if link in stored else next(computed)
+            for link, table_name, _ in ordered_files
+        ]
+
+    def get_board_parquet_files(self, board_id: int, month_years: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """Cached Parquet files of every table on a board, for engines that scan them directly.
+
+        Month partitions stored by the table dataset at upload are used as they
+        are; other files come from the frame cache and are downloaded and parsed
+        once when not cached yet. Tables with a file that cannot be stored as
+        Parquet are left out.
+        """
+        ordered_files, table_names = self._group_file_records(self._board_file_records(board_id, month_years))
+        partitions = self._board_partitions(board_id)
+        missing = [record for record in ordered_files if record[0] not in partitions]
+        futures = [
+            _fetch_executor.submit(self._parquet_path, link, version)
+            for link, _, version in missing
+        ]
+        self._raise_first_failure(futures, missing)
+        cached = {link: future.result() for (link, _, _), future in zip(missing, futures)}
+
+        files: Dict[str, List[Optional[str]]] = {table_name: [] for table_name in table_names}
+        for link, table_name, _ in ordered_files:
+            files[table_name].append(partitions.get(link) or cached[link])
+        return {table_name: paths for table_name, paths in files.items() if None not in paths}
+
+    def _board_partitions(self, board_id: int) -> Dict[str, str]:
+        """Table dataset partition files of the board's TableStatus rows, keyed by file link."""
+        with Session(engine) as session:
+            rows = session.exec(
+                select(TableStatus.file_download_link, TableStatus.data_management_table_id,
+                       TableStatus.month_year, TableStatus.id)
+                .join(DataManagementTable, TableStatus.data_management_table_id == DataManagementTable.id)
+                .where(DataManagementTable.board_id == board_id)
+            ).all()
+        partitions = {}
+        for link, table_id, month_year, status_id in rows:
+            path = table_dataset.existing_partition_path(table_id, month_year, status_id)
+            if path is not None:
+                partitions[link] = path
+        return partitions
+
+    def _parquet_path(self, link: str, version: str) -> Optional[str]:
+        object_name = self._object_name_from_link(link)
+        etag = frame_cache.known_etag(object_name, version)
+        if etag is None:
+            # Parsing the file once fills the frame cache
+            self._load_frame(link, version)
+            etag = frame_cache.known_etag(object_name, version)
+        return frame_cache.parquet_path(object_name, etag) if etag else None
+
+    def _stored_profiles(self, board_id: int) -> dict:
+        """Upload-time profiles of the board's files, keyed by file link."""
+        with Session(engine) as session:
+            rows = session.exec(
+                select(TableStatus.file_download_link, TableStatusProfile.profile)
+                .join(TableStatusProfile, TableStatusProfile.table_status_id == TableStatus.id)
+                .join(DataManagementTable, TableStatus.data_management_table_id == DataManagementTable.id)
+                .where(DataManagementTable.board_id == board_id)
+                .where(TableStatusProfile.profile_version == PROFILE_VERSION)
+            ).all()
+        return {link: profile for link, profile in rows}
+
+    def _load_profile(self, link: str, table_name: str, version: Optional[str]) -> dict:
+        object_name = self._object_name_from_link(link)
+        profile = frame_cache.read_profile(object_name, version, PROFILE_VERSION) if version else None
+        if profile is None:
+            profile = build_profile(self._load_frame(link, version), table_name)
+            if version:
+                frame_cache.write_profile(object_name, version, profile)
+        # The table name is not part of the file version; keep it current
+        return {**profile, "table": table_name}
+
+    def _board_file_records(self, board_id: int, month_years: Optional[List[str]] = None) -> List[Tuple[str, str, str]]:
+        """``(link, table_name, version)`` for every file on a board, or for those of ``month_years``."""
         with Session(engine) as session:
             try:
                 # Construct proper SQLAlchemy query using the models
                 query = (
-                    select(TableStatus.file_download_link, DataManagementTable.table_name)
+                    select(
+                        TableStatus.file_download_link,
+                        DataManagementTable.table_name,
+                        TableStatus.id,
+                        TableStatus.updated_at,
+                        TableStatus.file_etag
+                    )
                     .join(
                         DataManagementTable,
                         TableStatus.data_management_table_id == DataManagementTable.id
@@ -193,6 +388,8 @@ class PromptRepository:
                     .where(DataManagementTable.board_id == board_id)
                     # .where(TableStatus.approved == True)  # Only get approved files
                 )
+                if month_years is not None:
+                    query = query.where(TableStatus.month_year.in_(month_years))
                 
                 results = session.exec(query).all()
                 
@@ -202,14 +399,81 @@ class PromptRepository:
                         detail=f"No approved files found for board {board_id}"
                     )
                 
-                return self.tuples_to_combined_dataframe(results)
-                
+                # Version each file by its TableStatus row so unchanged rows hit the frame cache
+                return [
+                    (link, table_name, f"{status_id}:{updated_at.isoformat() if updated_at else ''}:{etag or ''}")
+                    for link, table_name, status_id, updated_at, etag in results
+                ]
+
+            except HTTPException:
+                raise
             except Exception as e:
                 raise HTTPException(
                     status_code=500,
                     detail=f"Error retrieving file links: {str(e)}"
                 )
 
+    def get_board_month_years(self, board_id: int) -> List[str]:
+        """Distinct month_year values of the files on a board."""
+        with Session(engine) as session:
+            return list(session.exec(
+                select(TableStatus.month_year)
+                .join(DataManagementTable, TableStatus.data_management_table_id == DataManagementTable.id)
+                .where(DataManagementTable.board_id == board_id)
+                .distinct()
+            ).all())
+
+    def get_board_fingerprint(self, board_id: int) -> str:
+        """Describe the current version of every file on a board without reading any file.
+
+        The fingerprint is built from TableStatus metadata only (ids, month,
+        filename, object link, stored ETag and size, approval flag and
+        ``updated_at``), so it changes whenever a file is uploaded, replaced,
+        approved or deleted.
+        """
+        with Session(engine) as session:
+            query = (
+                select(
+                    TableStatus.id,
+                    TableStatus.data_management_table_id,
+                    TableStatus.month_year,
+                    TableStatus.filename,
+                    TableStatus.file_download_link,
+                    TableStatus.file_etag,
+                    TableStatus.file_size,
+                    TableStatus.approved,
+                    TableStatus.updated_at
+                )
+                .join(
+                    DataManagementTable,
+                    TableStatus.data_management_table_id == DataManagementTable.id
+                )
+                .where(DataManagementTable.board_id == board_id)
+                .order_by(TableStatus.id)
+            )
+            rows = session.exec(query).all()
+
+        if not rows:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No approved files found for board {board_id}"
+            )
+
+        return "\n".join(
+            "|".join([
+                str(status_id),
+                str(table_id),
+                month_year or "",
+                filename or "",
+                link or "",
+                etag or "",
+                str(size) if size is not None else "",
+                "1" if approved else "0",
+                updated_at.isoformat() if updated_at else ""
+            ])
+            for status_id, table_id, month_year, filename, link, etag, size, approved, updated_at in rows
+        )
+
     def get_prompt(self, prompt_id: int) -> Optional[Prompt]:
         with Session(engine) as session:
             statement = select(Prompt).where(Prompt.id == prompt_id)
@@ -242,30 +506,207 @@ class PromptRepository:
             return prompt
 
 class PromptResponseRepository:
-    def __init__(self):
-        #Create tables
-        Prompt.metadata.create_all(engine)
-        PromptResponse.metadata.create_all(engine)
-        
     def generate_hash_key(self, contents: bytes, input_text: str) -> str:
         hash_object = hashlib.sha256(contents + input_text.encode())
         return hash_object.hexdigest()
 
-    async def check_existing_response(self, hash_key: str) -> Optional[PromptResponse]:
-        with Session(engine) as session:
-            statement = select(PromptResponse).where(PromptResponse.hash_key == hash_key)
-            return session.exec(statement).first()
+    @staticmethod
+    def normalize_prompt_text(input_text: str) -> str:
+        """Collapse whitespace and case so trivially different prompts share a key."""
+        return " ".join(input_text.split()).lower()
+
+    def generate_metadata_hash_key(self, board_fingerprint: str, input_text: str) -> str:
+        """Hash key built from the board's file metadata instead of the file contents."""
+        payload = f"metadata:v1\n{board_fingerprint}\n{self.normalize_prompt_text(input_text)}"
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def check_existing_response(self, hash_key: str, record_hit: bool = True) -> Optional[PromptResponse]:
+        return await run_in_threadpool(self._check_existing_response, hash_key, record_hit)
+
+    def _check_existing_response(self, hash_key: str, record_hit: bool = True) -> Optional[PromptResponse]:
+        now = datetime.utcnow()
+        not_expired = or_(PromptResponse.expires_at.is_(None), PromptResponse.expires_at > now)
+        # Unique index lookup; a hit bumps the counters in the same statement
+        with Session(engine, expire_on_commit=False) as session:
+            if not record_hit:
+                statement = select(PromptResponse).where(PromptResponse.hash_key == hash_key, not_expired)
+                return session.exec(statement).first()
+
+            statement = (
+                update(PromptResponse)
+                .where(PromptResponse.hash_key == hash_key, not_expired)
+                .values(hit_count=PromptResponse.hit_count + 1, last_hit_at=now)
+                .returning(PromptResponse)
+            )
+            prompt_response = session.scalars(statement).first()
+            session.commit()
+
+        with _lookup_lock:
+            _lookup_counts["hits" if prompt_response else "misses"] += 1
+        return prompt_response
 
     async def save_response_to_database(self, hash_key: str, result: dict) -> PromptResponse:
-        prompt_response = PromptResponse(
-            board_id=result.get("board_id"),
-            prompt_text=result.get("prompt_text", ""),
-            prompt_out=result,
-            hash_key=hash_key,
-        )
-        
+        return await run_in_threadpool(self._save_response_to_database, hash_key, result)
+
+    def _save_response_to_database(self, hash_key: str, result: dict) -> PromptResponse:
+        now = datetime.utcnow()
+        # Normalise numpy/pandas values once; the encoded size feeds the byte budget
+        encoded = json.dumps(result, cls=CustomJSONEncoder)
+        with Session(engine, expire_on_commit=False) as session:
+            ttl_seconds = self._board_ttl_seconds(session, result.get("board_id"))
+            values = {
+                "board_id": result.get("board_id"),
+                "prompt_text": result.get("prompt_text", ""),
+                "prompt_out": json.loads(encoded),
+                "hash_key": hash_key,
+                "created_at": now,
+                "updated_at": now,
+                "expires_at": now + timedelta(seconds=ttl_seconds) if ttl_seconds else None,
+                "size_bytes": len(encoded.encode("utf-8")),
+            }
+            # Re-running a prompt (e.g. use_cache=false) refreshes the row instead of adding a duplicate
+            statement = (
+                pg_insert(PromptResponse)
+                .values(**values)
+                .on_conflict_do_update(
+                    index_elements=[PromptResponse.hash_key],
+                    set_={
+                        key: values[key]
+                        for key in ("board_id", "prompt_text", "prompt_out", "updated_at", "expires_at", "size_bytes")
+                    }
+                )
+                .returning(PromptResponse)
+            )
+            prompt_response = session.scalars(statement).one()
+            session.commit()
+            return prompt_response
+
+    @staticmethod
+    def _board_ttl_seconds(session: Session, board_id) -> int:
+        policy = session.get(PromptCachePolicy, int(board_id)) if board_id is not None else None
+        if policy is not None and policy.ttl_seconds is not None:
+            return policy.ttl_seconds
+        return PROMPT_CACHE_DEFAULT_TTL_SECONDS
+
+    def get_cache_policy(self, board_id: int) -> dict:
         with Session(engine) as session:
-            session.add(prompt_response)
+            policy = session.get(PromptCachePolicy, board_id)
+            return {
+                "board_id": board_id,
+                "ttl_seconds": policy.ttl_seconds if policy else None,
+                "effective_ttl_seconds": self._board_ttl_seconds(session, board_id),
+            }
+
+    def set_cache_policy(self, board_id: int, ttl_seconds: Optional[int]) -> dict:
+        """Store a board's TTL and re-date its cached responses accordingly."""
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            if session.get(Boards, board_id) is None:
+                raise HTTPException(status_code=404, detail="Board not found")
+            session.execute(
+                pg_insert(PromptCachePolicy)
+                .values(board_id=board_id, ttl_seconds=ttl_seconds, updated_at=now)
+                .on_conflict_do_update(
+                    index_elements=[PromptCachePolicy.board_id],
+                    set_={"ttl_seconds": ttl_seconds, "updated_at": now}
+                )
+            )
+            session.flush()
+            effective_ttl = self._board_ttl_seconds(session, board_id)
+            expires_at = (
+                PromptResponse.updated_at + timedelta(seconds=effective_ttl) if effective_ttl else None
+            )
+            session.execute(
+                update(PromptResponse).where(PromptResponse.board_id == board_id).values(expires_at=expires_at)
+            )
             session.commit()
-            session.refresh(prompt_response)
-            return prompt_response
\ No newline at end of file
+        return self.get_cache_policy(board_id)
+
+    def record_hits(self, hits: Dict[str, Tuple[int, datetime]]) -> None:
+        """Add hits served outside the database (the per-worker L1) to the stored counters, in one batch."""
+        if not hits:
+            return
+        with engine.begin() as connection:
+            connection.execute(text('''
+                UPDATE "PromptsResponse"
+                SET hit_count = hit_count + :hits,
+                    last_hit_at = CASE
+                        WHEN last_hit_at IS NULL OR last_hit_at < :last_hit_at THEN :last_hit_at ELSE last_hit_at
+                    END
+                WHERE hash_key = :hash_key
+            '''), [
+                {"hash_key": hash_key, "hits": count, "last_hit_at": last_hit_at}
+                for hash_key, (count, last_hit_at) in hits.items()
+            ])
+
+    def compact(self, max_rows: int = None, max_bytes: int = None) -> dict:
+        """
+        Delete expired responses, then evict least recently used ones until the
+        row and byte budgets hold. Recency is the last hit, or the last write for
+        responses that were never hit.
+
+        This worker's L1 hits are recorded first, so responses it serves from
+        memory are not evicted as unused. Other workers record theirs in their
+        own compaction passes; their hot keys also reach the database at least
+        once per L1 TTL.
+        """
+        self.record_hits(response_cache.drain_hits())
+        max_rows = PROMPT_CACHE_MAX_ROWS if max_rows is None else max_rows
+        max_bytes = PROMPT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        deleted = {"expired": 0, "over_row_budget": 0, "over_byte_budget": 0}
+
+        with engine.begin() as connection:
+            deleted["expired"] = connection.execute(
+                text('''DELETE FROM "PromptsResponse" WHERE expires_at <= :now'''), {"now": datetime.utcnow()}
+            ).rowcount
+            if max_rows > 0:
+                deleted["over_row_budget"] = connection.execute(text('''
+                    DELETE FROM "PromptsResponse" WHERE id IN (
+                        SELECT id FROM (
+                            SELECT id, ROW_NUMBER() OVER (
+                                ORDER BY COALESCE(last_hit_at, updated_at) DESC, id DESC
+                            ) AS position
+                            FROM "PromptsResponse"
+                        ) ranked WHERE position > :max_rows
+                    )
+                '''), {"max_rows": max_rows}).rowcount
+            if max_bytes > 0:
+                deleted["over_byte_budget"] = connection.execute(text('''
+                    DELETE FROM "PromptsResponse" WHERE id IN (
+                        SELECT id FROM (
+                            SELECT id, SUM(size_bytes) OVER (
+                                ORDER BY COALESCE(last_hit_at, updated_at) DESC, id DESC
+                            ) AS retained_bytes
+                            FROM "PromptsResponse"
+                        ) ranked WHERE retained_bytes > :max_bytes
+                    )
+                '''), {"max_bytes": max_bytes}).rowcount
+
+        if any(deleted.values()):
+            logger.info(f"Prompt response cache compacted: {deleted}")
+        return deleted
+
+    def cache_stats(self) -> dict:
+        """Size of the response cache plus this worker's lookup hit rate."""
+        with engine.connect() as connection:
+            row = connection.execute(text('''
+                SELECT COUNT(*) AS rows,
+                       COALESCE(SUM(size_bytes), 0) AS bytes,
+                       COUNT(*) FILTER (WHERE expires_at <= :now) AS expired_rows,
+                       COALESCE(SUM(hit_count), 0) AS total_hits,
+                       pg_total_relation_size('"PromptsResponse"') AS table_bytes
+                FROM "PromptsResponse"
+            '''), {"now": datetime.utcnow()}).mappings().one()
+
+        with _lookup_lock:
+            hits, misses = _lookup_counts["hits"], _lookup_counts["misses"]
+        lookups = hits + misses
+        return {
+            **{key: int(value) for key, value in row.items()},
+            "max_rows": PROMPT_CACHE_MAX_ROWS,
+            "max_bytes": PROMPT_CACHE_MAX_BYTES,
+            "default_ttl_seconds": PROMPT_CACHE_DEFAULT_TTL_SECONDS,
+            "worker_hits": hits,
+            "worker_misses": misses,
+            "worker_hit_rate": round(hits / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,104 @@
+# app/repositories/response_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+PROMPT_L1_CACHE_BYTES = int(os.getenv("PROMPT_L1_CACHE_BYTES", str(64 * 1024 * 1024)))  # 0 disables the L1
+PROMPT_L1_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_L1_CACHE_TTL_SECONDS", "60"))
+
+
+class ResponseCache:
+    """
+    Per-worker LRU of encoded prompt responses, bounded by total bytes.
+
+    Sits in front of PromptResponseRepository: a hit is answered with the
+    stored JSON bytes without a database session or re-serialisation. Entries
+    are dropped when their board's files change and after ``ttl_seconds``, so
+    per-board TTLs and compaction of the database cache still take effect.
+    Hits are counted per key until ``drain_hits`` hands them to the database,
+    so compaction sees responses served from here as recently used.
+    """
+
+    def __init__(self, max_bytes: int = PROMPT_L1_CACHE_BYTES, ttl_seconds: int = PROMPT_L1_CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[bytes, str, float]]" = OrderedDict()
+        self._board_keys: Dict[str, Set[str]] = {}
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._pending_hits: Dict[str, Tuple[int, datetime]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, hash_key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(hash_key)
+            if entry is not None and entry[2] < time.monotonic():
+                self._discard(hash_key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(hash_key)
+            self._hits += 1
+            count, _ = self._pending_hits.get(hash_key, (0, None))
+            self._pending_hits[hash_key] = (count + 1, datetime.utcnow())
+            return entry[0]
+
+    def put(self, hash_key: str, board_id, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        board_id = str(board_id)
+        with self._lock:
+            self._discard(hash_key)
+            self._entries[hash_key] = (body, board_id, time.monotonic() + self.ttl_seconds)
+            self._board_keys.setdefault(board_id, set()).add(hash_key)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._discard(oldest_key)
+
+    def invalidate_board(self, board_id) -> None:
+        """Drop every cached response of a board (its files were added, replaced or removed)."""
+        with self._lock:
+            for hash_key in list(self._board_keys.get(str(board_id), ())):
+                self._discard(hash_key)
+
+    def drain_hits(self) -> Dict[str, Tuple[int, datetime]]:
+        """Hit count and last hit time per key since the previous call."""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        return pending
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def _discard(self, hash_key: str) -> None:
+        entry = self._entries.pop(hash_key, None)
+        if entry is None:
+            return
+        body, board_id, _ = entry
+        self._size -= len(body)
+        board_keys = self._board_keys.get(board_id)
+        if board_keys is not None:
+            board_keys.discard(hash_key)
+            if not board_keys:
+                del self._board_keys[board_id]
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,106 @@
+# app/repositories/table_dataset.py
+import os
+import shutil
+import threading
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+
+class TableDataset:
+    """
+    Per-table Parquet dataset partitioned by ``month_year``.
+
+    Every TableStatus file is stored once, at upload or approval, as
+    ``<dataset_dir>/<table_id>/month_year=<month_year>/<status_id>.parquet``.
+    Adding a month writes one partition and deleting a TableStatus removes
+    one. Prompts read their frames from these partitions (memory-mapped) and
+    DuckDB scans them directly, so stored months are never re-downloaded or
+    re-parsed from CSV.
+    """
+
+    def __init__(self, dataset_dir: Optional[str] = None):
+        self.dataset_dir = dataset_dir or os.getenv("TABLE_DATASET_DIR", "/tmp/llm-backend/table-datasets")
+        os.makedirs(self.dataset_dir, exist_ok=True)
+
+    def _table_dir(self, table_id: int) -> str:
+        return os.path.join(self.dataset_dir, str(int(table_id)))
+
+    def _partition_dir(self, table_id: int, month_year: str) -> str:
+        safe_month = "".join(ch for ch in str(month_year) if ch.isalnum() or ch in "-_")
+        return os.path.join(self._table_dir(table_id), f"month_year={safe_month}")
+
+    def partition_path(self, table_id: int, month_year: str, status_id: int) -> str:
+        return os.path.join(self._partition_dir(table_id, month_year), f"{int(status_id)}.parquet")
+
+    def existing_partition_path(self, table_id: int, month_year: str, status_id: int) -> Optional[str]:
+        path = self.partition_path(table_id, month_year, status_id)
+        return path if os.path.exists(path) else None
+
+    def write_partition(self, table_id: int, month_year: str, status_id: int, df: pd.DataFrame) -> Optional[str]:
+        """Store one TableStatus file; returns its path, or None when the frame cannot be stored as Parquet."""
+        path = self.partition_path(table_id, month_year, status_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+            os.replace(tmp_path, path)
+            return path
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"Could not store partition {month_year} of table {table_id}: {e}")
+            self._remove(tmp_path)
+            return None
+
+    def drop_partition(self, table_id: int, month_year: str, status_id: int) -> None:
+        """Remove one TableStatus file, and its month directory once it is empty."""
+        partition_dir = self._partition_dir(table_id, month_year)
+        self._remove(self.partition_path(table_id, month_year, status_id))
+        try:
+            os.rmdir(partition_dir)
+        except OSError:
+            pass
+
+    def drop_table(self, table_id: int) -> None:
+        shutil.rmtree(self._table_dir(table_id), ignore_errors=True)
+
+    def partitions(self, table_id: int) -> Dict[str, List[str]]:
+        """Stored files of a table by month_year."""
+        table_dir = self._table_dir(table_id)
+        if not os.path.isdir(table_dir):
+            return {}
+        partitions = {}
+        for entry in sorted(os.listdir(table_dir)):
+            if not entry.startswith("month_year="):
+                continue
+            partition_dir = os.path.join(table_dir, entry)
+            files = sorted(name for name in os.listdir(partition_dir) if name.endswith(".parquet"))
+            if files:
+                partitions[entry.split("=", 1)[1]] = [os.path.join(partition_dir, name) for name in files]
+        return partitions
+
+    @staticmethod
+    def read_partition(path: str) -> Optional[pd.DataFrame]:
+        """Frame of one stored file, read memory-mapped; None when it is gone or unreadable."""
+        try:
+            # partitioning=None: the month_year= directory is not a column of the file
+            return pq.read_table(path, memory_map=True, partitioning=None).to_pandas()
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"Could not read partition {path}: {e}")
+            return None
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+table_dataset = TableDataset()
@@ -1,9 +1,10 @@
 # app/routers/ai_documentation_router.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List
 from app.repositories.ai_documentation_repository import AiDocumentationRepository
 from app.models.ai_documentation import AiDocumentation
 from app.authentication import verify_token
+from app.pagination import PageParams, page_response
 
 router = APIRouter(prefix="/ai-documentation", tags=["AI Documentation"])
 
@@ -24,9 +25,9 @@ async def create_ai_documentation(ai_documentation: AiDocumentation, token: str
             raise HTTPException(status_code=500, detail="AI Documentation API Fails to process")
 
 @router.get("/", response_model=List[AiDocumentation])
-async def get_all_ai_documentation(token: str = Depends(verify_token)):
-    all_documentation = ai_documentation_repository.get_all_ai_documentation()
-    return all_documentation
+async def get_all_ai_documentation(response: Response, page: PageParams = Depends(), token: str = Depends(verify_token)):
+    all_documentation = ai_documentation_repository.get_all_ai_documentation(page)
+    return page_response(response, all_documentation, page)
 
 @router.get("/{doc_id}", response_model=AiDocumentation)
 async def get_ai_documentation(doc_id: int, token: str = Depends(verify_token)):
@@ -1,11 +1,12 @@
 # app/routers/boards_router.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List, Dict
 from app.repositories.boards_repository import BoardsRepository
 from app.models.boards import Boards
 from app.models.permissions import BoardPermission
 from app.authentication import verify_token
+from app.pagination import PageParams, page_response, project_items
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/boards", tags=["Boards"])
@@ -34,11 +35,13 @@ async def create_board(
 
 @router.get("/", response_model=List[Boards])
 async def get_boards(
+    response: Response,
     user_id: int,
+    page: PageParams = Depends(),
     token: str = Depends(verify_token)
 ):
-    boards = boards_repository.get_boards(user_id=user_id)
-    return boards
+    boards = boards_repository.get_boards(user_id=user_id, page=page)
+    return page_response(response, boards, page)
 
 @router.get("/{board_id}", response_model=Boards)
 async def get_board(
@@ -86,22 +89,27 @@ async def delete_board(
 
 @router.get("/{main_board_id}/boards", response_model=List[Boards])
 async def get_boards_for_main_boards(
+    response: Response,
     main_board_id: int,
     user_id: int,
+    page: PageParams = Depends(),
     token: str = Depends(verify_token)
 ):
-    boards = boards_repository.get_boards_for_main_boards(main_board_id, user_id=user_id)
-    return boards
+    boards = boards_repository.get_boards_for_main_boards(main_board_id, user_id=user_id, page=page)
+    return page_response(response, boards, page)
 
 @router.get("/{board_id}/users", response_model=List[BoardUserResponse])
 async def get_board_users(
+    response: Response,
     board_id: int,
     user_id: int,
+    page: PageParams = Depends(),
     token: str = Depends(verify_token)
 ):
     try:
-        users = boards_repository.get_board_users(board_id, admin_user_id=user_id)
-        return users
+        users = boards_repository.get_board_users(board_id, admin_user_id=user_id, page=page)
+        users.items = project_items(users.items, page.fields, BoardUserResponse.model_fields)
+        return page_response(response, users, page)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -1,7 +1,7 @@
 
 import os
 import random
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Security
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Security, Response
 from fastapi.security import APIKeyHeader
 from typing import List
 from datetime import timedelta
@@ -10,6 +10,7 @@ from app.models.client_user import ClientUser, LoginClientUser, PhoneRequestForm
 from app.repositories.client_user_repository import ClientUsersRepository, send_sms
 from app.exceptions import UserNotFoundException, EmailAlreadyInUseException, InternalServerErrorException
 from app.authentication import verify_token
+from app.pagination import PageParams, page_response
 
 router = APIRouter(prefix="/client-users", tags=["Client Users"])
 
@@ -27,9 +28,9 @@ async def create_user(user: ClientUser, token: str = Depends(verify_token)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.get("/", response_model=List[ClientUser])
-async def get_users(token: str = Depends(verify_token)):
-    users = users_repository.get_users()
-    return users
+async def get_users(response: Response, page: PageParams = Depends(), token: str = Depends(verify_token)):
+    users = users_repository.get_users(page)
+    return page_response(response, users, page)
 
 @router.get("/{user_id}", response_model=ClientUser)
 async def get_user(user_id: int, token: str = Depends(verify_token)):
@@ -3,20 +3,24 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.repositories.data_management_table_repository import DataManagementTableRepository, TableStatusRepository
 from app.repositories.ai_documentation_repository import AiDocumentationRepository
-from app.models.data_management_table import DataManagementTable, TableStatus
+from app.models.data_management_table import DataManagementTable, TableStatus, TableStatusProfile
 from app.models.ai_documentation import AiDocumentation
 from typing import List, Optional
 from io import BytesIO
 import pandas as pd
 
 from fastapi import HTTPException, Depends, Path
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 
 from langchain_openai import ChatOpenAI, OpenAI
 from app.instructions import get_ai_documentation_instruction
+from app.services.data_profile import build_profile, render_profiles
 import re
 import json
 from app.authentication import verify_token
+from app.dependencies import get_data_management_table_repository, get_table_status_repository, get_ai_documentation_repository
+from app.concurrency import prompt_semaphore, run_in_threadpool
+from app.pagination import PageParams, page_response, project_fields, NEXT_CURSOR_HEADER
 import os
 from dotenv import load_dotenv
 load_dotenv()
@@ -24,75 +28,20 @@ load_dotenv()
 router = APIRouter(prefix="/data-management-table", tags=["Data Management Tables"])
 
 @router.post("/create", response_model=DataManagementTable)
-async def create_data_management_table(data_management_table: DataManagementTable, token: str = Depends(verify_token)):
-    repository = DataManagementTableRepository()
+async def create_data_management_table(data_management_table: DataManagementTable, repository: DataManagementTableRepository = Depends(get_data_management_table_repository), token: str = Depends(verify_token)):
     return repository.create_data_management_table(data_management_table)
 
 @router.get("/all", response_model=List[DataManagementTable])
-async def get_all_data_management_tables(token: str = Depends(verify_token)):
-    repository = DataManagementTableRepository()
-    return repository.get_data_management_tables()
+async def get_all_data_management_tables(response: Response, page: PageParams = Depends(), repository: DataManagementTableRepository = Depends(get_data_management_table_repository), token: str = Depends(verify_token)):
+    return page_response(response, await run_in_threadpool(repository.get_data_management_tables, page), page)
 
-@router.get("/get_all_tables_with_files", response_model=List[dict])
-async def get_all_data_management_tables(token: str = Depends(verify_token)):
-    repository = DataManagementTableRepository()
-    data_management_tables = repository.get_data_management_tables()
-    repository = TableStatusRepository()
-    result = []
-    for data_table in data_management_tables:
-        data_dict = {
-            "id": data_table.id,
-            "board_id": data_table.board_id,
-            "table_name": data_table.table_name,
-            "table_description": data_table.table_description,
-            "table_column_type_detail": data_table.table_column_type_detail,
-            "created_at": data_table.created_at,
-            "updated_at": data_table.updated_at,
-            "files": []
-        }
-
-        # Assuming each data table has a corresponding list of TableStatus instances
-        table_statuses =  repository.get_table_statuses_for_data_table(data_table.id)
-        for status in table_statuses:
-            file_dict = {
-                "id": status.id,
-                "month_year": status.month_year,
-                "approved": status.approved,
-                "filename": status.filename,
-                "file_download_link": status.file_download_link,
-                "created_at": status.created_at,
-                "updated_at": status.updated_at
-            }
-            data_dict["files"].append(file_dict)
-
-        result.append(data_dict)
-
-    return result
-
-@router.get("/get_all_tables_with_files/{data_table_id}", response_model=List[dict])
-async def get_data_management_table_with_files(data_table_id: int, token: str = Depends(verify_token)):
-    repository = DataManagementTableRepository()
-    data_table = repository.get_data_management_table(data_table_id)
+TABLE_WITH_FILES_FIELDS = [
+    "id", "board_id", "table_name", "table_description", "table_column_type_detail", "created_at", "updated_at", "files"
+]
 
-    if not data_table:
-        return {"detail": "Data table not found."}
-
-    repository = TableStatusRepository()
-    result = {
-        "id": data_table.id,
-        "board_id": data_table.board_id,
-        "table_name": data_table.table_name,
-        "table_description": data_table.table_description,
-        "table_column_type_detail": data_table.table_column_type_detail,
-        "created_at": data_table.created_at,
-        "updated_at": data_table.updated_at,
-        "files": []
-    }
-
-    # Assuming the specified data table has a corresponding list of TableStatus instances
-    table_statuses = repository.get_table_statuses_for_data_table(data_table.id)
-    for status in table_statuses:
-        file_dict = {
+def table_files(data_table: DataManagementTable) -> List[dict]:
+    return [
+        {
             "id": status.id,
             "month_year": status.month_year,
             "approved": status.approved,
@@ -101,49 +50,92 @@ async def get_data_management_table_with_files(data_table_id: int, token: str =
             "created_at": status.created_at,
             "updated_at": status.updated_at
         }
-        result["files"].append(file_dict)
+        for status in sorted(data_table.table_statuses, key=lambda status: status.id)
+    ]
+
+def table_with_files(data_table: DataManagementTable, fields: Optional[List[str]] = None) -> dict:
+    """Response object of a table and its files; with ``fields``, only those keys (which are all that was loaded)."""
+    return {
+        field: table_files(data_table) if field == "files" else getattr(data_table, field)
+        for field in (fields or TABLE_WITH_FILES_FIELDS)
+    }
+
+@router.get("/get_all_tables_with_files", response_model=List[dict])
+async def get_all_tables_with_files(
+    response: Response,
+    board_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    repository: DataManagementTableRepository = Depends(get_data_management_table_repository),
+    token: str = Depends(verify_token)
+):
+    try:
+        after_id = int(page.after) if page.after is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    fields = project_fields(DataManagementTable, page.fields, extra=["files"])
+    # One extra table tells whether another page follows
+    data_management_tables = await run_in_threadpool(
+        repository.get_tables_with_files, board_id, None, after_id, page.limit + 1, fields
+    )
+    if len(data_management_tables) > page.limit:
+        data_management_tables = data_management_tables[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(data_management_tables[-1].id)
+    return [table_with_files(data_table, fields) for data_table in data_management_tables]
+
+@router.get("/get_all_tables_with_files/{data_table_id}", response_model=List[dict])
+async def get_data_management_table_with_files(
+    data_table_id: int,
+    repository: DataManagementTableRepository = Depends(get_data_management_table_repository),
+    token: str = Depends(verify_token)
+):
+    data_tables = await run_in_threadpool(repository.get_tables_with_files, None, data_table_id)
+
+    if not data_tables:
+        return {"detail": "Data table not found."}
 
-    return [result]
+    return [table_with_files(data_tables[0])]
 
 #To do Download files API
 
 @router.get("/{table_id}", response_model=DataManagementTable)
-async def get_data_management_table(table_id: int, token: str = Depends(verify_token)):
-    repository = DataManagementTableRepository()
+async def get_data_management_table(table_id: int, repository: DataManagementTableRepository = Depends(get_data_management_table_repository), token: str = Depends(verify_token)):
     return repository.get_data_management_table(table_id)
 
 @router.put("/{table_id}", response_model=DataManagementTable)
-async def update_data_management_table(table_id: int, data_management_table: DataManagementTable, token: str = Depends(verify_token)):
-    repository = DataManagementTableRepository()
+async def update_data_management_table(table_id: int, data_management_table: DataManagementTable, repository: DataManagementTableRepository = Depends(get_data_management_table_repository), token: str = Depends(verify_token)):
     return repository.update_data_management_table(table_id, data_management_table)
 
 @router.delete("/{table_id}")
-async def delete_data_management_table(table_id: int, token: str = Depends(verify_token)):
-    repository = DataManagementTableRepository()
+async def delete_data_management_table(table_id: int, repository: DataManagementTableRepository = Depends(get_data_management_table_repository), token: str = Depends(verify_token)):
     return repository.delete_data_management_table(table_id)
 
 @router.get("/status/all", response_model=List[TableStatus])
-async def get_all_table_status(token: str = Depends(verify_token)):
-    repository = TableStatusRepository()
-    return repository.get_all_table_status()
+async def get_all_table_status(response: Response, page: PageParams = Depends(), repository: TableStatusRepository = Depends(get_table_status_repository), token: str = Depends(verify_token)):
+    return page_response(response, await run_in_threadpool(repository.get_all_table_status, page), page)
 
 @router.get("/status/{table_id}", response_model=Optional[TableStatus])
-async def get_table_status_by_id(table_id: int, token: str = Depends(verify_token)):
-    repository = TableStatusRepository()
+async def get_table_status_by_id(table_id: int, repository: TableStatusRepository = Depends(get_table_status_repository), token: str = Depends(verify_token)):
     return repository.get_table_status_by_id(table_id)
 
+@router.get("/status/profile/{status_id}", response_model=TableStatusProfile)
+async def get_table_status_profile(status_id: int, repository: TableStatusRepository = Depends(get_table_status_repository), token: str = Depends(verify_token)):
+    profile = repository.get_table_status_profile(status_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"No profile found for table status {status_id}")
+    return profile
+
 @router.put("/status/approve/{table_id}", response_model=TableStatus)
-async def update_approval_status(table_id: int, new_approval_status: bool, token: str = Depends(verify_token)):
-    repository = TableStatusRepository()
-    return repository.update_approval_status(table_id, new_approval_status)
+async def update_approval_status(table_id: int, new_approval_status: bool, repository: TableStatusRepository = Depends(get_table_status_repository), token: str = Depends(verify_token)):
+    # Approval downloads the file and stores it as a Parquet partition; keep that off the event loop
+    return await run_in_threadpool(repository.update_approval_status, table_id, new_approval_status)
 
 @router.post("/status/upload_rag/{data_management_table_id}", response_model=TableStatus)
 async def upload_file_to_table_status_for_rag(
     data_management_table_id: int, 
     month_year: str = Form(...),  # Accept month_year as a form field
     file: UploadFile = File(...), 
+    status_repository: TableStatusRepository = Depends(get_table_status_repository),
     token: str = Depends(verify_token)):
-    status_repository = TableStatusRepository()
 
     # Read and process the uploaded file
     contents = await file.read()
@@ -175,21 +167,21 @@ async def upload_file_to_table_status(
     data_management_table_id: int, 
     month_year: str = Form(...),  # Accept month_year as a form field
     file: UploadFile = File(...), 
+    status_repository: TableStatusRepository = Depends(get_table_status_repository),
+    ai_documentation_repository: AiDocumentationRepository = Depends(get_ai_documentation_repository),
     token: str = Depends(verify_token)
     #approved: bool = False  # You can customize this default value based on your requirements
 ):
-    status_repository = TableStatusRepository()
-    ai_documentation_repository = AiDocumentationRepository()
 
     # Read and process the uploaded file
     contents = await file.read()
     buffer = BytesIO(contents)
-    df = pd.read_csv(buffer)
+    df = await run_in_threadpool(pd.read_csv, buffer)
     buffer.close()
     file.file.close()
     
     # Check if the data for the specified table is already approved
-    if status_repository.is_month_data_approved(data_management_table_id, month_year):
+    if await run_in_threadpool(status_repository.is_month_data_approved, data_management_table_id, month_year):
         raise HTTPException(status_code=400, detail=f"Data for table {data_management_table_id} and month {month_year} is already approved.")
 
     # Assuming you want to handle file uploads for a specific table status
@@ -204,17 +196,21 @@ async def upload_file_to_table_status(
         updated_at=None
     )
 
+    # Profile the whole file once so later readers never need to parse it again
+    profile = await run_in_threadpool(build_profile, df, os.path.splitext(file.filename)[0])
+
     # Save the changes to the database
-    updated_table_status = status_repository.upload_file_table_status(df, new_table_status)
+    updated_table_status = await run_in_threadpool(status_repository.upload_file_table_status, df, new_table_status, profile)
 
     # Create AI Documentation for Board with uploaded data
-    board_id = status_repository.get_board_id_for_table_status_id(data_management_table_id)
+    board_id = await run_in_threadpool(status_repository.get_board_id_for_table_status_id, data_management_table_id)
     llm = ChatOpenAI(temperature=os.getenv("OPENAI_TEMPERATURE"), 
                      model=os.getenv("OPENAI_MINI_MODEL"),
                      top_p=os.getenv('OPENAI_TOP_P'),
                      model_kwargs={ "response_format": { "type": "json_object" } })
     ai_documentation_instruction = get_ai_documentation_instruction()
-    config_output = llm.invoke(ai_documentation_instruction + df.head(2).to_markdown()).content
+    async with prompt_semaphore:
+        config_output = (await llm.ainvoke(ai_documentation_instruction + render_profiles([profile]))).content
     #config_output = re.sub(r'\bfalse\b', 'False', re.sub(r'\btrue\b', 'True', config.content, flags=re.IGNORECASE), flags=re.IGNORECASE)
     #Remove special character
     #config_output = re.sub(r"```|python|json", "",config_output, 0, re.MULTILINE)
@@ -226,7 +222,7 @@ async def upload_file_to_table_status(
         configuration_details=config_str,
         name=file.filename
     )
-    created_documentation = ai_documentation_repository.update_ai_documentation_for_board(board_id, ai_documentation)
+    created_documentation = await run_in_threadpool(ai_documentation_repository.update_ai_documentation_for_board, board_id, ai_documentation)
     #created_documentation = ai_documentation_repository.create_ai_documentation(ai_documentation)
     #We need to add option to submit the files in pub sub with all the details
 
@@ -250,9 +246,12 @@ async def upload_file_to_table_status(
 
 
 @router.delete("/{table_id}")
-async def delete_data_management_table(table_id: int, token: str = Depends(verify_token)):
-    repository = DataManagementTableRepository()
-    table_status_repository = TableStatusRepository()
+async def delete_data_management_table(
+    table_id: int,
+    repository: DataManagementTableRepository = Depends(get_data_management_table_repository),
+    table_status_repository: TableStatusRepository = Depends(get_table_status_repository),
+    token: str = Depends(verify_token)
+):
 
     try:
         # Check if the table exists
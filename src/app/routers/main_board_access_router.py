@@ -1,6 +1,6 @@
 # app/routers/main_board_access_router.py
 import os
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Security
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Header, Security
 from fastapi.security import APIKeyHeader
 from typing import List, Optional
 from pydantic import BaseModel
@@ -9,6 +9,7 @@ from app.models.permissions import MainBoardPermission
 from app.repositories.main_board_repository import MainBoardRepository
 from app.repositories.main_board_access_repository import MainBoardAccessRepository
 from app.authentication import verify_token
+from app.pagination import PageParams, page_response, project_items
         
 # Pydantic models for request/response
 class PermissionType(str, Enum):
@@ -126,7 +127,8 @@ async def revoke_board_permissions(
         )
 
 @router.get("/{main_board_id}/users", response_model=List[UserPermissionResponse])
-async def get_board_users(main_board_id: int, current_user_id: int, token: str = Depends(verify_token)):
+async def get_board_users(response: Response, main_board_id: int, current_user_id: int, page: PageParams = Depends(),
+                          token: str = Depends(verify_token)):
     """Get all users and their permissions for a specific board"""
     try:
         # Verify if current user has view rights
@@ -137,19 +139,21 @@ async def get_board_users(main_board_id: int, current_user_id: int, token: str =
             )
 
         # Get all users with their permissions
-        board_users = main_board_repository.get_board_users(main_board_id, current_user_id)
+        board_users = main_board_repository.get_board_users(main_board_id, current_user_id, page)
         
-        print(board_users)
-        return [
+        board_users.items = project_items([
             UserPermissionResponse(
                 client_user_id=user['id'],       # Access 'id'
                 user_name=user['name'],           # Access 'name'
                 user_email=user['email'],          # Access 'email'
                 permissions=user['permissions']          # Access 'permissions'
-            )
-            for user in board_users
-        ]
+            ).model_dump(mode="json")
+            for user in board_users.items
+        ], page.fields, UserPermissionResponse.model_fields)
+        return page_response(response, board_users, page)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
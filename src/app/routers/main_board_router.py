@@ -4,12 +4,15 @@ import traceback
 from typing import List
 from app.models.main_board import MainBoard
 from app.repositories.main_board_repository import MainBoardRepository
+from app.repositories.permission_resolver import permission_resolver
+from app.repositories.info_tree_cache import info_tree_cache
 from app.models.boards import Boards 
 from app.models.main_board_access import MainBoardAccess 
 from dotenv import load_dotenv
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Security
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Header, Security
 from fastapi.security import APIKeyHeader
 from app.authentication import verify_token
+from app.pagination import PageParams, page_response
 from app.database import get_db
 from sqlalchemy.orm import Session
 from typing import Dict
@@ -33,11 +36,11 @@ async def create_main_board(main_board: MainBoard, client_user_id: int, token: s
         raise e
 
 @router.get("/", response_model=List[MainBoard])
-async def get_all_main_boards(client_user_id: int, token: str = Depends(verify_token)):
-    main_boards = main_board_repository.get_all_main_boards(client_user_id)
+async def get_all_main_boards(response: Response, client_user_id: int, page: PageParams = Depends(), token: str = Depends(verify_token)):
+    main_boards = main_board_repository.get_all_main_boards(client_user_id, page)
     # order = ["ANALYSIS", "FORECASTING", "REVENUE", "PROFITABILITY", "COGS", "CASH FLOW", "BUDGET", "VARIANCE ANALYSIS"]
     # main_boards = sorted(main_boards, key=lambda x: order.index(x.name))
-    return main_boards
+    return page_response(response, main_boards, page)
 
 @router.get("/get_all_info_tree", response_model=list)
 async def get_all_info_tree(client_user_id: int, token: str = Depends(verify_token)):
@@ -107,6 +110,8 @@ def delete_main_board_cascade(main_board_id: int,  db: Session = Depends(get_db)
         # ✅ 4. Now delete the MainBoard
         db.delete(main_board)
         db.commit()
+        permission_resolver.invalidate_all()
+        info_tree_cache.invalidate_all()
 
         return {"message": "Main board and associated records deleted successfully"}
     
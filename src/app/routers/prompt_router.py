@@ -4,9 +4,15 @@ from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
 from typing import List
 from app.repositories.prompt_repository import PromptRepository, PromptResponseRepository
 from app.models.prompt import Prompt, PromptCreate
-from app.instructions import get_query_instruction, get_graph_instruction, get_planner_instruction, get_planner_instruction_with_data
+from app.instructions import get_query_instruction, get_graph_instruction, get_planner_instruction, get_planner_instruction_with_data, get_chart_insight_instruction
+from app.services.chart_builder import build_charts
+from app.services.date_formatting import sort_and_format_dates
+from app.services.data_profile import describe_column, render_profiles, sample_frame
+from app.services.query_templates import answer_simple_prompt, answer_simple_prompt_sql, is_ranked, QUERY_TEMPLATES_ENABLED
+from app.services.board_query_engine import BoardQueryEngine, DUCKDB_ENABLED
+from app.services.time_range import order_month_years, remove_time_phrases, select_months
 from io import BytesIO
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 import os
 import re
@@ -16,6 +22,7 @@ from datetime import datetime
 #Pandas AI Implementation
 from pandasai import SmartDatalake
 from pandasai import Agent, SmartDataframe
+from pandasai.connectors import PandasConnector
 
 from langchain.agents.agent_types import AgentType
 from langchain_experimental.agents.agent_toolkits import create_csv_agent, create_pandas_dataframe_agent
@@ -31,8 +38,9 @@ from datetime import datetime
 import pandas as pd
 import numpy as np
 import re
+import hashlib
 import json
-from typing import Any, Dict, Union
+from typing import Any, AsyncIterator, Dict, Iterator, NamedTuple, Optional, Tuple, Union
 from pydantic import BaseModel
 
 import json
@@ -42,6 +50,12 @@ import pandas as pd
 import numpy as np
 from multiprocessing import Pool
 from app.authentication import verify_token
+from app.concurrency import prompt_semaphore, prompt_single_flight, cross_worker_lock, run_in_threadpool
+from app.services.prompt_jobs import prompt_job_manager
+from app.pagination import PageParams, page_response
+from app.repositories.response_cache import response_cache
+from app.services.semantic_cache import semantic_cache, SEMANTIC_CACHE_ENABLED
+from app.models.prompt_response import PromptResponse
 import os
 from dotenv import load_dotenv
 load_dotenv()
@@ -51,15 +65,28 @@ router = APIRouter(prefix="/prompts", tags=["Prompts"])
 prompt_repository = PromptRepository()
 prompt_response_repository = PromptResponseRepository()
 
+# Charts are built locally; the LLM is only asked for insight text when enabled.
+CHART_LLM_INSIGHTS = os.getenv("CHART_LLM_INSIGHTS", "false").lower() == "true"
+
+# "metadata" keys the response cache on the board's TableStatus fingerprint,
+# "content" on the full file contents (slower, downloads every file first).
+PROMPT_CACHE_KEY_MODE = os.getenv("PROMPT_CACHE_KEY_MODE", "metadata").lower()
+
+# Give the agent cached per-file data profiles (schema, ranges, sample rows) as table context
+AGENT_DATA_PROFILES = os.getenv("AGENT_DATA_PROFILES", "true").lower() == "true"
+
+# Only load the months a prompt's date phrases refer to ("last quarter", "March 2024", ...)
+MONTH_PRUNING_ENABLED = os.getenv("MONTH_PRUNING_ENABLED", "true").lower() == "true"
+
 @router.post("/", response_model=Prompt)
 def create_prompt_route(prompt_create: Prompt, token: str = Depends(verify_token)):
     new_prompt = prompt_repository.create_prompt(prompt_create)
     return new_prompt
 
 @router.get("/boards/{board_id}", response_model=List[Prompt])
-def get_prompts_for_board_route(board_id: int, token: str = Depends(verify_token)):
-    prompts = prompt_repository.get_prompts_for_board(board_id)
-    return prompts
+def get_prompts_for_board_route(board_id: int, response: Response, page: PageParams = Depends(), token: str = Depends(verify_token)):
+    prompts = prompt_repository.get_prompts_for_board(board_id, page)
+    return page_response(response, prompts, page)
 
 @router.get("/{prompt_id}", response_model=Prompt)
 def get_prompt_route(prompt_id: int, token: str = Depends(verify_token)):
@@ -96,7 +123,7 @@ async def run_prompt(input_text: str, board_id: str, file: UploadFile, token: st
         # Read and process the uploaded file
         contents = await file.read()
         buffer = BytesIO(contents)
-        df = pd.read_csv(buffer)
+        df = await run_in_threadpool(pd.read_csv, buffer)
         buffer.close()
         file.file.close()
 
@@ -108,7 +135,7 @@ async def run_prompt(input_text: str, board_id: str, file: UploadFile, token: st
 
         if existing_response:
             # If response is already present, return the existing response
-            return JSONResponse(content=existing_response[3])
+            return JSONResponse(content=existing_response.prompt_out)
 
         llm = ChatOpenAI(temperature=0, model="gpt-4")
 
@@ -123,7 +150,8 @@ async def run_prompt(input_text: str, board_id: str, file: UploadFile, token: st
         instruction = get_query_instruction()
 
         prompt = instruction + input_text 
-        response_content = agent.run(prompt)
+        async with prompt_semaphore:
+            response_content = await agent.arun(prompt)
 
         #Remove special character
         response_content = re.sub(r"```|python|json", "",response_content, 0, re.MULTILINE)
@@ -145,7 +173,7 @@ async def run_prompt(input_text: str, board_id: str, file: UploadFile, token: st
         }
         
         # Save the response to the Prompt_response table
-        prompt_response_repository.save_response_to_database(hash_key, result)
+        await prompt_response_repository.save_response_to_database(hash_key, result)
         
         return JSONResponse(content=result)
     except Exception as e:
@@ -215,13 +243,15 @@ class RePromptService:
     
     
 
-    def run_re_prompt(self, input_text: str, board_id: str):
+    async def run_re_prompt(self, input_text: str, board_id: str):
         try:
-            combined_contents, dataframes_list, table_name_list = self.prompt_repository.get_file_download_links_by_board_id(board_id)
+            # Cached per file version: no file is read unless it changed
+            profiles = await run_in_threadpool(self.prompt_repository.get_board_profiles, board_id)
 
-            markdown_data = '\n'.join([df.head(5).to_markdown() for df in dataframes_list])
+            markdown_data = render_profiles(profiles)
             input_text = get_planner_instruction_with_data(input_text, markdown_data)
-            llm_output = self.llm_service.invoke(input_text)
+            async with prompt_semaphore:
+                llm_output = await self.llm_service.ainvoke(input_text)
             pattern = re.compile(r"[\s\S]*?Output:\s*.*", re.DOTALL)
             match = pattern.search(llm_output.content)
             
@@ -240,7 +270,7 @@ async def run_re_prompt(input_text: str, board_id: str, token: str = Depends(ver
     re_prompt_service = RePromptService(prompt_repository, ChatOpenAI(temperature=os.getenv("OPENAI_TEMPERATURE"), 
                      model=os.getenv("OPENAI_MINI_MODEL"),
                      top_p=os.getenv('OPENAI_TOP_P')))
-    return re_prompt_service.run_re_prompt(input_text, board_id)
+    return await re_prompt_service.run_re_prompt(input_text, board_id)
 
 class CustomJSONEncoder(json.JSONEncoder):
     def default(self, obj: Any) -> Any:
@@ -341,10 +371,10 @@ async def run_prompt_v1(input_text: str, board_id: str, use_cache: bool = True,
         combined_contents, dataframes_list, table_name_list = prompt_repository.get_file_download_links_by_board_id(board_id)
         hash_key = prompt_response_repository.generate_hash_key(combined_contents, input_text)
 
-        existing_response = await prompt_response_repository.check_existing_response(hash_key)
+        existing_response = await prompt_response_repository.check_existing_response(hash_key, record_hit=use_cache)
         if existing_response and use_cache:
             logger.info("Using the existing response")
-            return JSONResponse(content=existing_response[3])
+            return JSONResponse(content=existing_response.prompt_out)
 
         llm = ChatOpenAI(temperature=0, model="gpt-4")
         agent = Agent(dataframes_list, config={"llm": llm, "verbose": True, "enable_cache": False, "max_retries": 10})
@@ -406,9 +436,7 @@ def handle_response_content(response_content, input_text, llm):
 
     elif isinstance(response_content, pd.DataFrame):
         response_content = response_content.fillna(0).round(2)
-        ou = SmartDataframe(response_content, config={"llm": llm, "verbose": True, "enable_cache": False, "max_retries": 10})
-        response_content = ou.chat('''Sort the data on date column. After this format the date column as %b-%Y format''')
-        response_content = convert_timestamps_to_strings(response_content)
+        response_content = sort_and_format_dates(response_content, date_format="%b-%Y")
         response_content = {
             "message": [],
             "table": {
@@ -423,13 +451,8 @@ def handle_response_content(response_content, input_text, llm):
 def generate_graph_json(response_content: ResponseContent, llm) -> dict:
     try:
         if "columns" in response_content["table"] and len(response_content["table"]['data']):
-            llm = ChatOpenAI(temperature=0, model="gpt-3.5-turbo")
             graph_df = convert_table_to_dataframe(response_content["table"])
-            graph_instruction = get_graph_instruction()
-            graph_output = llm.invoke(graph_instruction + graph_df.to_markdown())
-            graph_output = re.sub(r'\bfalse\b', 'False', re.sub(r'\btrue\b', 'True', graph_output.content, flags=re.IGNORECASE), flags=re.IGNORECASE)
-            graph_output = re.sub(r"```|python|json", "", graph_output, 0, re.MULTILINE)
-            graph_output_json = eval(graph_output)
+            graph_output_json = build_charts(graph_df)
             logger.info("Graph Generation Success")
             return graph_output_json
     except Exception as ex:
@@ -447,14 +470,12 @@ class DataFrameProcessor:
                 df[column] = df[column].dt.strftime('%Y-%m-%d %H:%M:%S')
         return df
 
-    def sort_and_format_dates(self, df: pd.DataFrame) -> pd.DataFrame:
-        ou = SmartDataframe(df, config={"llm": self.llm, "verbose": True, "enable_cache": False, "max_retries": 10})
-        sorted_df = ou.chat('Please review the data.If there is any date column, then Sort the data by the date column and format the dates as %B-%Y.')
-        return self.convert_timestamps_to_strings(sorted_df)
+    def sort_and_format_dates(self, df: pd.DataFrame, sort: bool = True) -> pd.DataFrame:
+        return sort_and_format_dates(df, sort=sort)
 
-    def process_dataframe_response(self, response_content: pd.DataFrame) -> Dict[str, Union[str, Dict]]:
+    def process_dataframe_response(self, response_content: pd.DataFrame, sort_dates: bool = True) -> Dict[str, Union[str, Dict]]:
         response_content = response_content.fillna(0).round(2)
-        response_content = self.sort_and_format_dates(response_content)
+        response_content = self.sort_and_format_dates(response_content, sort=sort_dates)
         return {
             "message": [],
             "table": {
@@ -480,7 +501,30 @@ class PromptHandler:
         self.llm = ChatOpenAI(temperature=0, model=llm_model)
         self.dataframe_processor = DataFrameProcessor(llm_model=llm_model)
 
-    def run(self, input_text: str, dataframes_list: List[pd.DataFrame]) -> Dict[str, Any]:
+    def run(self, input_text: str, dataframes_list: List[pd.DataFrame], profiles: Optional[List[dict]] = None) -> Dict[str, Any]:
+        if QUERY_TEMPLATES_ENABLED:
+            # Simple aggregates are answered locally; the agent handles everything else
+            try:
+                template_result = answer_simple_prompt(input_text, dataframes_list)
+            except Exception as ex:
+                logger.warning(f"Query template failed, falling back to the agent: {ex}")
+                template_result = None
+            if template_result is not None:
+                return self.dataframe_processor.process_dataframe_response(
+                    template_result, sort_dates=not is_ranked(template_result)
+                )
+
+        if profiles and len(profiles) == len(dataframes_list):
+            # Describe each frame by its cached profile instead of letting pandasai sample it
+            dataframes_list = [
+                PandasConnector(
+                    {"original_df": df},
+                    name=profile["table"],
+                    custom_head=sample_frame(profile),
+                    field_descriptions={column["name"]: describe_column(column) for column in profile["columns"]}
+                )
+                for df, profile in zip(dataframes_list, profiles)
+            ]
         agent = Agent(dataframes_list, config={"llm": self.llm, "verbose": True, "enable_cache": False, "max_retries": 10})
         rephrased_query = agent.rephrase_query(input_text)
         response_content = agent.chat(rephrased_query)
@@ -540,19 +584,45 @@ class GraphGenerator:
     def __init__(self, llm_model: str):
         self.llm = ChatOpenAI(temperature=0, model=llm_model)
 
-    async def generate_graphs(self, response_content: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_graphs(self, response_content: Dict[str, Any], with_insights: bool = CHART_LLM_INSIGHTS) -> Dict[str, Any]:
+        """Build charts locally from the result table; optionally ask the LLM for insight text."""
         try:
             graph_df = convert_table_to_dataframe(response_content["table"])
-            graph_instruction = get_graph_instruction()
-            graph_output = self.llm.invoke(graph_instruction + graph_df.to_markdown())
-            graph_output = re.sub(r'\bfalse\b', 'False', re.sub(r'\btrue\b', 'True', graph_output.content, flags=re.IGNORECASE), flags=re.IGNORECASE)
-            graph_output = re.sub(r"```|python|json", "", graph_output, 0, re.MULTILINE)
-            graph_output_json = eval(graph_output)
-            return graph_output_json
+            graph_output_json = build_charts(graph_df)
         except Exception as ex:
             logger.error(f"Graph generation failed: {str(ex)}")
             return {}
 
+        if graph_output_json and with_insights:
+            insights = await self.generate_insights(graph_df)
+            if insights:
+                for chart in graph_output_json["charts"]:
+                    chart["insight"] = insights
+        return graph_output_json
+
+    async def generate_insights(self, graph_df: pd.DataFrame) -> List[str]:
+        try:
+            insight_output = await self.llm.ainvoke(get_chart_insight_instruction() + graph_df.head(50).to_markdown())
+            insight_output = re.sub(r"```|json", "", insight_output.content, 0, re.MULTILINE)
+            insights = json.loads(insight_output)
+            return [str(insight) for insight in insights] if isinstance(insights, list) else []
+        except Exception as ex:
+            logger.error(f"Chart insight generation failed: {str(ex)}")
+            return []
+
+class ResolvedKey(NamedTuple):
+    """Response hash key of a prompt and the board data version it was computed for."""
+    hash_key: str
+    dataframes: Optional[List[pd.DataFrame]]  # loaded already when content hashing needed them
+    scope: str  # identifies the board data; semantic matches must share it
+
+
+def encode_response(result: Dict[str, Any]) -> bytes:
+    """Encode a prompt response once, byte-for-byte as JSONResponse would render it."""
+    return json.dumps(result, cls=CustomJSONEncoder, ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
 class PromptFacade:
     def __init__(self):
         self.prompt_handler = PromptHandler(llm_model="gpt-4o-mini")
@@ -560,33 +630,220 @@ class PromptFacade:
         self.dataframe_processor = DataFrameProcessor(llm_model="gpt-4o-mini")
         self.generate_insights = GenerateInsightRecommendationOptimization(llm_model="gpt-4o-mini")
 
-    async def handle_prompt(self, input_text: str, board_id: str, user_name:str, use_cache: bool) -> Dict[str, Any]:
+    async def handle_prompt(self, input_text: str, board_id: str, user_name:str, use_cache: bool, verify_content: bool = False,
+                            chart_insights: bool = CHART_LLM_INSIGHTS, semantic: bool = SEMANTIC_CACHE_ENABLED,
+                            resolved: Optional[ResolvedKey] = None) -> Dict[str, Any]:
+        result = {}
+        async for event, payload in self.run_stages(input_text, board_id, user_name, use_cache, verify_content, chart_insights,
+                                                    semantic, resolved):
+            if event == "result":
+                result = payload
+        return result
+
+    async def handle_prompt_encoded(self, input_text: str, board_id: str, user_name: str, use_cache: bool,
+                                    verify_content: bool = False, chart_insights: bool = CHART_LLM_INSIGHTS,
+                                    semantic: bool = SEMANTIC_CACHE_ENABLED) -> bytes:
+        """``handle_prompt`` returning the encoded JSON body, answered from the per-worker L1 when possible."""
+        resolved = await self.resolve_hash_key(input_text, board_id, verify_content)
+        if use_cache:
+            body = response_cache.get(resolved.hash_key)
+            if body is not None:
+                return body
+
+        result = dict(await self.handle_prompt(input_text, board_id, user_name, use_cache, verify_content, chart_insights,
+                                               semantic, resolved=resolved))
+        semantic_status = result.pop("semantic_cache", None)
+        body = encode_response(result)
+        if semantic_status is None or not semantic_status["hit"]:
+            # Semantic hits stay out of the L1 so an exact repeat is checked against the database again
+            response_cache.put(resolved.hash_key, board_id, body)
+        if semantic_status is not None:
+            body = encode_response({**result, "semantic_cache": semantic_status})
+        return body
+
+    async def resolve_hash_key(self, input_text: str, board_id: str,
+                               verify_content: bool = False) -> ResolvedKey:
+        """Response cache key for a prompt, plus the loaded frames when content hashing needed them."""
+        if verify_content or PROMPT_CACHE_KEY_MODE == "content":
+            # Opt-in verification mode: key on the actual file contents
+            combined_contents, dataframes_list, table_name_list = await run_in_threadpool(
+                prompt_repository.get_file_download_links_by_board_id, board_id
+            )
+            return ResolvedKey(
+                prompt_response_repository.generate_hash_key(combined_contents, input_text),
+                dataframes_list,
+                hashlib.sha256(combined_contents).hexdigest()
+            )
+
+        board_fingerprint = await run_in_threadpool(prompt_repository.get_board_fingerprint, board_id)
+        return ResolvedKey(
+            prompt_response_repository.generate_metadata_hash_key(board_fingerprint, input_text),
+            None,
+            hashlib.sha256(f"metadata:v1\n{board_fingerprint}".encode()).hexdigest()
+        )
+
+    async def run_stages(self, input_text: str, board_id: str, user_name: str, use_cache: bool, verify_content: bool = False,
+                         chart_insights: bool = CHART_LLM_INSIGHTS, semantic: bool = SEMANTIC_CACHE_ENABLED,
+                         resolved: Optional[ResolvedKey] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run the prompt pipeline and yield ``(event, payload)`` pairs as each stage finishes.
+
+        Events are ``cache``, ``table``, ``charts``, ``timing`` and finally
+        ``result`` carrying the full response that ``handle_prompt`` returns.
+        With ``semantic`` enabled, a near-duplicate of an answered prompt reuses
+        its answer and the outcome is reported under ``semantic_cache``.
+        """
         start_time = datetime.now()
 
-        combined_contents, dataframes_list, table_name_list = prompt_repository.get_file_download_links_by_board_id(board_id)
-        hash_key = prompt_response_repository.generate_hash_key(combined_contents, input_text)
-        existing_response = await prompt_response_repository.check_existing_response(hash_key)
+        resolved = resolved or await self.resolve_hash_key(input_text, board_id, verify_content)
+        hash_key, dataframes_list = resolved.hash_key, resolved.dataframes
+        existing_response = await prompt_response_repository.check_existing_response(hash_key) if use_cache else None
 
-        if existing_response and use_cache:
-            return existing_response.prompt_out
+        if existing_response:
+            if semantic:
+                semantic_cache.add(board_id, resolved.scope, input_text, hash_key)
+            for stage in self.replay_stages(existing_response.prompt_out, {"hit": True}):
+                yield stage
+            return
+
+        semantic_status = None
+        if use_cache and semantic:
+            semantic_response, semantic_status = await self.find_semantic_match(board_id, resolved.scope, input_text)
+            if semantic_response is not None:
+                result = {**semantic_response.prompt_out, "semantic_cache": semantic_status}
+                for stage in self.replay_stages(result, {"hit": True, "semantic": semantic_status}):
+                    yield stage
+                return
+
+        # An identical prompt already running in this worker: wait for its result
+        shared_result = await prompt_single_flight.wait(hash_key)
+        if shared_result is not None:
+            for stage in self.replay_stages(shared_result, {"hit": False, "shared": True}):
+                yield stage
+            return
+
+        with prompt_single_flight.lead(hash_key) as flight:
+            async with cross_worker_lock(hash_key) as locked:
+                if locked and use_cache:
+                    # Another worker may have answered this prompt while we waited for the lock
+                    existing_response = await prompt_response_repository.check_existing_response(hash_key)
+                    if existing_response:
+                        flight.set_result(existing_response.prompt_out)
+                        for stage in self.replay_stages(existing_response.prompt_out, {"hit": True}):
+                            yield stage
+                        return
+
+                yield "cache", {"hit": False}
+
+                # Date phrases narrow the files to load; frames loaded for content hashing cover every month
+                month_years, months_used = await self.resolve_months(input_text, board_id, prune=dataframes_list is None)
+
+                # Simple aggregates are answered by DuckDB over the Parquet cache without loading any frame;
+                # once the months are pruned, their date phrases no longer get in the way of the templates
+                template_text = remove_time_phrases(input_text) if month_years is not None else input_text
+                response_content = (
+                    await self.answer_from_parquet(template_text, board_id, month_years) if dataframes_list is None else None
+                )
+
+                # Only the LLM pipeline is throttled; cache hits above never wait for a slot
+                async with prompt_semaphore:
+                    if response_content is None:
+                        if dataframes_list is None:
+                            _, dataframes_list, table_name_list = await run_in_threadpool(
+                                prompt_repository.get_file_download_links_by_board_id, board_id,
+                                with_contents=False, month_years=month_years
+                            )
+                        profiles = await self.load_profiles(board_id, month_years)
+
+                        # pandasai's Agent has no async API, so it runs on the threadpool
+                        response_content = await run_in_threadpool(self.prompt_handler.run, input_text, dataframes_list, profiles)
+                    yield "table", response_content
+
+                    if "columns" in response_content["table"] and len(response_content["table"]['data']):
+                        graph_output_json = await self.graph_generator.generate_graphs(response_content, with_insights=chart_insights)
+                        #response_content = self.dataframe_processor.process_dataframe_add_prefix(response_content)
+                        #generate_questions = self.generate_insights.generate_questions(response_content)
+                        #insights_dict = self.generate_insights.answer_questions(generate_questions, response_content)
+                    else:
+                        graph_output_json = {}
+                    yield "charts", graph_output_json
+
+                end_time = datetime.now() 
+                result = self.create_response(start_time, end_time, board_id, input_text, response_content, graph_output_json)
+                # Save the response to the Prompt_response table
+                result["user_name"] = user_name
+                result["month_years"] = months_used
+                await prompt_response_repository.save_response_to_database(hash_key, result)
+                flight.set_result(result)
+                if semantic:
+                    semantic_cache.add(board_id, resolved.scope, input_text, hash_key)
+
+        if semantic_status is not None:
+            result = {**result, "semantic_cache": semantic_status}
+        yield "timing", {key: result[key] for key in TIMING_FIELDS}
+        yield "result", result
+
+    async def resolve_months(self, input_text: str, board_id: str, prune: bool = True) -> Tuple[Optional[List[str]], List[str]]:
+        """Months to load for a prompt (None for all) and the months the answer is based on."""
+        known = await run_in_threadpool(prompt_repository.get_board_month_years, board_id)
+        month_years = select_months(input_text, known) if prune and MONTH_PRUNING_ENABLED else None
+        return month_years, month_years or order_month_years(known)
+
+    async def answer_from_parquet(self, input_text: str, board_id: str,
+                                  month_years: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Template answer computed in DuckDB, or None when the prompt needs the agent."""
+        if not (QUERY_TEMPLATES_ENABLED and DUCKDB_ENABLED):
+            return None
+
+        def answer() -> Optional[Dict[str, Any]]:
+            table_files = prompt_repository.get_board_parquet_files(board_id, month_years)
+            with BoardQueryEngine(table_files) as engine:
+                result = answer_simple_prompt_sql(input_text, engine)
+            if result is None:
+                return None
+            return self.dataframe_processor.process_dataframe_response(result, sort_dates=not is_ranked(result))
 
-        response_content = self.prompt_handler.run(input_text, dataframes_list)
+        try:
+            return await run_in_threadpool(answer)
+        except Exception as ex:
+            logger.warning(f"DuckDB template answer failed for board {board_id}, using the agent: {ex}")
+            return None
 
-        if "columns" in response_content["table"] and len(response_content["table"]['data']):
-            graph_output_json = await self.graph_generator.generate_graphs(response_content)
-            #response_content = self.dataframe_processor.process_dataframe_add_prefix(response_content)
-            #generate_questions = self.generate_insights.generate_questions(response_content)
-            #insights_dict = self.generate_insights.answer_questions(generate_questions, response_content)
-        else:
-            graph_output_json = {}
+    async def load_profiles(self, board_id: str, month_years: Optional[List[str]] = None) -> Optional[List[dict]]:
+        """Cached data profiles for the agent; the agent falls back to sampling frames without them."""
+        if not AGENT_DATA_PROFILES:
+            return None
+        try:
+            return await run_in_threadpool(prompt_repository.get_board_profiles, board_id, month_years)
+        except Exception as ex:
+            logger.error(f"Data profiles unavailable for board {board_id}: {ex}")
+            return None
+
+    async def find_semantic_match(self, board_id: str, scope: str,
+                                  input_text: str) -> Tuple[Optional[PromptResponse], Dict[str, Any]]:
+        """Cached response of the closest answered prompt on the same board data, with hit/miss metadata."""
+        match = semantic_cache.nearest(board_id, scope, input_text)
+        status = {
+            "hit": False,
+            "similarity": round(match.similarity, 4) if match else None,
+            "threshold": semantic_cache.threshold,
+        }
+        if match is None or match.similarity < semantic_cache.threshold:
+            return None, status
 
-        end_time = datetime.now() 
-        result = self.create_response(start_time, end_time, board_id, input_text, response_content, graph_output_json)
-        # Save the response to the Prompt_response table
-        result["user_name"] = user_name
-        await prompt_response_repository.save_response_to_database(hash_key, result)
-        
-        return result
+        response = await prompt_response_repository.check_existing_response(match.hash_key)
+        if response is not None:
+            status.update({"hit": True, "matched_prompt": match.prompt_text})
+        return response, status
+
+    @staticmethod
+    def replay_stages(result: Dict[str, Any], cache_status: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stage events for a response that was already computed (cache hit or a coalesced run)."""
+        yield "cache", cache_status
+        yield "table", {key: result[key] for key in ("message", "table") if key in result}
+        yield "charts", {"charts": result["charts"]} if "charts" in result else {}
+        yield "timing", {key: result[key] for key in TIMING_FIELDS if key in result}
+        yield "result", result
 
     def create_response(self, start_time: datetime, end_time: datetime, board_id: str, input_text: str, 
                         response_content: Dict[str, Any], graph_output_json: Dict[str, Any]) -> Dict[str, Any]:  
@@ -605,21 +862,50 @@ class PromptFacade:
         
         return result
 
+# Fields of create_response reported by the streaming endpoint's final "timing" event
+TIMING_FIELDS = ("status_code", "detail", "start_time", "end_time", "duration_seconds", "board_id", "prompt_text")
+
+
+def format_sse(event: str, payload: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, cls=CustomJSONEncoder)}\n\n"
+
+
 @router.post("/run_prompt_v2")
 async def run_prompt_v2(
     input_text: str, 
     board_id: str, 
     user_name: str = '', 
     use_cache: bool = True, 
+    verify_content: bool = False,
+    chart_insights: bool = CHART_LLM_INSIGHTS,
+    semantic_cache: bool = SEMANTIC_CACHE_ENABLED,
+    async_job: bool = False,
     token: str = Depends(verify_token)
 ):
     """
     API endpoint to run prompt, validate, generate graphs, and extract insights.
+
+    The response cache is keyed on board file metadata by default; pass
+    ``verify_content=true`` to key on the file contents instead. Charts are
+    built locally; ``chart_insights=true`` adds LLM-written insight text.
+    ``semantic_cache=true`` also reuses answers of near-duplicate prompts and
+    reports the outcome under ``semantic_cache`` in the response.
+    With ``async_job=true`` the prompt runs in the background and a job id is
+    returned immediately; poll ``/prompts/jobs/{job_id}`` for the result.
     """
     try:
         facade = PromptFacade()
-        result = await facade.handle_prompt(input_text, board_id, user_name, use_cache)
-        return JSONResponse(content=json.loads(json.dumps(result, cls=CustomJSONEncoder)))
+        if async_job:
+            resolved = await facade.resolve_hash_key(input_text, board_id, verify_content)
+            job = prompt_job_manager.submit(
+                resolved.hash_key, board_id, input_text,
+                lambda: facade.handle_prompt(input_text, board_id, user_name, use_cache, verify_content, chart_insights,
+                                             semantic_cache, resolved=resolved)
+            )
+            return JSONResponse(status_code=202, content=job.to_status())
+        body = await facade.handle_prompt_encoded(input_text, board_id, user_name, use_cache, verify_content, chart_insights,
+                                                  semantic_cache)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         # Log the error
         # Return an error response
@@ -627,3 +913,62 @@ async def run_prompt_v2(
             status_code=500,
             content={"error": f"Failed to process prompt: {str(e)}"}
         )
+
+
+@router.get("/jobs/{job_id}")
+async def get_prompt_job(job_id: str, token: str = Depends(verify_token)):
+    """Status of a background prompt job started with ``run_prompt_v2?async_job=true``."""
+    job = prompt_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Prompt job not found")
+    return job.to_status()
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_prompt_job_result(job_id: str, token: str = Depends(verify_token)):
+    """Result of a finished background prompt job, in the same shape as ``run_prompt_v2``."""
+    job = prompt_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Prompt job not found")
+    if not job.done:
+        raise HTTPException(status_code=409, detail=f"Prompt job is still {job.status}")
+    if job.error is not None:
+        return JSONResponse(status_code=500, content={"error": f"Failed to process prompt: {job.error}"})
+    return JSONResponse(content=json.loads(json.dumps(job.result, cls=CustomJSONEncoder)))
+
+
+@router.post("/run_prompt_v2/stream")
+async def run_prompt_v2_stream(
+    input_text: str,
+    board_id: str,
+    user_name: str = '',
+    use_cache: bool = True,
+    verify_content: bool = False,
+    chart_insights: bool = CHART_LLM_INSIGHTS,
+    semantic_cache: bool = SEMANTIC_CACHE_ENABLED,
+    token: str = Depends(verify_token)
+):
+    """
+    Server-sent events variant of ``run_prompt_v2``.
+
+    Emits ``cache`` (hit/miss), ``table``, ``charts`` and a final ``timing``
+    event as each pipeline stage finishes; failures are reported as an
+    ``error`` event.
+    """
+    async def event_stream():
+        try:
+            facade = PromptFacade()
+            async for event, payload in facade.run_stages(input_text, board_id, user_name, use_cache, verify_content,
+                                                          chart_insights, semantic_cache):
+                if event != "result":
+                    yield format_sse(event, payload)
+        except Exception as e:
+            logger.error(f"Streaming prompt failed: {e}")
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield format_sse("error", {"error": f"Failed to process prompt: {detail}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
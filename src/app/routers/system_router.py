@@ -0,0 +1,54 @@
+# app/routers/system_router.py
+from typing import List
+from fastapi import APIRouter, Depends
+from app.database import get_pool_metrics
+from app.authentication import verify_token
+from app.concurrency import run_in_threadpool
+from app.dependencies import get_prompt_response_repository
+from app.models.prompt_response import PromptCachePolicyUpdate
+from app.repositories.prompt_repository import PromptResponseRepository
+from app.repositories.response_cache import response_cache
+
+router = APIRouter(prefix="/system", tags=["System"])
+
+@router.get("/db-pool", response_model=List[dict])
+async def get_db_pool_metrics(token: str = Depends(verify_token)):
+    """Connection pool usage for every engine registered in this worker."""
+    return get_pool_metrics()
+
+
+@router.get("/prompt-cache", response_model=dict)
+async def get_prompt_cache_stats(
+    repository: PromptResponseRepository = Depends(get_prompt_response_repository),
+    token: str = Depends(verify_token)
+):
+    """Response cache size, budgets and this worker's hit rate (database and in-memory L1)."""
+    stats = await run_in_threadpool(repository.cache_stats)
+    stats["l1"] = response_cache.stats()
+    return stats
+
+@router.post("/prompt-cache/compact", response_model=dict)
+async def compact_prompt_cache(
+    repository: PromptResponseRepository = Depends(get_prompt_response_repository),
+    token: str = Depends(verify_token)
+):
+    """Run a compaction pass now instead of waiting for the background task."""
+    return await run_in_threadpool(repository.compact)
+
+@router.get("/prompt-cache/boards/{board_id}", response_model=dict)
+async def get_prompt_cache_policy(
+    board_id: int,
+    repository: PromptResponseRepository = Depends(get_prompt_response_repository),
+    token: str = Depends(verify_token)
+):
+    return await run_in_threadpool(repository.get_cache_policy, board_id)
+
+@router.put("/prompt-cache/boards/{board_id}", response_model=dict)
+async def set_prompt_cache_policy(
+    board_id: int,
+    policy: PromptCachePolicyUpdate,
+    repository: PromptResponseRepository = Depends(get_prompt_response_repository),
+    token: str = Depends(verify_token)
+):
+    """Set a board's response TTL in seconds (null falls back to the default, 0 never expires)."""
+    return await run_in_threadpool(repository.set_cache_policy, board_id, policy.ttl_seconds)
@@ -0,0 +1,61 @@
+# app/services/board_query_engine.py
+"""
+Embedded DuckDB over the Parquet frame cache of a board.
+
+Each table of the board becomes a view over its cached Parquet files (one per
+uploaded month, unioned by column name). Queries scan only the columns and
+row groups they need, and DuckDB spills to disk past DUCKDB_MEMORY_LIMIT, so
+aggregates over large boards never materialise the full frames in pandas.
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+import duckdb
+import pandas as pd
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+DUCKDB_ENABLED = os.getenv("DUCKDB_ENABLED", "true").lower() == "true"
+DUCKDB_MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT", "512MB")
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", "2"))
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class BoardQueryEngine:
+    """
+    In-memory DuckDB connection with one view per board table.
+
+    Connections are cheap and not shared between threads; create one per
+    request and close it (or use it as a context manager) when done.
+    """
+
+    def __init__(self, table_files: Dict[str, List[str]]):
+        self.connection = duckdb.connect(config={"memory_limit": DUCKDB_MEMORY_LIMIT, "threads": DUCKDB_THREADS})
+        self.tables = list(table_files)
+        for table_name, paths in table_files.items():
+            path_list = ", ".join("'" + path.replace("'", "''") + "'" for path in paths)
+            self.connection.execute(
+                f"CREATE VIEW {quote_identifier(table_name)} AS "
+                f"SELECT * FROM read_parquet([{path_list}], union_by_name = true, hive_partitioning = false)"
+            )
+
+    def query(self, sql: str, parameters: Optional[List[Any]] = None) -> pd.DataFrame:
+        return self.connection.execute(sql, parameters or []).df()
+
+    def sample(self, table_name: str, rows: int = 100) -> pd.DataFrame:
+        """First rows of a table; enough to read its columns, dtypes and date formats."""
+        return self.query(f"SELECT * FROM {quote_identifier(table_name)} LIMIT {int(rows)}")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "BoardQueryEngine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
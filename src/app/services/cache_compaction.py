@@ -0,0 +1,31 @@
+# app/services/cache_compaction.py
+"""
+Background compaction of the prompt response cache.
+
+Started from the FastAPI lifespan; every PROMPT_CACHE_COMPACT_INTERVAL_SECONDS
+it drops expired responses and evicts least recently used ones beyond the
+PROMPT_CACHE_MAX_ROWS / PROMPT_CACHE_MAX_BYTES budgets (0 disables the loop).
+"""
+import asyncio
+import os
+from loguru import logger
+from dotenv import load_dotenv
+from app.concurrency import run_in_threadpool
+from app.repositories.prompt_repository import PromptResponseRepository
+
+# Load environment variables from .env file
+load_dotenv()
+
+PROMPT_CACHE_COMPACT_INTERVAL_SECONDS = int(os.getenv("PROMPT_CACHE_COMPACT_INTERVAL_SECONDS", "600"))
+
+
+async def run_cache_compaction(repository: PromptResponseRepository,
+                               interval_seconds: int = PROMPT_CACHE_COMPACT_INTERVAL_SECONDS) -> None:
+    """Compact the response cache forever, sleeping ``interval_seconds`` between passes."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(repository.compact)
+        except Exception as e:
+            # A failed pass (e.g. database restart) must not stop later ones
+            logger.error(f"Prompt response cache compaction failed: {e}")
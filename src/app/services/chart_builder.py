@@ -0,0 +1,163 @@
+# app/services/chart_builder.py
+"""
+Rule-based chart builder.
+
+Builds the ``charts`` payload described in ``get_graph_instruction`` directly
+from a result DataFrame, using column dtypes and cardinality instead of an LLM:
+
+- a time-like label column produces a line chart (plus a bar chart),
+- a few labels with a non-negative first measure add a pie chart of it,
+- everything else gets a bar chart; bars are grouped side by side and only
+  stacked when the measures are shares of one total (each row sums to 1 or 100).
+"""
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+PIE_MAX_SLICES = 8
+MAX_LABELS = 50
+DATE_SAMPLE_SIZE = 20
+SHARE_TOTALS = (1.0, 100.0)
+SHARE_TOLERANCE = 0.01  # relative
+
+_MONTH_NAMES = {
+    "jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec",
+    "january", "february", "march", "april", "june", "july", "august", "september",
+    "october", "november", "december",
+}
+
+
+def _is_time_like(series: pd.Series) -> bool:
+    """True for datetime columns and text columns whose values parse as dates or months."""
+    if pd.api.types.is_datetime64_any_dtype(series) or isinstance(series.dtype, pd.PeriodDtype):
+        return True
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return False
+
+    sample = series.dropna().astype(str).head(DATE_SAMPLE_SIZE)
+    if sample.empty:
+        return False
+    if sample.str.lower().str.split(r"[\s\-/]").str[0].isin(_MONTH_NAMES).all():
+        return True
+    parsed = pd.to_datetime(sample, errors="coerce")
+    return parsed.notna().all()
+
+
+def _to_number(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return 0
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return round(float(value), 2)
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def _split_columns(df: pd.DataFrame):
+    """Pick the label column and the numeric measure columns of a result table."""
+    numeric_columns = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    other_columns = [c for c in df.columns if c not in numeric_columns]
+
+    label_column: Optional[str] = None
+    for column in other_columns:
+        if _is_time_like(df[column]):
+            label_column = column
+            break
+    if label_column is None and other_columns:
+        label_column = other_columns[0]
+    if label_column is None and len(numeric_columns) > 1:
+        # All-numeric table: treat the first column (e.g. a year) as the label
+        label_column = numeric_columns[0]
+
+    measures = [c for c in numeric_columns if c != label_column]
+    return label_column, measures
+
+
+def _are_shares(df: pd.DataFrame, measures: List[str]) -> bool:
+    """True when several non-negative measures split one total, e.g. percentages per row."""
+    if len(measures) < 2:
+        return False
+    values = df[measures].fillna(0)
+    if not (values >= 0).all().all():
+        return False
+    row_totals = values.sum(axis=1)
+    return any(
+        bool(np.isclose(row_totals, total, rtol=SHARE_TOLERANCE).all()) for total in SHARE_TOTALS
+    )
+
+
+def _chart(chart_type: str, labels: List[str], categories: List[str], values: List[Any],
+           is_stacked: bool, insight: List[str]) -> Dict[str, Any]:
+    return {
+        "chart_type": chart_type,
+        "data_format": {
+            "labels": labels,
+            "categories": categories,
+            "values": values,
+            "isStacked": is_stacked
+        },
+        "insight": insight
+    }
+
+
+def _describe(df: pd.DataFrame, label_column: str, measures: List[str], time_like: bool) -> List[str]:
+    """Short deterministic insights: extremes per measure and, for time series, the overall change."""
+    insights = []
+    for measure in measures[:3]:
+        column = df[measure]
+        if column.empty:
+            continue
+        top = column.idxmax()
+        insights.append(f"Highest {measure}: {df.at[top, label_column]} ({_to_number(column[top])}).")
+        if time_like and len(column) > 1:
+            first, last = _to_number(column.iloc[0]), _to_number(column.iloc[-1])
+            if first:
+                change = (last - first) / abs(first) * 100
+                insights.append(
+                    f"{measure} moved from {first} to {last} ({change:+.1f}%) between "
+                    f"{df[label_column].iloc[0]} and {df[label_column].iloc[-1]}."
+                )
+    return insights
+
+
+def build_charts(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Build the ``{"charts": [...]}`` payload for a result table.
+
+    Returns an empty dict when the table has nothing to plot (no rows or no
+    numeric measure).
+    """
+    if df is None or df.empty:
+        return {}
+
+    df = df.reset_index(drop=True)
+    label_column, measures = _split_columns(df)
+    if label_column is None or not measures:
+        return {}
+
+    time_like = _is_time_like(df[label_column])
+    if not time_like and len(df) > MAX_LABELS:
+        # Too many categories to read: keep the largest ones
+        df = df.nlargest(MAX_LABELS, measures[0]).reset_index(drop=True)
+
+    labels = df[label_column].astype(str).tolist()
+    rows = [[_to_number(v) for v in row] for row in df[measures].itertuples(index=False, name=None)]
+    is_stacked = _are_shares(df, measures)
+    insight = _describe(df, label_column, measures, time_like)
+
+    charts = []
+    if time_like:
+        charts.append(_chart("line", labels, measures, rows, False, insight))
+        charts.append(_chart("bar", labels, measures, rows, is_stacked, insight))
+    else:
+        charts.append(_chart("bar", labels, measures, rows, is_stacked, insight))
+
+    # The pie shows the primary measure, the one the table is ranked by
+    pie_measure = df[measures[0]].fillna(0)
+    if len(labels) <= PIE_MAX_SLICES and (pie_measure >= 0).all() and pie_measure.sum() > 0:
+        pie_values = [_to_number(v) for v in df[measures[0]].tolist()]
+        charts.append(_chart("pie", labels, [measures[0]], pie_values, False, insight))
+
+    return {"charts": charts}
@@ -0,0 +1,130 @@
+# app/services/data_profile.py
+"""
+Compact data profiles of board files for LLM prompts.
+
+A profile lists each column's dtype, cardinality, null count and range (or
+most frequent values with their counts) plus a few representative rows.
+Each column also carries a HyperLogLog sketch so distinct counts can be
+merged across files. Its size depends on the number of columns, not rows, so
+prompts built from profiles stay the same length as board data grows.
+Profiles are plain JSON; they are computed at upload time and stored with
+the TableStatus row, and cached per file version by the frame cache for
+files uploaded before that.
+"""
+import json
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from app.services.sketches import HyperLogLog
+
+PROFILE_VERSION = 2
+SAMPLE_ROWS = 3
+TOP_VALUES = 5
+
+
+def _scalar(value: Any) -> Any:
+    """JSON-safe scalar for numpy/pandas values."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, (int, bool, str)):
+        return value
+    return str(value)
+
+
+def _column_profile(series: pd.Series) -> Dict[str, Any]:
+    non_null = series.dropna()
+    profile = {
+        "name": str(series.name),
+        "dtype": str(series.dtype),
+        "distinct": int(non_null.nunique()),
+        "nulls": int(len(series) - len(non_null)),
+        "null_ratio": round(1 - len(non_null) / len(series), 4) if len(series) else 0.0,
+        "hll": HyperLogLog().add_series(non_null).to_base64(),
+    }
+    if non_null.empty:
+        return profile
+
+    if pd.api.types.is_bool_dtype(series):
+        _add_top_values(profile, non_null.value_counts())
+    elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+        profile["min"] = _scalar(non_null.min())
+        profile["max"] = _scalar(non_null.max())
+        if pd.api.types.is_numeric_dtype(series):
+            profile["mean"] = _scalar(non_null.mean())
+    else:
+        _add_top_values(profile, non_null.astype(str).value_counts())
+    return profile
+
+
+def _add_top_values(profile: Dict[str, Any], counts: pd.Series) -> None:
+    top = counts.iloc[:TOP_VALUES]
+    profile["top"] = [_scalar(v) for v in top.index]
+    profile["top_counts"] = [int(count) for count in top]
+
+
+def _representative_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """First, middle and last rows: cheap, deterministic and spread across the file."""
+    if len(df) <= SAMPLE_ROWS:
+        return df
+    positions = sorted({0, len(df) // 2, len(df) - 1})
+    return df.iloc[positions]
+
+
+def build_profile(df: pd.DataFrame, table_name: str) -> Dict[str, Any]:
+    sample = _representative_rows(df)
+    return {
+        "profile_version": PROFILE_VERSION,
+        "table": table_name,
+        "rows": int(len(df)),
+        "columns": [_column_profile(df[column]) for column in df.columns],
+        "sample": {
+            "columns": [str(column) for column in sample.columns],
+            "data": json.loads(sample.to_json(orient="values", date_format="iso")),
+        },
+    }
+
+
+def merged_distinct(columns: List[Dict[str, Any]]) -> int:
+    """Estimated distinct count of one column across several files' profiles."""
+    sketches = [HyperLogLog.from_base64(column["hll"]) for column in columns if column.get("hll")]
+    if not sketches:
+        return max((column["distinct"] for column in columns), default=0)
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged = merged.merge(sketch)
+    return merged.estimate()
+
+
+def describe_column(column: Dict[str, Any]) -> str:
+    """One-line summary of a profiled column, e.g. ``int64; 12 distinct; 0.0% null; 1 to 9``."""
+    parts = [column["dtype"], f"{column['distinct']} distinct", f"{column['null_ratio']:.1%} null"]
+    if "min" in column:
+        parts.append(f"{column['min']} to {column['max']}")
+    if column.get("top"):
+        parts.append("e.g. " + ", ".join(str(value) for value in column["top"]))
+    return "; ".join(parts)
+
+
+def sample_frame(profile: Dict[str, Any]) -> pd.DataFrame:
+    return pd.DataFrame(profile["sample"]["data"], columns=profile["sample"]["columns"])
+
+
+def render_profiles(profiles: List[Dict[str, Any]]) -> str:
+    """Markdown rendering of profiles for planner and agent prompts."""
+    sections = []
+    for profile in profiles:
+        columns = pd.DataFrame(
+            [(column["name"], describe_column(column)) for column in profile["columns"]],
+            columns=["column", "profile"]
+        )
+        sections.append(
+            f"Table {profile['table']} ({profile['rows']} rows)\n"
+            f"{columns.to_markdown(index=False)}\n"
+            f"Sample rows:\n{sample_frame(profile).to_markdown(index=False)}"
+        )
+    return "\n\n".join(sections)
@@ -0,0 +1,170 @@
+# app/services/date_formatting.py
+"""
+Local date-column detection, sorting and formatting for result tables.
+
+Replaces the SmartDataframe round trip that asked the LLM to "sort the data by
+the date column and format the dates as %B-%Y". Detection inspects dtypes and
+parses a small sample of text columns; the full column is then parsed once
+per distinct value, so large results with few distinct dates stay cheap.
+"""
+import re
+import warnings
+from typing import Optional
+import pandas as pd
+
+DATE_SAMPLE_SIZE = 50
+MIN_PARSED_RATIO = 0.9
+DEFAULT_DATE_FORMAT = "%B-%Y"
+
+MONTH_ORDER = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+_YEAR_ONLY = re.compile(r"^\d{4}$")
+# Quarter, half-year, fiscal-year and week labels ("2024-Q1", "Q1 2024", "FY24", "H2-2023", "2024-W05")
+# would parse to their first month and lose their meaning as %B-%Y
+_PERIOD_LABEL = re.compile(
+    r"(?i)^(?:(?:\d{2}|\d{4})[\s'/-]*(?:q[1-4]|h[12]|w\d{1,2})|(?:q[1-4]|h[12]|w\d{1,2})[\s'/-]*(?:\d{2}|\d{4})|fy[\s'/-]*\d{2,4}(?:[\s/-]*\d{2,4})?)$"
+)
+# Period columns coarser than a month (quarters, years) are left as they are
+_COARSE_PERIOD_FREQS = ("Q", "A", "Y")
+_HAS_DIGIT = re.compile(r"\d")
+_DIRECTIVE = re.compile(r"%(.)")
+_MONTH_DIRECTIVES = {"B", "b", "m", "Y", "y"}
+
+
+def _month_number(value: str) -> Optional[int]:
+    """Month number for bare month names such as ``Jan`` or ``September``."""
+    return MONTH_ORDER.get(str(value).strip().lower()[:3]) if str(value).strip().isalpha() else None
+
+
+def _local_wall_time(parsed: pd.Series) -> pd.Series:
+    """
+    Drop UTC offsets while keeping each value's own wall time.
+
+    ``2024-03-01T00:00:00+05:30`` belongs to March; converting it to UTC
+    first would file it under February.
+    """
+    if isinstance(parsed.dtype, pd.DatetimeTZDtype):
+        return parsed.dt.tz_localize(None)
+    if pd.api.types.is_object_dtype(parsed):
+        # Mixed offsets (or offsets mixed with naive values) come back as datetime objects
+        return pd.to_datetime(parsed.map(
+            lambda value: value.replace(tzinfo=None) if getattr(value, "tzinfo", None) else value
+        ), errors="coerce")
+    return parsed
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    """Parse text dates once per distinct value and broadcast back to the column."""
+    codes, uniques = pd.factorize(values)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed_uniques = _local_wall_time(pd.to_datetime(pd.Series(uniques, dtype=object).astype(str), errors="coerce"))
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    mask = codes >= 0
+    parsed[mask] = parsed_uniques.to_numpy()[codes[mask]]
+    return parsed
+
+
+def _format_dates(parsed: pd.Series, date_format: str) -> pd.Series:
+    """Format each distinct timestamp once and broadcast back to the column."""
+    if set(_DIRECTIVE.findall(date_format)) <= _MONTH_DIRECTIVES:
+        # Month-level formats only need one string per calendar month
+        parsed = pd.Series(parsed.to_numpy().astype("datetime64[M]"), index=parsed.index)
+    codes, uniques = pd.factorize(parsed)
+    formatted_uniques = pd.DatetimeIndex(uniques).strftime(date_format).to_numpy(dtype=object)
+    formatted = pd.Series(None, index=parsed.index, dtype=object)
+    mask = codes >= 0
+    formatted[mask] = formatted_uniques[codes[mask]]
+    return formatted
+
+
+def is_month_name_column(series: pd.Series) -> bool:
+    """True when every sampled value is a bare month name (no year)."""
+    sample = series.dropna().head(DATE_SAMPLE_SIZE)
+    return not sample.empty and all(_month_number(v) is not None for v in sample)
+
+
+def is_date_like(series: pd.Series) -> bool:
+    """True for datetime columns and text columns whose sampled values parse as dates."""
+    if isinstance(series.dtype, pd.PeriodDtype):
+        return not series.dtype.freq.freqstr.startswith(_COARSE_PERIOD_FREQS)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return True
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return False
+
+    sample = series.dropna().astype(str).str.strip().head(DATE_SAMPLE_SIZE)
+    if sample.empty:
+        return False
+    if is_month_name_column(sample):
+        return True
+    if sample.str.match(_PERIOD_LABEL).any():
+        return False
+    # Plain years and free text without digits are not treated as dates
+    if sample.str.match(_YEAR_ONLY).all() or not sample.str.contains(_HAS_DIGIT).all():
+        return False
+    return _parse_dates(sample).notna().mean() >= MIN_PARSED_RATIO
+
+
+def detect_date_column(df: pd.DataFrame) -> Optional[str]:
+    """Return the first date-like column, preferring real datetime dtypes."""
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            return column
+    for column in df.columns:
+        if is_date_like(df[column]):
+            return column
+    return None
+
+
+def parse_date_column(column: pd.Series) -> pd.Series:
+    """Timestamps of a date-like column; values that do not parse become NaT."""
+    if isinstance(column.dtype, pd.PeriodDtype):
+        return column.dt.to_timestamp()
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return _local_wall_time(column)
+    return _parse_dates(column)
+
+
+def convert_timestamps_to_strings(df: pd.DataFrame) -> pd.DataFrame:
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime('%Y-%m-%d %H:%M:%S')
+    return df
+
+
+def sort_and_format_dates(df: pd.DataFrame, date_format: str = DEFAULT_DATE_FORMAT, sort: bool = True) -> pd.DataFrame:
+    """
+    Sort a result table by its date column and format that column with ``date_format``.
+
+    Tables without a date column are returned unchanged (apart from remaining
+    timestamp columns being rendered as strings). Values that do not parse keep
+    their original text and sort last. With ``sort=False`` the rows keep their
+    order (e.g. a ranking) and only the dates are formatted.
+    """
+    date_column = detect_date_column(df)
+    if date_column is None:
+        return convert_timestamps_to_strings(df)
+
+    df = df.copy()
+    column = df[date_column]
+    if is_month_name_column(column):
+        if not sort:
+            return convert_timestamps_to_strings(df)
+        order = column.map(_month_number).reset_index(drop=True)
+        df = df.iloc[order.sort_values(kind="stable", na_position="last").index].reset_index(drop=True)
+        return convert_timestamps_to_strings(df)
+
+    parsed = parse_date_column(column).reset_index(drop=True)
+    df = df.reset_index(drop=True)
+    if sort:
+        order = parsed.sort_values(kind="stable", na_position="last").index
+        df = df.iloc[order].reset_index(drop=True)
+        parsed = parsed.iloc[order].reset_index(drop=True)
+
+    formatted = _format_dates(parsed, date_format)
+    df[date_column] = formatted.where(parsed.notna(), df[date_column].astype(object))
+    return convert_timestamps_to_strings(df)
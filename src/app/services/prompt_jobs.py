@@ -0,0 +1,117 @@
+# app/services/prompt_jobs.py
+"""
+In-process background jobs for long prompt runs.
+
+``run_prompt_v2`` in job mode returns a job id straight away and the prompt
+pipeline runs as an asyncio task on the worker's event loop (its LLM work is
+still throttled by ``prompt_semaphore``). Submissions whose response hash key
+matches a job that is still queued or running are attached to that job.
+
+Jobs live in the memory of one worker process, so clients must poll the same
+worker (sticky sessions) when several workers are deployed.
+"""
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+from loguru import logger
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Finished jobs (and their results) are kept this long for polling clients
+PROMPT_JOB_TTL_SECONDS = int(os.getenv("PROMPT_JOB_TTL_SECONDS", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class PromptJob:
+    job_id: str
+    hash_key: str
+    board_id: str
+    prompt_text: str
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_status(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "board_id": self.board_id,
+            "prompt_text": self.prompt_text,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class PromptJobManager:
+    def __init__(self, ttl_seconds: int = PROMPT_JOB_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, PromptJob] = {}
+        self._in_flight: Dict[str, str] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, hash_key: str, board_id: str, prompt_text: str,
+               run: Callable[[], Awaitable[Dict[str, Any]]]) -> PromptJob:
+        """Start ``run`` as a background job, or return the in-flight job for the same hash key."""
+        self._prune()
+        job_id = self._in_flight.get(hash_key)
+        if job_id is not None:
+            logger.info(f"Prompt job {job_id} already running for this prompt; attaching")
+            return self._jobs[job_id]
+
+        job = PromptJob(job_id=uuid.uuid4().hex, hash_key=hash_key, board_id=board_id, prompt_text=prompt_text)
+        self._jobs[job.job_id] = job
+        self._in_flight[hash_key] = job.job_id
+        self._tasks[job.job_id] = asyncio.create_task(self._execute(job, run))
+        return job
+
+    def get(self, job_id: str) -> Optional[PromptJob]:
+        return self._jobs.get(job_id)
+
+    async def _execute(self, job: PromptJob, run: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = await run()
+            job.status = SUCCEEDED
+        except Exception as e:
+            logger.error(f"Prompt job {job.job_id} failed: {e}")
+            job.error = str(getattr(e, "detail", e))
+            job.status = FAILED
+        except BaseException as e:
+            # Cancellation (e.g. worker shutdown) is not an Exception; pollers must still see the job end
+            logger.warning(f"Prompt job {job.job_id} was interrupted: {e!r}")
+            job.error = "cancelled" if isinstance(e, asyncio.CancelledError) else repr(e)
+            job.status = FAILED
+            raise
+        finally:
+            job.finished_at = time.time()
+            self._in_flight.pop(job.hash_key, None)
+            self._tasks.pop(job.job_id, None)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+prompt_job_manager = PromptJobManager()
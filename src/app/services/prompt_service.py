@@ -14,6 +14,8 @@ from app.repositories.prompt_repository import PromptRepository, PromptResponseR
 from app.repositories.data_management_table_repository import DataManagementTableRepository  # Import
 from app.instructions import get_query_instruction, get_graph_instruction, get_planner_instruction, get_planner_instruction_with_data
 from app.utils import CustomJSONEncoder  # Assuming you have this utility class
+from app.services.chart_builder import build_charts
+from app.services.date_formatting import sort_and_format_dates
 from pandasai import SmartDatalake, Agent, SmartDataframe
 from fastapi import UploadFile
 import requests  # For making API calls
@@ -47,7 +49,7 @@ class PromptService:
                 table_name = table_data["table_name"]  # Get the table name from the API response
                 try:
                     # 2. Download files from MinIO (same as before)
-                    object_name = '/'.join(file_download_link.split('/')[-2:])
+                    object_name = self.data_management_table_repository.object_name(file_download_link)
                     data = self.data_management_table_repository.minio_client.get_object(
                         self.data_management_table_repository.bucket_name, object_name
                     )
@@ -125,9 +127,7 @@ class DataFrameProcessor:  # This class remains unchanged from your previous ver
 
     def sort_and_format_dates(self, df: pd.DataFrame) -> pd.DataFrame:
         try:
-            ou = SmartDataframe(df, config={"llm": self.llm, "verbose": True, "enable_cache": False, "max_retries": 10})
-            sorted_df = ou.chat('Please review the data. If there is any date column, then Sort the data by the date column and format the dates as %B-%Y.')
-            return self.convert_timestamps_to_strings(sorted_df)
+            return sort_and_format_dates(df)
         except Exception as e:
             logger.exception(f"Error in sort_and_format_dates: {e}")
             return df  
@@ -168,11 +168,7 @@ class DataFrameProcessor:  # This class remains unchanged from your previous ver
         try:
             if "table" in response_content and "columns" in response_content["table"] and len(response_content["table"]['data']):
                 graph_df = pd.DataFrame(response_content["table"]["data"], columns=response_content["table"]["columns"])
-                graph_instruction = get_graph_instruction()
-                graph_output = self.llm.invoke(graph_instruction + graph_df.to_markdown())
-                graph_output = re.sub(r'\bfalse\b', 'False', re.sub(r'\btrue\b', 'True', graph_output.content, flags=re.IGNORECASE), flags=re.IGNORECASE)
-                graph_output = re.sub(r"```|python|json", "", graph_output, 0, re.MULTILINE)
-                graph_output_json = eval(graph_output)
+                graph_output_json = build_charts(graph_df)
                 logger.info("Graph Generation Success")
                 return graph_output_json
             else:
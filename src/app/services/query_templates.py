@@ -0,0 +1,204 @@
+# app/services/query_templates.py
+"""
+Deterministic answers for simple aggregate prompts.
+
+Many prompts have one of a few shapes: "total sales by region", "top 10
+products by revenue", "monthly trend of orders". These are matched against
+a small set of templates and run as pandas group-bys on the board frames,
+skipping the agent's LLM round trips entirely. A template only applies when
+the whole prompt matches it and every phrase in it names a column of the same
+frame; anything else returns None and the prompt goes to the agent as before.
+
+Templates run either on loaded frames (``answer_simple_prompt``) or as SQL on
+a BoardQueryEngine (``answer_simple_prompt_sql``), which scans only the two
+columns involved.
+"""
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from app.services.board_query_engine import BoardQueryEngine, quote_identifier
+from app.services.date_formatting import detect_date_column, parse_date_column
+from app.services.semantic_cache import normalize_prompt
+
+# Load environment variables from .env file
+load_dotenv()
+
+QUERY_TEMPLATES_ENABLED = os.getenv("QUERY_TEMPLATES_ENABLED", "true").lower() == "true"
+
+AGGREGATIONS = {
+    "total": "sum", "sum": "sum",
+    "average": "mean", "avg": "mean", "mean": "mean",
+    "count": "count", "number": "count",
+    "maximum": "max", "max": "max", "highest": "max",
+    "minimum": "min", "min": "min", "lowest": "min",
+}
+LABEL_PREFIXES = {"sum": "", "mean": "Average ", "count": "Count of ", "max": "Max ", "min": "Min "}
+SQL_AGGREGATES = {"sum": "sum", "mean": "avg", "count": "count", "max": "max", "min": "min"}
+# How per-period partial results combine into months; "mean" is rebuilt from sums and counts
+PARTIAL_COMBINE = {"sum": "sum", "count": "sum", "max": "max", "min": "min"}
+# DataFrame.attrs key set on results whose row order is the answer (top N); date sorting would undo it
+RANKED = "ranked"
+
+_LEAD = r"(?:(?:show me|show|list|give me|get|what is|what are|whats|display|plot|chart) )?(?:the )?"
+_AGG = r"(?:(?P<agg>" + "|".join(AGGREGATIONS) + r") )?(?:of )?(?:the )?"
+
+TEMPLATES = [
+    ("top", re.compile(_LEAD + r"(?P<direction>top|bottom) (?P<n>\d+) (?P<dim>.+?) by " + _AGG + r"(?P<measure>.+)")),
+    ("trend", re.compile(_LEAD + r"(?:monthly|month wise|month on month|month over month) (?:trend )?(?:of |in )?"
+                         + _AGG + r"(?P<measure>.+?)(?: trend)?")),
+    ("group", re.compile(_LEAD + _AGG + r"(?P<measure>.+?) (?:by|per|for each|for every|across|in each) (?:each )?(?P<dim>.+)")),
+    # "sales by month" without a column called month
+    ("trend", re.compile(_LEAD + r"(?:trend of )?" + _AGG + r"(?P<measure>.+?) (?:trend )?(?:by|per) month")),
+]
+
+
+@dataclass
+class Intent:
+    template: str
+    aggregation: str
+    measure: str
+    dimension: Optional[str] = None
+    limit: Optional[int] = None
+    descending: bool = True
+
+
+def match_intents(input_text: str) -> Iterator[Intent]:
+    """Every template reading of a prompt, most specific first; column phrases are not resolved yet."""
+    text = normalize_prompt(input_text)
+    for template, pattern in TEMPLATES:
+        match = pattern.fullmatch(text)
+        if match is None:
+            continue
+        groups = match.groupdict()
+        yield Intent(
+            template=template,
+            aggregation=AGGREGATIONS[groups["agg"]] if groups.get("agg") else "sum",
+            measure=groups["measure"],
+            dimension=groups.get("dim"),
+            limit=int(groups["n"]) if groups.get("n") else None,
+            descending=groups.get("direction") != "bottom",
+        )
+
+
+def _column_lookup(df: pd.DataFrame) -> Dict[str, str]:
+    """Normalised column name (and its singular form) to column."""
+    lookup = {}
+    for column in df.columns:
+        name = normalize_prompt(str(column).replace("_", " "))
+        lookup.setdefault(name, column)
+        lookup.setdefault(name[:-1] if name.endswith("s") else name + "s", column)
+    return lookup
+
+
+def _resolve(intent: Intent, df: pd.DataFrame) -> Optional[Tuple[str, Optional[str]]]:
+    lookup = _column_lookup(df)
+    measure = lookup.get(intent.measure)
+    if measure is None:
+        return None
+    if intent.aggregation != "count" and (
+        not pd.api.types.is_numeric_dtype(df[measure]) or pd.api.types.is_bool_dtype(df[measure])
+    ):
+        return None
+
+    if intent.template == "trend":
+        dimension = detect_date_column(df.drop(columns=[measure]))
+    else:
+        dimension = lookup.get(intent.dimension)
+    if dimension is None or dimension == measure:
+        return None
+    return measure, dimension
+
+
+def _label(intent: Intent, measure: str) -> str:
+    return f"{LABEL_PREFIXES[intent.aggregation]}{measure}"
+
+
+def _run(intent: Intent, df: pd.DataFrame, measure: str, dimension: str) -> Optional[pd.DataFrame]:
+    label = _label(intent, measure)
+    if intent.template == "trend":
+        months = parse_date_column(df[dimension]).dt.to_period("M").dt.to_timestamp()
+        if months.isna().all():
+            return None
+        grouped = df[measure].groupby(months.rename(dimension)).agg(intent.aggregation)
+    else:
+        grouped = df.groupby(dimension, sort=True)[measure].agg(intent.aggregation)
+
+    if intent.template == "top":
+        grouped = grouped.nlargest(intent.limit) if intent.descending else grouped.nsmallest(intent.limit)
+    result = grouped.rename(label).reset_index()
+    result.attrs[RANKED] = intent.template == "top"
+    return result
+
+
+def answer_simple_prompt(input_text: str, dataframes_list: List[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """Result table for a prompt that matches a template, or None when the agent should answer it."""
+    for intent in match_intents(input_text):
+        for df in dataframes_list:
+            resolved = _resolve(intent, df)
+            if resolved is not None:
+                result = _run(intent, df, *resolved)
+                if result is not None:
+                    return result
+    return None
+
+
+def _run_sql(intent: Intent, engine: BoardQueryEngine, table_name: str, sample: pd.DataFrame,
+             measure: str, dimension: str) -> Optional[pd.DataFrame]:
+    label = _label(intent, measure)
+    view, measure_sql, dimension_sql = map(quote_identifier, (table_name, measure, dimension))
+
+    if intent.template != "trend":
+        order = "ORDER BY 1"
+        if intent.template == "top":
+            order = f"ORDER BY 2 {'DESC' if intent.descending else 'ASC'} NULLS LAST, 1 LIMIT {int(intent.limit)}"
+        result = engine.query(
+            f"SELECT {dimension_sql}, {SQL_AGGREGATES[intent.aggregation]}({measure_sql}) AS {quote_identifier(label)} "
+            f"FROM {view} WHERE {dimension_sql} IS NOT NULL GROUP BY 1 {order}"
+        )
+        result.attrs[RANKED] = intent.template == "top"
+        return result
+
+    # Aggregate per distinct date value in DuckDB, then parse those few values and roll them up to months
+    period = dimension_sql
+    if pd.api.types.is_datetime64_any_dtype(sample[dimension]):
+        period = f"date_trunc('month', {dimension_sql})"
+    if intent.aggregation == "mean":
+        values = f"sum({measure_sql}) AS value, count({measure_sql}) AS n"
+    else:
+        values = f"{SQL_AGGREGATES[intent.aggregation]}({measure_sql}) AS value"
+    partials = engine.query(f"SELECT {period} AS period, {values} FROM {view} WHERE {dimension_sql} IS NOT NULL GROUP BY 1")
+
+    months = parse_date_column(partials["period"]).dt.to_period("M").dt.to_timestamp().rename(dimension)
+    if months.isna().all():
+        return None
+    grouped = partials.groupby(months)
+    if intent.aggregation == "mean":
+        result = grouped["value"].sum() / grouped["n"].sum()
+    else:
+        result = grouped["value"].agg(PARTIAL_COMBINE[intent.aggregation])
+    return result.rename(label).reset_index()
+
+
+def answer_simple_prompt_sql(input_text: str, engine: BoardQueryEngine) -> Optional[pd.DataFrame]:
+    """``answer_simple_prompt`` over a board's DuckDB views instead of loaded frames."""
+    samples: Dict[str, pd.DataFrame] = {}
+    for intent in match_intents(input_text):
+        for table_name in engine.tables:
+            if table_name not in samples:
+                samples[table_name] = engine.sample(table_name)
+            resolved = _resolve(intent, samples[table_name])
+            if resolved is not None:
+                result = _run_sql(intent, engine, table_name, samples[table_name], *resolved)
+                if result is not None:
+                    return result
+    return None
+
+
+def is_ranked(result: pd.DataFrame) -> bool:
+    """True for template results ordered by their measure, which must keep their row order."""
+    return bool(result.attrs.get(RANKED))
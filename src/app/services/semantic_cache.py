@@ -0,0 +1,204 @@
+# app/services/semantic_cache.py
+"""
+Semantic lookup for near-duplicate prompts.
+
+The response cache only matches identical hash keys, so "total sales by month"
+and "Total Sales by Month?" each run the agent. This layer embeds normalised
+prompt text and keeps a small per-board vector index of answered prompts; a
+new prompt whose nearest neighbour scores above SEMANTIC_CACHE_THRESHOLD
+reuses that neighbour's hash key. Word-level embeddings score prompts that
+differ only in a number, a month or a word such as top/bottom as near
+duplicates, so a neighbour must also name exactly the same literals
+(``prompt_literals``) to be reused.
+
+Entries are scoped to the board data they were answered for (the board
+fingerprint or file contents), so answers never leak across data versions.
+The index lives in worker memory and is filled as prompts are answered.
+
+The default embedder is a deterministic feature-hashing model that needs no
+extra dependencies. Set SEMANTIC_CACHE_EMBEDDER=sentence-transformers:<model>
+to use a local sentence-transformers model when that package is installed.
+"""
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Protocol
+
+import numpy as np
+from loguru import logger
+from dotenv import load_dotenv
+
+from app.services.time_range import MONTHS
+
+# Load environment variables from .env file
+load_dotenv()
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_MAX_ENTRIES_PER_BOARD = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES_PER_BOARD", "1000"))
+SEMANTIC_CACHE_EMBEDDER = os.getenv("SEMANTIC_CACHE_EMBEDDER", "hashing")
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_QUARTER_TOKEN = re.compile(r"^(?:q[1-4]|h[12]|fy\d{2,4})$")
+# Words that flip a prompt's meaning; each maps to its side so synonyms still match
+POLARITY_WORDS = {
+    "top": "top", "bottom": "bottom",
+    "highest": "max", "max": "max", "maximum": "max", "most": "max", "largest": "max", "biggest": "max",
+    "lowest": "min", "min": "min", "minimum": "min", "least": "min", "smallest": "min",
+    "including": "include", "include": "include", "with": "include",
+    "excluding": "exclude", "exclude": "exclude", "without": "exclude", "except": "exclude",
+    "increase": "increase", "increased": "increase", "increasing": "increase", "growth": "increase",
+    "decrease": "decrease", "decreased": "decrease", "decreasing": "decrease", "decline": "decrease",
+    "ascending": "ascending", "descending": "descending",
+    "not": "not",
+}
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def prompt_literals(text: str) -> frozenset:
+    """Numbers, months, quarters and polarity words of a prompt; reused answers must share all of them."""
+    literals = set()
+    for word in normalize_prompt(text).split():
+        if _NUMBER.fullmatch(word):
+            literals.add(f"n:{float(word):g}")
+        elif word in MONTHS:
+            literals.add(f"m:{MONTHS[word]}")
+        elif _QUARTER_TOKEN.match(word):
+            literals.add(f"q:{word}")
+        elif word in POLARITY_WORDS:
+            literals.add(f"p:{POLARITY_WORDS[word]}")
+        else:
+            literals.update(f"n:{float(number):g}" for number in _NUMBER.findall(word))
+    return frozenset(literals)
+
+
+class Embedder(Protocol):
+    def embed(self, text: str) -> np.ndarray:
+        """Return an L2-normalised vector for ``text``."""
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words and character trigrams; deterministic across processes."""
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def _features(self, text: str) -> List[str]:
+        words = normalize_prompt(text).split()
+        features = [f"w:{word}" for word in words]
+        features += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+        for word in words:
+            padded = f" {word} "
+            features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.model.encode(normalize_prompt(text), normalize_embeddings=True).astype(np.float32)
+
+
+def build_embedder(spec: str = SEMANTIC_CACHE_EMBEDDER) -> Embedder:
+    if spec.startswith("sentence-transformers:"):
+        try:
+            return SentenceTransformerEmbedder(spec.split(":", 1)[1])
+        except ImportError:
+            logger.warning("sentence-transformers is not installed; using the hashing embedder")
+    return HashingEmbedder()
+
+
+@dataclass
+class SemanticMatch:
+    hash_key: str
+    prompt_text: str
+    similarity: float
+
+
+class _BoardIndex:
+    def __init__(self):
+        self.vectors: List[np.ndarray] = []
+        self.hash_keys: List[str] = []
+        self.prompts: List[str] = []
+        self.scopes: List[str] = []
+        self.literals: List[frozenset] = []
+        self.matrix: Optional[np.ndarray] = None
+
+
+class SemanticCache:
+    def __init__(self, embedder: Optional[Embedder] = None, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 max_entries_per_board: int = SEMANTIC_CACHE_MAX_ENTRIES_PER_BOARD):
+        self.embedder = embedder or build_embedder()
+        self.threshold = threshold
+        self.max_entries_per_board = max_entries_per_board
+        self._boards: Dict[str, _BoardIndex] = {}
+        self._lock = threading.Lock()
+
+    def add(self, board_id, scope: str, prompt_text: str, hash_key: str) -> None:
+        """Index an answered prompt under its board and data scope."""
+        vector = self.embedder.embed(prompt_text)
+        with self._lock:
+            index = self._boards.setdefault(str(board_id), _BoardIndex())
+            if hash_key in index.hash_keys:
+                return
+            index.vectors.append(vector)
+            index.hash_keys.append(hash_key)
+            index.prompts.append(prompt_text)
+            index.scopes.append(scope)
+            index.literals.append(prompt_literals(prompt_text))
+            overflow = len(index.vectors) - self.max_entries_per_board
+            if overflow > 0:
+                for column in (index.vectors, index.hash_keys, index.prompts, index.scopes, index.literals):
+                    del column[:overflow]
+            index.matrix = None
+
+    def lookup(self, board_id, scope: str, prompt_text: str) -> Optional[SemanticMatch]:
+        """Nearest indexed prompt of the same board, scope and literals, or None when nothing is close enough."""
+        best = self.nearest(board_id, scope, prompt_text)
+        return best if best is not None and best.similarity >= self.threshold else None
+
+    def nearest(self, board_id, scope: str, prompt_text: str) -> Optional[SemanticMatch]:
+        query = self.embedder.embed(prompt_text)
+        literals = prompt_literals(prompt_text)
+        with self._lock:
+            index = self._boards.get(str(board_id))
+            if index is None or not index.vectors:
+                return None
+            if index.matrix is None:
+                index.matrix = np.vstack(index.vectors)
+            similarities = index.matrix @ query
+            in_scope = np.array([
+                entry_scope == scope and entry_literals == literals
+                for entry_scope, entry_literals in zip(index.scopes, index.literals)
+            ])
+            if not in_scope.any():
+                return None
+            similarities = np.where(in_scope, similarities, -np.inf)
+            position = int(np.argmax(similarities))
+            return SemanticMatch(index.hash_keys[position], index.prompts[position], float(similarities[position]))
+
+    def invalidate_board(self, board_id) -> None:
+        with self._lock:
+            self._boards.pop(str(board_id), None)
+
+
+semantic_cache = SemanticCache()
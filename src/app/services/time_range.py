@@ -0,0 +1,259 @@
+# app/services/time_range.py
+"""
+Resolve the date phrases of a prompt against a board's ``month_year`` values.
+
+TableStatus months are stored as ``MYYYY``/``MMYYYY`` strings (``12024`` is
+January 2024, ``122024`` December 2024). ``select_months`` returns the stored
+values a prompt is about, so only those files need to be loaded, or None when
+the prompt names no period (or none of the named months exist) and every
+month should be used.
+
+Understood phrases: explicit months ("March 2024", "2024-03", "03/2024"),
+quarters ("Q1 2024"), years ("in 2023"), ranges between two months ("between
+Jan and Mar 2024", "jan-mar 2024", the year carrying over to the end without
+one), open ranges ("before March 2024", "since March"), bare month names ("in
+March", every year) and relative periods ("last month", "last 6 months", "this
+quarter", "year to date"). Relative periods count back from the latest month
+the board has data for, not from today: "last quarter" is the most recent
+quarter the data covers completely, "this quarter" the one containing the
+latest month. A range that cannot be resolved ("since Q2 2023") uses every
+month rather than a wrong subset, as do prompts that leave a period out
+("excluding March 2024") or measure against another one ("year over year",
+"vs last year"). Numbers that are quantities ("over 2023 units") are not years.
+"""
+import re
+from typing import Callable, Iterable, List, Optional, Tuple
+
+YearMonth = Tuple[int, int]
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8, "sep": 9, "sept": 9,
+    "oct": 10, "nov": 11, "dec": 12,
+}
+# Bare month names without a year; short forms and "may" are too often ordinary words
+BARE_MONTHS = {name: number for name, number in MONTHS.items() if len(name) > 4 or name in ("june", "july")}
+
+_MONTH = r"(" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")"
+_YEAR = r"((?:19|20)\d{2})"
+_NAMED_MONTH = re.compile(r"\b" + _MONTH + r"\.?[\s,'/-]*" + _YEAR + r"\b")
+_ISO_MONTH = re.compile(r"\b" + _YEAR + r"[-/](0?[1-9]|1[0-2])\b")
+_NUMERIC_MONTH = re.compile(r"\b(0?[1-9]|1[0-2])[-/]" + _YEAR + r"\b")
+_QUARTER = re.compile(r"\bq([1-4])[\s'/-]*" + _YEAR + r"\b|\b" + _YEAR + r"[\s/-]*q([1-4])\b")
+
+
+def _endpoint(name: str) -> str:
+    """A month in a range: "march", "mar 2024", "2024-03" or "03/2024"; the year is optional for names."""
+    return (
+        rf"(?:(?P<{name}_m>" + "|".join(sorted(MONTHS, key=len, reverse=True)) + rf")\.?(?:[\s,']*(?P<{name}_y>(?:19|20)\d{{2}}))?"
+        rf"|(?P<{name}_iy>(?:19|20)\d{{2}})[-/](?P<{name}_im>0?[1-9]|1[0-2])"
+        rf"|(?P<{name}_nm>0?[1-9]|1[0-2])[-/](?P<{name}_ny>(?:19|20)\d{{2}}))\b"
+    )
+
+
+_BETWEEN = re.compile(r"\bbetween\s+" + _endpoint("a") + r"\s+and\s+" + _endpoint("b"))
+_SPAN_WORDS = r"\s*(?:-|–|\bto\b|\bthrough\b|\bthru\b|\buntil\b|\btill\b)\s*"
+_FROM_SPAN = re.compile(r"\bfrom\s+" + _endpoint("a") + _SPAN_WORDS + _endpoint("b"))
+_SPAN = re.compile(r"\b" + _endpoint("a") + _SPAN_WORDS + _endpoint("b"))
+# "compare March 2023 to March 2024" names two months, not the range between them
+_COMPARISON = re.compile(r"\b(?:compare|compared|comparing|comparison|versus|vs)\b")
+_OPEN_RANGE = re.compile(
+    r"\b(?P<bound>before|prior to|after|since|starting|from|until|till|through|up to)\s+(?:the\s+)?(?:end of\s+)?" + _endpoint("a")
+)
+BOUND_OFFSETS = {"before": -1, "prior to": -1, "after": 1, "since": 0, "starting": 0, "from": 0,
+                 "until": 0, "till": 0, "through": 0, "up to": 0}
+LOWER_BOUNDS = {"after", "since", "starting", "from"}
+# Range words left over once every understood range is consumed mean a range we cannot resolve
+_UNRESOLVED_RANGE = re.compile(
+    r"\b(?:between|before|prior to|after|since|from|until|till|through|up to)\s+(?:the\s+)?(?:end of\s+|start of\s+)?"
+    r"(?:q[1-4]|(?:19|20)\d{2}|" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\b"
+    r"|\b(?:before|prior to|after|since|until|till)\s+(?:the\s+)?(?:last|this|previous|current|latest)\b"
+)
+# A period the prompt leaves out, or one it is measured against, needs the other months too
+_NEEDS_OTHER_MONTHS = re.compile(
+    r"\b(?:excluding|exclude|excludes|except|other than|without|apart from|aside from|besides|not including)\b"
+    r"|\b(?:year|month|quarter) over (?:year|month|quarter)\b|\b(?:yoy|qoq|mom|y/y|q/q|m/m)\b"
+    r"|\b(?:vs\.?|versus|against|over|than) (?:the )?(?:last|previous|prior|same) (?:year|quarter|month|period)\b"
+    r"|\b(?:compared|comparison) (?:to|with)\b|\b(?:prior|previous) year\b"
+)
+# Numbers that are amounts, not years: "over 2023 units", "more than 2000"
+_QUANTITY = re.compile(
+    r"(?:\b(?:over|above|under|below|exceeding|more than|less than|fewer than|greater than|at least|at most)"
+    r"\s+[$₹€£]?|[<>]=?\s*)(" + _YEAR[1:-1] + r")\b"
+    r"|\b(" + _YEAR[1:-1] + r")\s+(?:units?|items?|orders?|pieces?|pcs|qty|customers?|dollars?|rupees?|usd|inr)\b"
+)
+_QUANTITY_MARK = "qty"
+_LAST_N_MONTHS = re.compile(r"\b(?:last|past|previous|recent) (\d{1,2}) months?\b")
+_LAST_MONTH = re.compile(r"\b(?:last|latest|this|current|previous|recent) month\b")
+_LAST_PERIOD = re.compile(r"\b(?:last|previous) (quarter|year)\b")
+_THIS_PERIOD = re.compile(r"\b(?:latest|this|current|recent) (quarter|year)\b|\b(ytd|year to date)\b")
+PERIOD_MONTHS = {"quarter": 3, "year": 12, "ytd": 12, "year to date": 12}
+_YEAR_ONLY = re.compile(r"\b" + _YEAR + r"\b")
+_BARE_MONTH = re.compile(r"\b(" + "|".join(sorted(BARE_MONTHS, key=len, reverse=True)) + r")\b")
+_TIME_PHRASES = [
+    _BETWEEN, _FROM_SPAN, _SPAN, _OPEN_RANGE, _NAMED_MONTH, _ISO_MONTH, _NUMERIC_MONTH, _QUARTER, _LAST_N_MONTHS, _LAST_MONTH,
+    _LAST_PERIOD, _THIS_PERIOD, _YEAR_ONLY, _BARE_MONTH,
+]
+_PHRASE_LEAD = r"(?:\b(?:in|for|during|over|of|since)\s+)?(?:the\s+)?"
+
+
+def parse_month_year(value: str) -> Optional[YearMonth]:
+    """``(year, month)`` of a stored month_year value such as ``12024`` or ``122024``."""
+    text = str(value).strip()
+    if text.isdigit() and len(text) in (5, 6):
+        month, year = int(text[:-4]), int(text[-4:])
+        return (year, month) if 1 <= month <= 12 else None
+    for pattern, year_group, month_group in ((_ISO_MONTH, 1, 2), (_NUMERIC_MONTH, 2, 1)):
+        match = pattern.fullmatch(text)
+        if match:
+            return int(match.group(year_group)), int(match.group(month_group))
+    match = _NAMED_MONTH.fullmatch(text.lower())
+    if match:
+        return int(match.group(2)), MONTHS[match.group(1)]
+    return None
+
+
+def _month_index(year_month: YearMonth) -> int:
+    return year_month[0] * 12 + year_month[1] - 1
+
+
+def _consume(pattern: re.Pattern, text: str) -> Tuple[List[re.Match], str]:
+    """All matches of ``pattern`` and the text with them blanked out, so later patterns skip them."""
+    matches = list(pattern.finditer(text))
+    return matches, pattern.sub(lambda match: " " * len(match.group(0)), text)
+
+
+def _endpoint_month(match: re.Match, name: str) -> Tuple[Optional[int], int]:
+    """``(year or None, month)`` of an endpoint matched by ``_endpoint(name)``."""
+    if match.group(f"{name}_m"):
+        year = match.group(f"{name}_y")
+        return (int(year) if year else None), MONTHS[match.group(f"{name}_m")]
+    if match.group(f"{name}_iy"):
+        return int(match.group(f"{name}_iy")), int(match.group(f"{name}_im"))
+    return int(match.group(f"{name}_ny")), int(match.group(f"{name}_nm"))
+
+
+def _range_condition(start: Tuple[Optional[int], int], end: Tuple[Optional[int], int]) -> Callable[[YearMonth], bool]:
+    """Months from ``start`` to ``end``; a missing year is taken from the other end."""
+    (start_year, start_month), (end_year, end_month) = start, end
+    if start_year is None and end_year is not None:
+        start_year = end_year if start_month <= end_month else end_year - 1
+    elif end_year is None and start_year is not None:
+        end_year = start_year if end_month >= start_month else start_year + 1
+    if start_year is None:
+        # No year on either end: the same months of every year, wrapping over December
+        if start_month <= end_month:
+            return lambda ym: start_month <= ym[1] <= end_month
+        return lambda ym: ym[1] >= start_month or ym[1] <= end_month
+    low, high = sorted((_month_index((start_year, start_month)), _month_index((end_year, end_month))))
+    return lambda ym: low <= _month_index(ym) <= high
+
+
+def _mask_quantities(text: str) -> str:
+    """Prefix quantity numbers so no year pattern matches them."""
+    return _QUANTITY.sub(lambda match: match.group(0).replace(
+        match.group(1) or match.group(2), _QUANTITY_MARK + (match.group(1) or match.group(2))
+    ), text)
+
+
+def _explicit_months(text: str) -> Tuple[List[YearMonth], str]:
+    months = []
+    named, text = _consume(_NAMED_MONTH, text)
+    months += [(int(match.group(2)), MONTHS[match.group(1)]) for match in named]
+    iso, text = _consume(_ISO_MONTH, text)
+    months += [(int(match.group(1)), int(match.group(2))) for match in iso]
+    numeric, text = _consume(_NUMERIC_MONTH, text)
+    months += [(int(match.group(2)), int(match.group(1))) for match in numeric]
+    return months, text
+
+
+def select_months(input_text: str, month_years: Iterable[str]) -> Optional[List[str]]:
+    """Stored month_year values the prompt is about, oldest first, or None to use every month."""
+    known = {value: parse_month_year(value) for value in month_years}
+    known = {value: year_month for value, year_month in known.items() if year_month is not None}
+    if not known:
+        return None
+    latest = _month_index(max(known.values()))
+    text = input_text.lower()
+    if _NEEDS_OTHER_MONTHS.search(text):
+        return None
+    text = _mask_quantities(text)
+    conditions: List[Callable[[YearMonth], bool]] = []
+
+    range_patterns = [_BETWEEN, _FROM_SPAN] + ([] if _COMPARISON.search(text) else [_SPAN])
+    for pattern in range_patterns:
+        ranges, text = _consume(pattern, text)
+        conditions += [_range_condition(_endpoint_month(match, "a"), _endpoint_month(match, "b")) for match in ranges]
+
+    open_ranges, text = _consume(_OPEN_RANGE, text)
+    low, high = None, None
+    for match in open_ranges:
+        year, month = _endpoint_month(match, "a")
+        if year is None:
+            # The most recent such month the data reaches
+            year = latest // 12 if month - 1 <= latest % 12 else latest // 12 - 1
+        bound, index = match.group("bound"), _month_index((year, month)) + BOUND_OFFSETS[match.group("bound")]
+        if bound in LOWER_BOUNDS:
+            low = index if low is None else max(low, index)
+        else:
+            high = index if high is None else min(high, index)
+    if open_ranges:
+        low = float("-inf") if low is None else low
+        high = float("inf") if high is None else high
+        conditions.append(lambda ym, low=low, high=high: low <= _month_index(ym) <= high)
+
+    if _UNRESOLVED_RANGE.search(text):
+        return None
+
+    months, text = _explicit_months(text)
+    conditions += [lambda ym, month=month: ym == month for month in months]
+
+    quarters, text = _consume(_QUARTER, text)
+    for match in quarters:
+        quarter = int(match.group(1) or match.group(4))
+        year = int(match.group(2) or match.group(3))
+        conditions.append(lambda ym, year=year, quarter=quarter: ym[0] == year and (ym[1] - 1) // 3 + 1 == quarter)
+
+    last_n, text = _consume(_LAST_N_MONTHS, text)
+    for match in last_n:
+        count = int(match.group(1))
+        conditions.append(lambda ym, count=count: latest - count < _month_index(ym) <= latest)
+    last_month, text = _consume(_LAST_MONTH, text)
+    if last_month:
+        conditions.append(lambda ym: _month_index(ym) == latest)
+    last_periods, text = _consume(_LAST_PERIOD, text)
+    for match in last_periods:
+        length = PERIOD_MONTHS[match.group(1)]
+        # The period is complete when the latest month is its last month, otherwise use the one before
+        end = latest if (latest + 1) % length == 0 else latest - latest % length - 1
+        conditions.append(lambda ym, start=end - length + 1, end=end: start <= _month_index(ym) <= end)
+    this_periods, text = _consume(_THIS_PERIOD, text)
+    for match in this_periods:
+        start = latest - latest % PERIOD_MONTHS[match.group(1) or match.group(2)]
+        conditions.append(lambda ym, start=start: start <= _month_index(ym) <= latest)
+
+    years, text = _consume(_YEAR_ONLY, text)
+    conditions += [lambda ym, year=int(match.group(1)): ym[0] == year for match in years]
+    bare_months, text = _consume(_BARE_MONTH, text)
+    conditions += [lambda ym, month=BARE_MONTHS[match.group(1)]: ym[1] == month for match in bare_months]
+
+    if not conditions:
+        return None
+    selected = [value for value, year_month in known.items() if any(condition(year_month) for condition in conditions)]
+    return order_month_years(selected) or None
+
+
+def remove_time_phrases(input_text: str) -> str:
+    """Prompt text without its date phrases, for matching once the data is already narrowed to them."""
+    text = _mask_quantities(input_text.lower())
+    for pattern in _TIME_PHRASES:
+        text = re.sub(_PHRASE_LEAD + "(?:" + pattern.pattern + ")", " ", text)
+    return " ".join(re.sub(r"\b" + _QUANTITY_MARK + r"(?=\d)", "", text).split())
+
+
+def order_month_years(month_years: Iterable[str]) -> List[str]:
+    """Stored month_year values oldest first; values that do not parse keep their order at the end."""
+    parsed = [(value, parse_month_year(value)) for value in month_years]
+    dated = sorted((value for value, year_month in parsed if year_month), key=lambda value: _month_index(parse_month_year(value)))
+    return dated + [value for value, year_month in parsed if year_month is None]
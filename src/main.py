@@ -1,14 +1,35 @@
 # main.py
 
 import uvicorn
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routers import client_user_router, main_board_router, main_board_access_router, board_router, ai_documentation_router, data_management_table_router, prompt_router
+from starlette.concurrency import run_in_threadpool
+from app.bootstrap import bootstrap
+from app.services.cache_compaction import run_cache_compaction, PROMPT_CACHE_COMPACT_INTERVAL_SECONDS
+from app.dependencies import get_prompt_response_repository
+from app.repositories.permission_resolver import PermissionScopeMiddleware
+from app.pagination import NEXT_CURSOR_HEADER
+from app.routers import client_user_router, main_board_router, main_board_access_router, board_router, ai_documentation_router, data_management_table_router, prompt_router, system_router
 #, prompt_router ,data_management_table_router, ai_documentation_router, , enhanced_data_management_table_router)
                        
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema creation and bucket checks run once here instead of in every repository
+    if os.getenv("BOOTSTRAP_ON_STARTUP", "true").lower() == "true":
+        await run_in_threadpool(bootstrap)
+
+    compaction_task = None
+    if PROMPT_CACHE_COMPACT_INTERVAL_SECONDS > 0:
+        compaction_task = asyncio.create_task(run_cache_compaction(get_prompt_response_repository()))
+    yield
+    if compaction_task is not None:
+        compaction_task.cancel()
+
+app = FastAPI(lifespan=lifespan)
 origins = ["*", "http://localhost:3000"]#,"https://prospero-two.vercel.app","http://localhost:3000"]
 
 app.add_middleware(
@@ -17,7 +38,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers hide response headers from other origins unless exposed; clients page with this one
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+# Permission checks made while handling one request share a single lookup per user
+app.add_middleware(PermissionScopeMiddleware)
 
 app.include_router(client_user_router.router, tags=["Client Users"])
 app.include_router(main_board_router.router, tags=["Main Boards"])
@@ -26,6 +51,7 @@ app.include_router(prompt_router.router, prefix="/main-boards/boards", tags=["Pr
 app.include_router(data_management_table_router.router, prefix="/main-boards/boards", tags=["Data Management Tables"])
 app.include_router(ai_documentation_router.router, prefix="/main-boards/boards", tags=["AI Documentation"])
 app.include_router(main_board_access_router.router, prefix="/main-boards/boards", tags=["Main Board Access"])
+app.include_router(system_router.router, tags=["System"])
 # app.include_router(main_board_router.router, prefix="/main-boards", tags=["Main Boards"]) #Gaurav
 
 # app.include_router(time_line_settings_router.router, prefix="/main-boards/boards", tags=["Time Line Settings"])
@@ -0,0 +1,49 @@
+import pandas as pd
+from app.services.chart_builder import build_charts
+
+
+def test_time_like_label_builds_line_chart_first():
+    df = pd.DataFrame({
+        "Month": ["January-2024", "February-2024", "March-2024"],
+        "Sales": [10.0, 12.5, 9.0],
+    })
+    charts = build_charts(df)["charts"]
+
+    assert [chart["chart_type"] for chart in charts] == ["line", "bar", "pie"]
+    assert charts[0]["data_format"]["labels"] == ["January-2024", "February-2024", "March-2024"]
+    assert charts[0]["data_format"]["categories"] == ["Sales"]
+    assert charts[0]["data_format"]["values"] == [[10.0], [12.5], [9.0]]
+
+
+def test_many_categories_skip_pie_and_keep_largest():
+    df = pd.DataFrame({"Region": [f"R{i}" for i in range(60)], "Revenue": range(60)})
+    charts = build_charts(df)["charts"]
+
+    assert [chart["chart_type"] for chart in charts] == ["bar"]
+    assert len(charts[0]["data_format"]["labels"]) == 50
+    assert charts[0]["data_format"]["labels"][0] == "R59"
+
+
+def test_independent_measures_are_grouped_and_pie_uses_the_first():
+    df = pd.DataFrame({"Branch": ["A", "B"], "Revenue": [100, 200], "Orders": [3, 4]})
+    charts = build_charts(df)["charts"]
+    bar, pie = charts[0], charts[-1]
+
+    assert bar["data_format"]["isStacked"] is False
+    assert bar["data_format"]["values"] == [[100, 3], [200, 4]]
+    assert pie["chart_type"] == "pie"
+    assert pie["data_format"]["categories"] == ["Revenue"]
+    assert pie["data_format"]["values"] == [100, 200]
+
+
+def test_shares_of_one_total_are_stacked():
+    df = pd.DataFrame({"Branch": ["A", "B"], "Cash %": [40.0, 25.0], "Card %": [60.0, 75.0]})
+    bar = build_charts(df)["charts"][0]
+
+    assert bar["data_format"]["isStacked"] is True
+    assert bar["data_format"]["values"] == [[40.0, 60.0], [25.0, 75.0]]
+
+
+def test_nothing_to_plot_returns_empty_payload():
+    assert build_charts(pd.DataFrame({"Name": ["a"], "Note": ["b"]})) == {}
+    assert build_charts(pd.DataFrame()) == {}
@@ -0,0 +1,34 @@
+import json
+import pandas as pd
+from app.services.data_profile import build_profile, describe_column, merged_distinct, render_profiles
+
+
+def test_profile_size_does_not_grow_with_rows():
+    small = pd.DataFrame({"Branch": ["A", "B"] * 5, "Sales": range(10)})
+    large = pd.DataFrame({"Branch": ["A", "B"] * 50_000, "Sales": range(100_000)})
+
+    small_profile, large_profile = build_profile(small, "sales"), build_profile(large, "sales")
+
+    assert large_profile["rows"] == 100_000
+    assert len(large_profile["sample"]["data"]) == 3
+    assert len(json.dumps(large_profile)) < 2 * len(json.dumps(small_profile))
+
+
+def test_columns_describe_type_range_and_frequent_values():
+    df = pd.DataFrame({"Branch": ["A", "A", None, "B"], "Sales": [1.5, 2.0, 3.0, None]})
+    profile = build_profile(df, "sales")
+    branch, sales = profile["columns"]
+
+    assert describe_column(branch) == "object; 2 distinct; 25.0% null; e.g. A, B"
+    assert describe_column(sales) == "float64; 3 distinct; 25.0% null; 1.5 to 3.0"
+    assert render_profiles([profile]).startswith("Table sales (4 rows)")
+
+
+def test_distinct_sketches_merge_across_files():
+    january = pd.DataFrame({"Customer": [f"c{i}" for i in range(0, 6000)]})
+    february = pd.DataFrame({"Customer": [f"c{i}" for i in range(3000, 9000)]})
+    columns = [build_profile(df, "sales")["columns"][0] for df in (january, february)]
+
+    assert columns[0]["nulls"] == 0
+    assert abs(merged_distinct(columns) - 9000) < 9000 * 0.1
+    assert abs(merged_distinct(columns[:1]) - 6000) < 6000 * 0.1
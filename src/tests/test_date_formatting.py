@@ -0,0 +1,53 @@
+import pandas as pd
+from app.services.date_formatting import detect_date_column, sort_and_format_dates
+
+
+def test_text_dates_are_sorted_and_formatted():
+    df = pd.DataFrame({
+        "Branch": ["A", "B", "C"],
+        "Date": ["2024-03-01", "2024-01-15", "2024-02-10"],
+        "Sales": [3.0, 1.0, 2.0],
+    })
+    result = sort_and_format_dates(df)
+
+    assert detect_date_column(df) == "Date"
+    assert result["Date"].tolist() == ["January-2024", "February-2024", "March-2024"]
+    assert result["Sales"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_years_and_labels_are_not_dates():
+    df = pd.DataFrame({"Year": ["2023", "2022"], "Region": ["North", "South"], "Sales": [1, 2]})
+
+    assert detect_date_column(df) is None
+    assert sort_and_format_dates(df).equals(df)
+
+
+def test_large_datetime_column_uses_requested_format():
+    dates = pd.date_range("2020-01-01", periods=100_000, freq="H")[::-1]
+    df = pd.DataFrame({"When": dates, "Value": range(100_000)})
+    result = sort_and_format_dates(df, date_format="%b-%Y")
+
+    assert result["When"].iloc[0] == "Jan-2020"
+    assert result["Value"].iloc[0] == 99_999
+
+
+def test_offset_dates_keep_their_own_month():
+    df = pd.DataFrame({
+        "Date": ["2024-03-01T00:00:00+05:30", "2024-01-01T00:00:00+05:30", "2024-02-01T00:00:00-08:00"],
+        "Sales": [3, 1, 2],
+    })
+    mixed = pd.DataFrame({"Date": ["2024-03-01T00:00:00+05:30", "2024-01-15"], "Sales": [3, 1]})
+
+    assert sort_and_format_dates(df)["Date"].tolist() == ["January-2024", "February-2024", "March-2024"]
+    assert sort_and_format_dates(mixed)["Date"].tolist() == ["January-2024", "March-2024"]
+
+
+def test_quarter_and_fiscal_labels_are_not_dates():
+    df = pd.DataFrame({"Quarter": ["2024-Q2", "2024-Q1"], "Sales": [2, 1]})
+
+    assert detect_date_column(df) is None
+    assert sort_and_format_dates(df).equals(df)
+    for labels in (["Q1 2024", "Q2 2024"], ["FY24", "FY25"], ["FY 2023-24", "FY 2024-25"], ["2024-W05", "2024-W06"]):
+        assert detect_date_column(pd.DataFrame({"Period": labels, "Sales": [1, 2]})) is None
+    quarters = pd.DataFrame({"Quarter": pd.period_range("2024Q1", periods=2, freq="Q"), "Sales": [1, 2]})
+    assert detect_date_column(quarters) is None
@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+from app.repositories.frame_cache import FrameCache
+
+
+def _frame():
+    return pd.DataFrame({"region": ["north", "south"], "sales": [1.5, 2.0]})
+
+
+def test_written_frames_are_read_back_per_etag(tmp_path):
+    cache = FrameCache(str(tmp_path))
+
+    assert cache.read("2024-01/1/7/sales.csv", "etag-1") is None
+    cache.write("2024-01/1/7/sales.csv", "etag-1", "7:v1", _frame())
+
+    pd.testing.assert_frame_equal(cache.read("2024-01/1/7/sales.csv", "etag-1"), _frame())
+    assert cache.parquet_path("2024-01/1/7/sales.csv", "etag-1").endswith("etag-1.parquet")
+    assert cache.read("2024-01/1/7/sales.csv", "etag-2") is None
+    assert cache.parquet_path("2024-01/1/7/sales.csv", "etag-2") is None
+
+
+def test_known_etag_follows_the_table_status_version(tmp_path):
+    cache = FrameCache(str(tmp_path))
+    cache.write("a.csv", "etag-1", "7:v1", _frame())
+
+    assert cache.known_etag("a.csv", "7:v1") == "etag-1"
+    assert cache.known_etag("a.csv", "7:v2") is None
+    # The version sidecar survives a restart
+    assert FrameCache(str(tmp_path)).known_etag("a.csv", "7:v1") == "etag-1"
+
+    cache.write("a.csv", "etag-2", "7:v2", _frame().head(1))
+    assert cache.known_etag("a.csv", "7:v2") == "etag-2"
+    assert cache.read("a.csv", "etag-1") is None  # older ETags are dropped
+    assert len(cache.read("a.csv", "etag-2")) == 1
+
+
+def test_invalidate_and_unreadable_entries(tmp_path):
+    cache = FrameCache(str(tmp_path))
+    cache.write("a.csv", "etag-1", "v1", _frame())
+    cache.write_profile("a.csv", "v1", {"profile_version": 3, "columns": []})
+
+    assert cache.read_profile("a.csv", "v1", 3) == {"profile_version": 3, "columns": []}
+    assert cache.read_profile("a.csv", "v1", 4) is None
+    cache.invalidate("a.csv")
+    assert cache.known_etag("a.csv", "v1") is None
+    assert cache.read_profile("a.csv", "v1", 3) is None
+
+    cache.write("b.csv", "etag-1", "v1", _frame())
+    path = cache.parquet_path("b.csv", "etag-1")
+    with open(path, "wb") as fh:
+        fh.write(b"not parquet")
+    assert cache.read("b.csv", "etag-1") is None
+    assert not os.path.exists(path)
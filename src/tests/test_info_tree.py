@@ -0,0 +1,115 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlmodel import SQLModel, Session
+import app.bootstrap  # noqa: F401  (registers every model)
+from app.models.boards import Boards
+from app.models.client_user import ClientUser
+from app.models.main_board import MainBoard
+from app.models.main_board_access import MainBoardAccess
+from app.repositories.info_tree_cache import InfoTreeCache
+from app.repositories.main_board_repository import MainBoardRepository
+
+
+def _repository():
+    return MainBoardRepository.__new__(MainBoardRepository)
+
+
+def test_tree_is_one_statement_with_aggregated_permissions():
+    sql = str(_repository()._info_tree_statement(7).compile(dialect=postgresql.dialect()))
+
+    assert sql.count("SELECT") == 2  # the tree and its grants subquery, nothing per main board
+    assert "array_agg" in sql
+    assert "LEFT OUTER JOIN" in sql
+
+
+def test_tree_only_includes_owned_or_viewable_main_boards():
+    sql = str(_repository()._info_tree_statement(7).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+
+    where = sql.split("WHERE", 2)[-1]
+    assert '"MainBoard".client_user_id = 7' in where
+    assert "@> ARRAY['view']" in where
+
+
+def test_rows_become_a_tree_with_owner_and_granted_permissions():
+    owned = MainBoard(id=1, client_user_id=7, name="Sales", main_board_type="ANALYSIS")
+    shared = MainBoard(id=2, client_user_id=9, name="Ops", main_board_type="FORECASTING")
+    rows = [
+        (owned, 10, "Q1", True, None),
+        (owned, 11, "Q2", False, None),
+        (shared, None, None, None, ["edit", "view"]),
+    ]
+
+    tree = _repository().convert_to_tree_structure(rows, client_user_id=7)
+
+    assert [node["main_board_id"] for node in tree] == [1, 2]
+    assert tree[0]["permissions"] == ["view", "edit", "delete", "create"]
+    assert tree[0]["boards"] == {
+        10: {"name": "Q1", "is_active": True, "is_selected": False},
+        11: {"name": "Q2", "is_active": False, "is_selected": False},
+    }
+    assert tree[1]["permissions"] == ["view", "edit"]
+    assert tree[1]["boards"] == {}
+
+    # The same rows seen by the viewer: no owner rights on either main board
+    assert [node["permissions"] for node in _repository().convert_to_tree_structure(rows, client_user_id=8)] == [
+        [], ["view", "edit"]
+    ]
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="needs a Postgres TEST_DATABASE_URL")
+def test_tree_per_user_against_postgres():
+    engine = create_engine(os.environ["TEST_DATABASE_URL"])
+    with engine.connect() as connection:
+        transaction = connection.begin()  # everything below, DDL included, is rolled back
+        try:
+            SQLModel.metadata.create_all(connection, tables=[
+                ClientUser.__table__, MainBoard.__table__, Boards.__table__, MainBoardAccess.__table__,
+            ])
+            with Session(connection) as session:
+                for user_id in (1, 2, 3, 4):
+                    session.add(ClientUser(id=user_id, password="x", email=f"user{user_id}@example.com"))
+                session.flush()
+                session.add(MainBoard(id=1, client_user_id=1, name="Sales", main_board_type="ANALYSIS"))
+                session.add(MainBoard(id=2, client_user_id=1, name="Ops", main_board_type="FORECASTING"))
+                session.flush()
+                session.add(Boards(id=10, main_board_id=1, name="Q1", is_active=True))
+                session.add(Boards(id=11, main_board_id=1, name="Q2", is_active=False))
+                session.add(MainBoardAccess(main_board_id=1, client_user_id=2, permission="view"))
+                session.add(MainBoardAccess(main_board_id=1, client_user_id=2, permission="edit"))
+                session.add(MainBoardAccess(main_board_id=2, client_user_id=3, permission="edit"))  # no view
+                session.flush()
+
+            repository = _repository()
+            repository.engine = connection
+            owner, viewer, edit_only, stranger = (repository.get_all_info_tree(user_id) for user_id in (1, 2, 3, 4))
+        finally:
+            transaction.rollback()
+
+    assert [(node["main_board_id"], node["permissions"]) for node in owner] == [
+        (1, ["view", "edit", "delete", "create"]), (2, ["view", "edit", "delete", "create"])
+    ]
+    assert owner[0]["boards"] == {
+        10: {"name": "Q1", "is_active": True, "is_selected": False},
+        11: {"name": "Q2", "is_active": False, "is_selected": False},
+    }
+    assert owner[1]["boards"] == {}
+    assert [(node["main_board_id"], node["permissions"]) for node in viewer] == [(1, ["view", "edit"])]
+    assert viewer[0]["boards"] == owner[0]["boards"]
+    assert edit_only == []
+    assert stranger == []
+
+
+def test_cached_trees_are_copies_and_drop_on_invalidation():
+    cache = InfoTreeCache(ttl_seconds=60)
+    cache.put(7, [{"main_board_id": 1, "is_selected": False}])
+    cache.get(7)[0]["is_selected"] = True
+
+    assert cache.get(7) == [{"main_board_id": 1, "is_selected": False}]
+    cache.invalidate_all()
+    assert cache.get(7) is None
+    assert InfoTreeCache(ttl_seconds=0).get(7) is None
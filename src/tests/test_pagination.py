@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine
+import app.bootstrap  # noqa: F401  (registers every model)
+import main
+from app.authentication import verify_token
+from app.dependencies import get_data_management_table_repository
+from app.models.data_management_table import DataManagementTable
+from app.models.prompt import Prompt
+from app.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, PAGE_SIZE_DEFAULT, PageParams, fetch_page
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine, tables=[Prompt.__table__])
+    session = Session(engine)
+    start = datetime(2024, 1, 1)
+    # Creation order differs from id order for the last two prompts
+    for number, minutes in enumerate([0, 1, 2, 4, 3]):
+        session.add(Prompt(board_id=number % 2, prompt_text=f"p{number}", created_at=start + timedelta(minutes=minutes)))
+    session.commit()
+    return session
+
+
+def collect(session, order_by, **params):
+    texts, cursor = [], None
+    while True:
+        page = fetch_page(session, Prompt, PageParams(after=cursor, limit=2, fields=params.get("fields")),
+                          order_by=order_by)
+        texts += [item["prompt_text"] if isinstance(item, dict) else item.prompt_text for item in page.items]
+        cursor = page.next_cursor
+        if cursor is None:
+            return texts
+
+
+def test_keyset_pages_cover_every_row_once():
+    session = make_session()
+    assert collect(session, "id") == ["p0", "p1", "p2", "p3", "p4"]
+    assert collect(session, "created_at") == ["p0", "p1", "p2", "p4", "p3"]
+
+
+def test_fields_select_only_the_requested_columns():
+    session = make_session()
+    page = fetch_page(session, Prompt, PageParams(after=None, limit=None, fields="prompt_text,board_id"),
+                      Prompt.board_id == 1)
+    assert page.items == [{"prompt_text": "p1", "board_id": 1}, {"prompt_text": "p3", "board_id": 1}]
+    assert page.next_cursor is None
+
+    with pytest.raises(HTTPException) as error:
+        fetch_page(session, Prompt, PageParams(after=None, limit=None, fields="password"))
+    assert error.value.status_code == 400
+
+
+def test_pages_are_bounded_without_a_limit():
+    assert PageParams(after=None, limit=None, fields=None).limit == PAGE_SIZE_DEFAULT
+    assert PageParams(after=None, limit=10_000, fields=None).limit == MAX_PAGE_SIZE
+
+
+def test_next_cursor_is_readable_cross_origin():
+    class _Tables:
+        def get_tables_with_files(self, board_id, data_table_id, after_id, limit, fields):
+            return [DataManagementTable(id=table_id, board_id=1, table_name=f"t{table_id}", table_column_type_detail="")
+                    for table_id in range(1, 4)][:limit]
+
+    main.app.dependency_overrides[verify_token] = lambda: "token"
+    main.app.dependency_overrides[get_data_management_table_repository] = lambda: _Tables()
+    try:
+        with TestClient(main.app) as client:
+            response = client.get(
+                "/main-boards/boards/data-management-table/get_all_tables_with_files",
+                params={"limit": 2, "fields": "id,table_name"},
+                headers={"Origin": "https://app.example.com"},
+            )
+    finally:
+        main.app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert [table["id"] for table in response.json()] == [1, 2]
+    assert response.headers[NEXT_CURSOR_HEADER] == "2"
+    assert NEXT_CURSOR_HEADER.lower() in response.headers["access-control-expose-headers"].lower()
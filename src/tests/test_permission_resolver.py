@@ -0,0 +1,65 @@
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+import app.bootstrap  # noqa: F401  (registers every model)
+from app.models.board_access import BoardAccess
+from app.models.boards import Boards
+from app.models.client_user import ClientUser
+from app.models.main_board import MainBoard
+from app.models.main_board_access import MainBoardAccess
+from app.models.permissions import BoardPermission
+from app.pagination import PageParams
+from app.repositories import permission_resolver as resolver_module
+from app.repositories.board_access_repository import BoardAccessRepository
+from app.repositories.boards_repository import BoardsRepository
+from app.repositories.permission_resolver import request_permission_scope
+
+
+def _engine():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine, tables=[
+        ClientUser.__table__, MainBoard.__table__, Boards.__table__, MainBoardAccess.__table__, BoardAccess.__table__,
+    ])
+    with Session(engine) as session:
+        session.add(MainBoard(id=1, client_user_id=1, name="owned", main_board_type="ANALYSIS"))
+        session.add(MainBoard(id=2, client_user_id=9, name="shared", main_board_type="ANALYSIS"))
+        session.add(MainBoard(id=3, client_user_id=9, name="other", main_board_type="ANALYSIS"))
+        for board_id, main_board_id in [(10, 1), (20, 2), (30, 3), (31, 3)]:
+            session.add(Boards(id=board_id, main_board_id=main_board_id, name=f"b{board_id}"))
+        session.add(MainBoardAccess(main_board_id=2, client_user_id=1, permission="view"))
+        session.add(BoardAccess(board_id=31, client_user_id=1, permission="edit"))
+        session.commit()
+    return engine
+
+
+def test_boards_resolve_with_one_permission_query(monkeypatch):
+    engine = _engine()
+    monkeypatch.setattr(resolver_module.permission_resolver, "engine", engine)
+    resolver_module.permission_resolver.invalidate_all()
+    repository = BoardsRepository.__new__(BoardsRepository)
+    repository.engine = engine
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    boards = repository.get_boards(user_id=1, page=PageParams(after=None, limit=None, fields=None)).items
+    permissions = resolver_module.permission_resolver.get(1)
+
+    assert sorted(board.id for board in boards) == [10, 20, 31]
+    assert permissions.board_permissions(10, 1) == {"view", "edit", "delete", "create", "owner"}
+    assert permissions.board_permissions(20, 2) == {"view"}
+    assert permissions.board_permissions(30, 3) == set()
+    assert len(statements) == 2  # the resolver's query, then the boards
+
+
+def test_grants_invalidate_cached_permissions(monkeypatch):
+    engine = _engine()
+    monkeypatch.setattr(resolver_module.permission_resolver, "engine", engine)
+    resolver_module.permission_resolver.invalidate_all()
+    access_repository = BoardAccessRepository.__new__(BoardAccessRepository)
+    access_repository.session = Session(engine)
+
+    with request_permission_scope():
+        assert not access_repository.check_permission(30, 1, BoardPermission.DELETE)
+        access_repository.grant_permission(30, 1, BoardPermission.DELETE)
+        assert access_repository.check_permission(30, 1, BoardPermission.DELETE)
+        access_repository.revoke_permission(30, 1, BoardPermission.DELETE)
+        assert not access_repository.check_user_has_any_permission(30, 1)
@@ -0,0 +1,69 @@
+import asyncio
+from app.services.prompt_jobs import PromptJobManager, SUCCEEDED, FAILED
+
+
+def test_in_flight_submissions_share_one_job():
+    async def scenario():
+        manager = PromptJobManager()
+        calls = []
+
+        async def run():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"message": ["done"]}
+
+        first = manager.submit("key", "1", "sales by month", run)
+        second = manager.submit("key", "1", "sales by month", run)
+        await asyncio.sleep(0.05)
+        return first, second, calls
+
+    first, second, calls = asyncio.run(scenario())
+
+    assert first is second
+    assert len(calls) == 1
+    assert first.status == SUCCEEDED
+    assert first.result == {"message": ["done"]}
+
+
+def test_failed_job_records_error_and_frees_the_key():
+    async def scenario():
+        manager = PromptJobManager()
+
+        async def run():
+            raise ValueError("agent failed")
+
+        failed = manager.submit("key", "1", "text", run)
+        await asyncio.sleep(0.01)
+        retry = manager.submit("key", "1", "text", run)
+        await asyncio.sleep(0.01)
+        return failed, retry
+
+    failed, retry = asyncio.run(scenario())
+
+    assert failed.status == FAILED
+    assert failed.error == "agent failed"
+    assert retry.job_id != failed.job_id
+
+
+def test_cancelled_job_is_marked_failed():
+    async def scenario():
+        manager = PromptJobManager(ttl_seconds=0)
+
+        async def run():
+            await asyncio.sleep(10)
+
+        job = manager.submit("key", "1", "text", run)
+        await asyncio.sleep(0)
+        task = manager._tasks[job.job_id]
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        manager._prune()
+        return manager, job, task
+
+    manager, job, task = asyncio.run(scenario())
+
+    assert task.cancelled()
+    assert job.status == FAILED
+    assert job.error == "cancelled"
+    assert job.finished_at is not None
+    assert manager.get(job.job_id) is None  # finished, so pruned once past its TTL
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import SQLModel, Session, create_engine, select
+import app.bootstrap  # noqa: F401  (registers every model)
+from app import bootstrap
+from app.models.boards import Boards
+from app.models.prompt_response import PromptCachePolicy, PromptResponse
+from app.repositories import prompt_repository as prompt_repository_module
+from app.repositories.prompt_repository import PromptResponseRepository
+from app.repositories.response_cache import ResponseCache
+
+
+def _repository(monkeypatch):
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine, tables=[
+        Boards.__table__, PromptResponse.__table__, PromptCachePolicy.__table__,
+    ])
+    monkeypatch.setattr(prompt_repository_module, "engine", engine)
+    monkeypatch.setattr(prompt_repository_module, "PROMPT_CACHE_DEFAULT_TTL_SECONDS", 3600)
+    return PromptResponseRepository(), engine
+
+
+def test_saving_a_hash_twice_updates_one_row(monkeypatch):
+    repository, engine = _repository(monkeypatch)
+
+    first = repository._save_response_to_database("k", {"board_id": 1, "prompt_text": "q", "answer": 1})
+    second = repository._save_response_to_database("k", {"board_id": 1, "prompt_text": "q", "answer": 22})
+
+    with Session(engine) as session:
+        rows = session.exec(select(PromptResponse)).all()
+    assert len(rows) == 1
+    assert second.id == first.id
+    assert rows[0].prompt_out["answer"] == 22
+    assert rows[0].size_bytes == second.size_bytes > first.size_bytes
+    assert rows[0].expires_at is not None
+
+
+def test_lookup_counts_hits_and_skips_expired_rows(monkeypatch):
+    repository, engine = _repository(monkeypatch)
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        session.add(PromptResponse(board_id=1, prompt_text="q", prompt_out={}, hash_key="live"))
+        session.add(PromptResponse(
+            board_id=1, prompt_text="q", prompt_out={}, hash_key="old", expires_at=now - timedelta(seconds=1)
+        ))
+        session.commit()
+
+    assert repository._check_existing_response("live").hit_count == 1
+    assert repository._check_existing_response("live").hit_count == 2
+    assert repository._check_existing_response("live", record_hit=False).hit_count == 2
+    assert repository._check_existing_response("old") is None
+    assert repository._check_existing_response("missing") is None
+    with Session(engine) as session:
+        assert session.exec(select(PromptResponse).where(PromptResponse.hash_key == "live")).one().last_hit_at
+
+
+def test_schema_upgrades_start_with_the_advisory_lock(monkeypatch):
+    statements = []
+
+    class _Connection:
+        def execute(self, statement, parameters=None):
+            statements.append((str(statement), parameters))
+
+    class _Begin:
+        def __enter__(self):
+            return _Connection()
+
+        def __exit__(self, *args):
+            return False
+
+    monkeypatch.setattr(bootstrap, "engine", type("Engine", (), {"begin": lambda self: _Begin()})())
+    bootstrap.upgrade_schema()
+
+    assert statements[0] == (
+        "SELECT pg_advisory_xact_lock(:lock_id)", {"lock_id": bootstrap.SCHEMA_UPGRADE_LOCK_ID}
+    )
+    assert len(statements) == len(bootstrap.SCHEMA_UPGRADES) + 2
+
+
+def _seed_responses(engine, now):
+    # Recency is last_hit_at, else updated_at: r3 > r1 > r2 > r4
+    with Session(engine) as session:
+        for key, updated_minutes_ago, hit_minutes_ago, size in [
+            ("r1", 50, 10, 40), ("r2", 20, None, 30), ("r3", 60, 5, 50), ("r4", 30, None, 20),
+        ]:
+            session.add(PromptResponse(
+                board_id=1, prompt_text=key, prompt_out={}, hash_key=key, size_bytes=size,
+                updated_at=now - timedelta(minutes=updated_minutes_ago),
+                last_hit_at=now - timedelta(minutes=hit_minutes_ago) if hit_minutes_ago else None,
+            ))
+        session.add(PromptResponse(
+            board_id=1, prompt_text="gone", prompt_out={}, hash_key="expired", size_bytes=1,
+            updated_at=now, last_hit_at=now, expires_at=now - timedelta(seconds=1),
+        ))
+        session.commit()
+
+
+def _remaining(engine):
+    with Session(engine) as session:
+        return sorted(row.hash_key for row in session.exec(select(PromptResponse)).all())
+
+
+def test_compact_deletes_expired_then_least_recently_used_over_row_budget(monkeypatch):
+    repository, engine = _repository(monkeypatch)
+    _seed_responses(engine, datetime.utcnow())
+
+    deleted = repository.compact(max_rows=2, max_bytes=0)
+
+    assert deleted == {"expired": 1, "over_row_budget": 2, "over_byte_budget": 0}
+    assert _remaining(engine) == ["r1", "r3"]
+
+
+def test_compact_keeps_most_recent_responses_within_byte_budget(monkeypatch):
+    repository, engine = _repository(monkeypatch)
+    _seed_responses(engine, datetime.utcnow())
+
+    # Running totals by recency: r3=50, r1=90, r2=120, r4=140
+    deleted = repository.compact(max_rows=0, max_bytes=100)
+
+    assert deleted == {"expired": 1, "over_row_budget": 0, "over_byte_budget": 2}
+    assert _remaining(engine) == ["r1", "r3"]
+    assert repository.compact(max_rows=0, max_bytes=0) == {"expired": 0, "over_row_budget": 0, "over_byte_budget": 0}
+
+
+def test_compact_keeps_responses_served_from_the_l1(monkeypatch):
+    repository, engine = _repository(monkeypatch)
+    l1 = ResponseCache(max_bytes=1000, ttl_seconds=60)
+    monkeypatch.setattr(prompt_repository_module, "response_cache", l1)
+    _seed_responses(engine, datetime.utcnow())
+    # r4 is the least recently used row in the database but hot in this worker's L1
+    l1.put("r4", 1, b"{}")
+    for _ in range(3):
+        assert l1.get("r4") == b"{}"
+
+    repository.compact(max_rows=2, max_bytes=0)
+
+    assert _remaining(engine) == ["r3", "r4"]
+    with Session(engine) as session:
+        assert session.exec(select(PromptResponse).where(PromptResponse.hash_key == "r4")).one().hit_count == 3
+    assert l1.drain_hits() == {}
@@ -0,0 +1,48 @@
+import asyncio
+import io
+from types import SimpleNamespace
+
+import app.bootstrap  # noqa: F401  (registers every model)
+from app.repositories.data_management_table_repository import DataManagementTableRepository
+from app.repositories.prompt_repository import PromptResponseRepository
+from app.services import prompt_service as prompt_service_module
+from app.services.prompt_service import PromptService
+
+
+class _FakeMinio:
+    def __init__(self, objects):
+        self.objects = objects
+        self.requested = []
+
+    def get_object(self, bucket_name, object_name):
+        self.requested.append((bucket_name, object_name))
+        return io.BytesIO(self.objects[object_name])
+
+
+class _CachedResponses(PromptResponseRepository):
+    def __init__(self):
+        self.hash_keys = []
+
+    async def check_existing_response(self, hash_key, record_hit=True):
+        self.hash_keys.append(hash_key)
+        return SimpleNamespace(prompt_out={"message": ["cached"]})
+
+
+def test_pipeline_downloads_files_through_the_table_repository(monkeypatch):
+    files = SimpleNamespace(
+        raise_for_status=lambda: None,
+        json=lambda: [{"table_name": "sales", "files": [{"file_download_link": "minio://bucket/2024-01/1/7/sales.csv"}]}],
+    )
+    monkeypatch.setattr(prompt_service_module.requests, "get", lambda url: files)
+    tables = DataManagementTableRepository.__new__(DataManagementTableRepository)
+    tables.minio_client = _FakeMinio({"2024-01/1/7/sales.csv": b"region,sales\nnorth,3\n"})
+    tables.bucket_name = "bucket"
+    service = PromptService.__new__(PromptService)
+    service.data_management_table_repository = tables
+    service.prompt_response_repository = _CachedResponses()
+
+    result = asyncio.run(service.run_prompt_pipeline("total sales", board_id=1, data_table_id=1))
+
+    assert result == {"message": ["cached"]}
+    assert tables.minio_client.requested == [("bucket", "2024-01/1/7/sales.csv")]
+    assert len(service.prompt_response_repository.hash_keys) == 1
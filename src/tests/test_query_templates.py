@@ -0,0 +1,69 @@
+import pandas as pd
+from app.routers.prompt_router import DataFrameProcessor
+from app.services.board_query_engine import BoardQueryEngine
+from app.services.query_templates import answer_simple_prompt, answer_simple_prompt_sql, is_ranked
+
+SALES = pd.DataFrame({
+    "Order_Date": ["2024-01-05", "2024-01-20", "2024-02-03", "2024-03-11", "2024-03-12"],
+    "Region": ["North", "South", "North", "East", "South"],
+    "Product": ["Tea", "Coffee", "Tea", "Juice", "Coffee"],
+    "Revenue": [100.0, 250.0, 50.0, 75.0, 25.0],
+})
+
+
+def test_aggregate_by_dimension():
+    result = answer_simple_prompt("What is the total revenue by region?", [SALES])
+
+    assert result.columns.tolist() == ["Region", "Revenue"]
+    assert result.set_index("Region")["Revenue"].to_dict() == {"East": 75.0, "North": 150.0, "South": 275.0}
+
+    average = answer_simple_prompt("average revenue per product", [SALES])
+    assert average.set_index("Product")["Average Revenue"]["Coffee"] == 137.5
+
+
+def test_top_n_and_monthly_trend():
+    top = answer_simple_prompt("Top 2 products by revenue", [SALES])
+    assert top["Product"].tolist() == ["Coffee", "Tea"]
+
+    trend = answer_simple_prompt("monthly trend of revenue", [SALES])
+    assert trend["Revenue"].tolist() == [350.0, 50.0, 100.0]
+    assert answer_simple_prompt("revenue by month", [SALES]).equals(trend)
+
+
+def test_unrecognised_prompts_fall_back_to_the_agent():
+    assert answer_simple_prompt("Why did revenue drop in the north?", [SALES]) is None
+    assert answer_simple_prompt("total profit by region", [SALES]) is None
+    assert answer_simple_prompt("total region by product", [SALES]) is None
+    # Columns must come from the same frame
+    assert answer_simple_prompt("total revenue by store", [SALES, pd.DataFrame({"Store": ["A"]})]) is None
+
+
+def test_sql_templates_match_the_pandas_answers(tmp_path):
+    path = str(tmp_path / "sales.parquet")
+    SALES.to_parquet(path, index=False)
+
+    with BoardQueryEngine({"sales": [path, path]}) as engine:
+        assert answer_simple_prompt_sql("total revenue by region", engine)["Revenue"].tolist() == [150.0, 300.0, 550.0]
+        assert answer_simple_prompt_sql("top 1 product by revenue", engine)["Product"].tolist() == ["Coffee"]
+        trend = answer_simple_prompt_sql("monthly average revenue", engine)
+        assert trend["Average Revenue"].tolist() == [175.0, 50.0, 50.0]
+        assert answer_simple_prompt_sql("total profit by region", engine) is None
+
+
+def test_ranked_answers_keep_their_order_when_dates_are_formatted(tmp_path):
+    monthly = pd.DataFrame({"Month": ["2024-01-01", "2024-02-01", "2024-03-01"], "Revenue": [10.0, 30.0, 20.0]})
+    path = str(tmp_path / "monthly.parquet")
+    monthly.to_parquet(path, index=False)
+    processor = DataFrameProcessor.__new__(DataFrameProcessor)
+
+    top = answer_simple_prompt("top 2 months by revenue", [monthly])
+    with BoardQueryEngine({"monthly": [path]}) as engine:
+        top_sql = answer_simple_prompt_sql("top 2 months by revenue", engine)
+    grouped = answer_simple_prompt("total revenue by month", [monthly.iloc[::-1]])
+
+    for result in (top, top_sql):
+        assert is_ranked(result)
+        table = processor.process_dataframe_response(result, sort_dates=not is_ranked(result))["table"]
+        assert table["data"] == [["February-2024", 30.0], ["March-2024", 20.0]]
+    assert not is_ranked(grouped)
+    assert processor.process_dataframe_response(grouped)["table"]["data"][0][0] == "January-2024"
@@ -0,0 +1,41 @@
+from app.repositories.response_cache import ResponseCache
+
+
+def test_evicts_least_recently_used_within_byte_budget():
+    cache = ResponseCache(max_bytes=10, ttl_seconds=60)
+    cache.put("a", 1, b"aaaa")
+    cache.put("b", 1, b"bbbb")
+    assert cache.get("a") == b"aaaa"
+
+    cache.put("c", 2, b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.stats()["bytes"] == 8
+
+
+def test_board_invalidation_and_expiry():
+    cache = ResponseCache(max_bytes=100, ttl_seconds=60)
+    cache.put("a", 1, b"x")
+    cache.put("b", "2", b"y")
+
+    cache.invalidate_board("1")
+    assert cache.get("a") is None
+    assert cache.get("b") == b"y"
+
+    expired = ResponseCache(max_bytes=100, ttl_seconds=-1)
+    expired.put("a", 1, b"x")
+    assert expired.get("a") is None
+
+
+def test_hits_are_drained_once_per_key():
+    cache = ResponseCache(max_bytes=100, ttl_seconds=60)
+    cache.put("a", 1, b"x")
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+
+    hits = cache.drain_hits()
+    assert list(hits) == ["a"]
+    assert hits["a"][0] == 2
+    assert cache.drain_hits() == {}
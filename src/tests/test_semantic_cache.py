@@ -0,0 +1,49 @@
+from app.services.semantic_cache import HashingEmbedder, SemanticCache, normalize_prompt, prompt_literals
+
+
+def test_near_duplicate_prompt_reuses_hash_key():
+    cache = SemanticCache(embedder=HashingEmbedder(), threshold=0.9)
+    cache.add(1, "data-v1", "total sales by month", "key-1")
+
+    match = cache.lookup(1, "data-v1", "Total Sales by Month?")
+
+    assert normalize_prompt("Total Sales by Month?") == "total sales by month"
+    assert match is not None
+    assert match.hash_key == "key-1"
+    assert match.similarity > 0.99
+
+
+def test_unrelated_prompt_and_other_data_versions_miss():
+    cache = SemanticCache(embedder=HashingEmbedder(), threshold=0.9)
+    cache.add(1, "data-v1", "total sales by month", "key-1")
+
+    assert cache.lookup(1, "data-v1", "top five customers by outstanding balance") is None
+    assert cache.lookup(1, "data-v2", "total sales by month") is None
+    assert cache.lookup(2, "data-v1", "total sales by month") is None
+
+
+def test_prompts_differing_in_a_literal_never_share_an_answer():
+    pairs = [
+        ("show total sales by region for the year 2023 sorted descending",
+         "show total sales by region for the year 2024 sorted descending"),
+        ("total sales by category excluding returns", "total sales by category including returns"),
+        ("list the top 5 stores by revenue", "list the bottom 5 stores by revenue"),
+        ("list the top 5 stores by revenue", "list the top 10 stores by revenue"),
+        ("sales by region in march", "sales by region in april"),
+        ("revenue by product for q1", "revenue by product for q2"),
+        ("month with the maximum orders", "month with the minimum orders"),
+        ("regions where sales increase", "regions where sales decrease"),
+    ]
+    for answered, asked in pairs:
+        cache = SemanticCache(embedder=HashingEmbedder(), threshold=0.9)
+        cache.add(1, "data-v1", answered, "key-1")
+
+        assert cache.lookup(1, "data-v1", asked) is None, asked
+
+
+def test_literal_synonyms_still_match():
+    assert prompt_literals("Top 5 stores in Jan 2024") == prompt_literals("TOP 5 stores in January, 2024")
+    cache = SemanticCache(embedder=HashingEmbedder(), threshold=0.9)
+    cache.add(1, "data-v1", "top 5 stores by revenue in january", "key-1")
+
+    assert cache.lookup(1, "data-v1", "Top 5 stores by revenue in January?").hash_key == "key-1"
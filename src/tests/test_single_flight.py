@@ -0,0 +1,50 @@
+import asyncio
+from app.concurrency import SingleFlight
+
+
+def test_followers_await_the_leaders_result():
+    async def scenario():
+        flights = SingleFlight()
+        runs = []
+
+        async def handle(key):
+            shared = await flights.wait(key)
+            if shared is not None:
+                return shared
+            with flights.lead(key) as flight:
+                runs.append(key)
+                await asyncio.sleep(0.01)
+                flight.set_result({"answer": 42})
+            return {"answer": 42}
+
+        results = await asyncio.gather(*(handle("prompt") for _ in range(5)))
+        return results, runs
+
+    results, runs = asyncio.run(scenario())
+
+    assert runs == ["prompt"]
+    assert results == [{"answer": 42}] * 5
+
+
+def test_follower_leads_when_leader_gives_up():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def abandoned_leader():
+            with flights.lead("prompt"):
+                await asyncio.sleep(0.01)
+                raise asyncio.CancelledError()
+
+        leader = asyncio.create_task(abandoned_leader())
+        await asyncio.sleep(0)
+        shared = await flights.wait("prompt")
+        try:
+            await leader
+        except asyncio.CancelledError:
+            pass
+        return shared, flights.in_flight("prompt")
+
+    shared, remaining = asyncio.run(scenario())
+
+    assert shared is None
+    assert remaining is None
@@ -0,0 +1,21 @@
+import pandas as pd
+from app.repositories.table_dataset import TableDataset
+
+
+def test_months_are_added_and_dropped_one_partition_at_a_time(tmp_path):
+    dataset = TableDataset(str(tmp_path))
+    dataset.write_partition(7, "12024", 1, pd.DataFrame({"Branch": ["A"], "Sales": [10]}))
+    dataset.write_partition(7, "22024", 2, pd.DataFrame({"Branch": ["B"], "Sales": [20], "Returns": [1]}))
+
+    assert sorted(dataset.partitions(7)) == ["12024", "22024"]
+    february = dataset.read_partition(dataset.partitions(7)["22024"][0])
+    assert february.to_dict("list") == {"Branch": ["B"], "Sales": [20], "Returns": [1]}
+
+    dataset.drop_partition(7, "12024", 1)
+    assert list(dataset.partitions(7)) == ["22024"]
+    assert dataset.existing_partition_path(7, "12024", 1) is None
+
+    february_path = dataset.existing_partition_path(7, "22024", 2)
+    dataset.drop_table(7)
+    assert dataset.partitions(7) == {}
+    assert dataset.read_partition(february_path) is None
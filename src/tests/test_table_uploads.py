@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from sqlmodel import SQLModel, Session, create_engine
+import app.bootstrap  # noqa: F401  (registers every model)
+from app.models.data_management_table import DataManagementTable, TableStatus
+from app.repositories import prompt_repository as prompt_repository_module
+from app.repositories.data_management_table_repository import TableStatusRepository
+from app.repositories.prompt_repository import PromptRepository
+
+
+class _FakeMinio:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, bucket_name, object_name, data, length):
+        content = data.read()
+        self.objects[object_name] = content
+        return SimpleNamespace(etag=f"etag-{len(self.objects)}")
+
+
+def test_same_filename_uploads_keep_separate_objects_and_change_the_fingerprint(monkeypatch):
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine, tables=[DataManagementTable.__table__, TableStatus.__table__])
+    with Session(engine) as session:
+        session.add(DataManagementTable(id=1, board_id=5, table_name="sales", table_column_type_detail=""))
+        session.commit()
+    monkeypatch.setattr(prompt_repository_module, "engine", engine)
+    repository = TableStatusRepository.__new__(TableStatusRepository)
+    repository.engine = engine
+    repository.minio_client = _FakeMinio()
+    repository.bucket_name = "bucket"
+    prompts = PromptRepository.__new__(PromptRepository)
+
+    first = repository.upload_file_table_status_for_rag(
+        b"a,b\n1,2\n", TableStatus(data_management_table_id=1, month_year="012024", filename="sales.csv")
+    )
+    before = prompts.get_board_fingerprint(5)
+    second = repository.upload_file_table_status_for_rag(
+        b"a,b\n3,4\n", TableStatus(data_management_table_id=1, month_year="012024", filename="sales.csv")
+    )
+
+    assert first.file_download_link != second.file_download_link
+    assert len(repository.minio_client.objects) == 2
+    assert repository.object_name(first.file_download_link) in repository.minio_client.objects
+    assert (first.file_etag, first.file_size) == ("etag-1", 8)
+    assert "etag-1|8" in before
+    assert prompts.get_board_fingerprint(5) != before
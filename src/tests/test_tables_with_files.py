@@ -0,0 +1,50 @@
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+import app.bootstrap  # noqa: F401  (registers every model)
+from app.models.data_management_table import DataManagementTable, TableStatus
+from app.repositories.data_management_table_repository import DataManagementTableRepository
+
+
+def test_tables_and_files_load_in_one_query_per_page():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine, tables=[DataManagementTable.__table__, TableStatus.__table__])
+    with Session(engine) as session:
+        for table_number in range(5):
+            table = DataManagementTable(board_id=table_number % 2, table_name=f"t{table_number}", table_column_type_detail="")
+            table.table_statuses = [
+                TableStatus(month_year=f"{month}2024", filename=f"{month}.csv") for month in range(1, 4)
+            ]
+            session.add(table)
+        session.commit()
+
+    repository = DataManagementTableRepository.__new__(DataManagementTableRepository)
+    repository.engine = engine
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    first_page = repository.get_tables_with_files(limit=2)
+    next_page = repository.get_tables_with_files(after_id=first_page[-1].id, limit=2)
+    board_tables = repository.get_tables_with_files(board_id=1)
+
+    assert [table.table_name for table in first_page + next_page] == ["t0", "t1", "t2", "t3"]
+    assert all(len(table.table_statuses) == 3 for table in first_page + next_page)
+    assert [table.table_name for table in board_tables] == ["t1", "t3"]
+    assert len(statements) == 3
+
+
+def test_fields_are_selected_in_sql():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine, tables=[DataManagementTable.__table__, TableStatus.__table__])
+    with Session(engine) as session:
+        session.add(DataManagementTable(board_id=1, table_name="sales", table_column_type_detail="wide " * 100))
+        session.commit()
+    repository = DataManagementTableRepository.__new__(DataManagementTableRepository)
+    repository.engine = engine
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    tables = repository.get_tables_with_files(fields=["table_name"])
+
+    assert [table.table_name for table in tables] == ["sales"]
+    assert "table_column_type_detail" not in statements[0]
+    assert "tablestatus" not in statements[0].lower()
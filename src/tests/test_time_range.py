@@ -0,0 +1,81 @@
+from app.services.time_range import parse_month_year, remove_time_phrases, select_months
+
+# January 2023 to March 2024
+MONTHS = [f"{month}{year}" for year in (2023, 2024) for month in range(1, 13)][:15]
+
+
+def test_stored_month_years_parse():
+    assert parse_month_year("12024") == (2024, 1)
+    assert parse_month_year("122024") == (2024, 12)
+    assert parse_month_year("132024") is None
+    assert parse_month_year("2024-03") == (2024, 3)
+
+
+def test_explicit_periods_select_matching_months():
+    assert select_months("sales in March 2024", MONTHS) == ["32024"]
+    assert select_months("revenue for Q4 2023", MONTHS) == ["102023", "112023", "122023"]
+    assert select_months("compare 2024-01 and Feb 2024", MONTHS) == ["12024", "22024"]
+    assert select_months("between Nov 2023 and Jan 2024", MONTHS) == ["112023", "122023", "12024"]
+    assert select_months("orders in 2024", MONTHS) == ["12024", "22024", "32024"]
+    assert select_months("sales in February", MONTHS) == ["22023", "22024"]
+
+
+def test_relative_periods_count_back_from_the_latest_month():
+    assert select_months("sales last month", MONTHS) == ["32024"]
+    assert select_months("trend over the last 3 months", MONTHS) == ["12024", "22024", "32024"]
+    assert select_months("last quarter", MONTHS) == ["12024", "22024", "32024"]
+    assert select_months("last year", MONTHS) == [f"{month}2023" for month in range(1, 13)]
+    assert select_months("revenue year to date", MONTHS) == ["12024", "22024", "32024"]
+
+
+def test_prompts_without_a_known_period_use_every_month():
+    assert select_months("total sales by region", MONTHS) is None
+    assert select_months("sales in 2019", MONTHS) is None
+    assert select_months("may I see sales by region", MONTHS) is None
+
+
+def test_date_phrases_can_be_removed_for_template_matching():
+    assert remove_time_phrases("Total sales by region last month") == "total sales by region"
+    assert remove_time_phrases("total revenue in March 2024 by product") == "total revenue by product"
+
+
+def test_ranges_carry_the_year_across_both_ends():
+    first_quarter_2024 = ["12024", "22024", "32024"]
+    assert select_months("between jan and mar 2024", MONTHS) == first_quarter_2024
+    assert select_months("sales jan-mar 2024", MONTHS) == first_quarter_2024
+    assert select_months("revenue from nov 2023 to jan 2024", MONTHS) == ["112023", "122023", "12024"]
+    assert select_months("from january to march", MONTHS) == ["12023", "22023", "32023"] + first_quarter_2024
+    assert select_months("compare march 2023 to march 2024", MONTHS) == ["32023", "32024"]
+
+
+def test_open_ranges_bound_the_months():
+    assert select_months("before march 2024", MONTHS) == MONTHS[:14]
+    assert select_months("after january 2024", MONTHS) == ["22024", "32024"]
+    assert select_months("sales since november", MONTHS) == ["112023", "122023", "12024", "22024", "32024"]
+    assert select_months("after jan 2024 and before mar 2024", MONTHS) == ["22024"]
+
+
+def test_unresolved_ranges_use_every_month():
+    assert select_months("from Q1 to Q3 2024", MONTHS) is None
+    assert select_months("orders since 2023", MONTHS) is None
+    assert remove_time_phrases("total sales by region between jan and mar 2024") == "total sales by region"
+
+
+def test_excluded_periods_use_every_month():
+    assert select_months("total sales excluding March 2024", MONTHS) is None
+    assert select_months("sales for all months except jan 2024", MONTHS) is None
+    assert select_months("revenue other than Q1 2024", MONTHS) is None
+    assert select_months("orders without february 2024", MONTHS) is None
+
+
+def test_comparisons_with_another_period_use_every_month():
+    assert select_months("year over year growth in q1 2024", MONTHS) is None
+    assert select_months("sales in March 2024 vs last year", MONTHS) is None
+    assert select_months("revenue in 2024 compared to 2023", MONTHS) is None
+
+
+def test_quantities_are_not_years():
+    assert select_months("orders over 2023 units", MONTHS) is None
+    assert select_months("customers with more than 2000 orders", MONTHS) is None
+    assert select_months("orders above 2020 in March 2024", MONTHS) == ["32024"]
+    assert remove_time_phrases("orders over 2023 units in March 2024") == "orders over 2023 units"